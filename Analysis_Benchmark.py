@@ -0,0 +1,145 @@
+import json
+import os
+import unittest
+from datetime import datetime
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+import File_Upload  # imported as a module so unittest does not collect FileUploadTests here too
+from fixture_generator import FixtureGenerator
+from latency_stats import summarize, fit_power_law
+
+# Upload fixtures of increasing size shipped with the suite
+BENCHMARK_FIXTURES = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ("Testing_100lines.py", "Testing_300lines.py", "Testing_1500lines.py")
+]
+config = File_Upload.config
+BENCHMARK_ITERATIONS = getattr(config, "BENCHMARK_ITERATIONS", 3)
+# Extra synthetic sizes, e.g. [20, 50, 5000, 20000], to find where latency or upload limits break
+BENCHMARK_GENERATED_SIZES = getattr(config, "BENCHMARK_GENERATED_SIZES", [])
+BENCHMARK_DIR = os.path.join(os.path.dirname(__file__), 'benchmarks')
+
+MILESTONES = ("first_progress", "spinner_gone", "results_rendered")
+
+
+def count_lines(file_path):
+    """Count lines without loading the whole file."""
+    with open(file_path, 'rb') as file:
+        return sum(1 for _ in file)
+
+
+class AnalysisLatencyBenchmark(File_Upload.FileUploadTests):
+    """
+    Measures how CodeSherlock's analysis latency scales with the size of the uploaded file.
+
+    Every fixture is uploaded BENCHMARK_ITERATIONS times per factor and the
+    submit -> first progress -> spinner gone -> results rendered latencies are recorded.
+    """
+
+    def test_signup_and_login(self):
+        self.skipTest("Functional flow is covered by File_Upload.py")
+
+    def reset_to_upload_form(self):
+        """Reload the app so the next iteration starts from an empty upload form."""
+        self.driver.get(config.LOGIN_URL)
+        WebDriverWait(self.driver, 30).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+
+    def run_iteration(self, factor, fixture_path):
+        """
+        Uploads one fixture for one factor and times the processing milestones.
+
+        Returns:
+            dict: Milestone latencies in seconds, or None if the upload could not be submitted
+        """
+        self.selected_factor = factor
+        self.upload_file_path = fixture_path
+        if not self.handle_factor_selection(factor) or not self.handle_file_upload(fixture_path):
+            return None
+        if not self.handle_submit(factor):
+            return None
+        return self.measure_processing_latency(self.submitted_at)
+
+    def test_analysis_latency(self):
+        self.logger.info("Starting analysis latency benchmark")
+        self.assertTrue(self.handle_login(), "Login failed, cannot run benchmark")
+
+        fixtures = list(BENCHMARK_FIXTURES)
+        if BENCHMARK_GENERATED_SIZES:
+            generator = FixtureGenerator(seed=getattr(config, "GENERATED_FIXTURE_SEED", 0),
+                                         issue_density=getattr(config, "GENERATED_FIXTURE_DENSITY", 0.3))
+            fixtures += generator.ensure_fixtures(File_Upload.GENERATED_FIXTURE_DIR, BENCHMARK_GENERATED_SIZES)
+        fixtures.sort(key=count_lines)
+
+        samples = []
+        for factor in File_Upload.VALID_FACTORS:
+            for fixture_path in fixtures:
+                lines = count_lines(fixture_path)
+                for iteration in range(BENCHMARK_ITERATIONS):
+                    self.logger.info(f"Benchmark {factor} / {os.path.basename(fixture_path)} "
+                                     f"({lines} lines), iteration {iteration + 1} of {BENCHMARK_ITERATIONS}")
+                    self.reset_to_upload_form()
+                    milestones = self.run_iteration(factor, fixture_path)
+                    if milestones is None:
+                        self.logger.error("Benchmark iteration could not be submitted")
+                        milestones = {"error": True}
+                    samples.append(dict(milestones, factor=factor, fixture=os.path.basename(fixture_path),
+                                        lines=lines, iteration=iteration))
+                    self.logger.info(f"Benchmark sample: {samples[-1]}")
+
+        report = self.build_report(samples)
+        report_path = self.write_report(report)
+        self.logger.info(f"Benchmark report written to {report_path}")
+        self.assertTrue(any(s.get("results_rendered") is not None for s in samples),
+                        "No benchmark iteration produced results")
+
+    def build_report(self, samples):
+        """Aggregate samples into per factor/fixture percentiles and a latency scaling fit."""
+        groups = {}
+        for sample in samples:
+            groups.setdefault((sample["factor"], sample["fixture"], sample["lines"]), []).append(sample)
+
+        results = []
+        for (factor, fixture, lines), group in sorted(groups.items(), key=lambda item: (item[0][0], item[0][2])):
+            entry = {"factor": factor, "fixture": fixture, "lines": lines,
+                     "errors": sum(1 for s in group if s.get("error"))}
+            for milestone in MILESTONES:
+                entry[milestone] = summarize([s.get(milestone) for s in group])
+            results.append(entry)
+            rendered = entry["results_rendered"]
+            if rendered["count"]:
+                self.logger.info(f"{factor} / {fixture} ({lines} lines): results rendered "
+                                 f"p50={rendered['p50']:.1f}s p90={rendered['p90']:.1f}s p99={rendered['p99']:.1f}s")
+
+        scaling = {}
+        for factor in {entry["factor"] for entry in results}:
+            factor_entries = [e for e in results if e["factor"] == factor and e["results_rendered"]["count"]]
+            fit = fit_power_law([e["lines"] for e in factor_entries],
+                                [e["results_rendered"]["p50"] for e in factor_entries])
+            scaling[factor] = fit
+            if fit:
+                self.logger.info(f"{factor} latency scaling: {fit['coefficient']:.3f} * lines^{fit['exponent']:.2f} "
+                                 f"(r^2={fit['r_squared']:.2f})")
+
+        return {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "release": getattr(config, "BENCHMARK_RELEASE", None),
+            "iterations": BENCHMARK_ITERATIONS,
+            "results": results,
+            "scaling": scaling,
+            "samples": samples,
+        }
+
+    @staticmethod
+    def write_report(report):
+        os.makedirs(BENCHMARK_DIR, exist_ok=True)
+        report_path = os.path.join(BENCHMARK_DIR, f"analysis_latency_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(report_path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        return report_path
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
+import base64
 import imaplib
+import io
 from collections import Counter
 from email import message_from_bytes
 from email.header import decode_header
@@ -22,7 +24,9 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.edge.service import Service
 import unittest
 import random
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, \
+    ElementClickInterceptedException, ElementNotInteractableException, InvalidSessionIdException, \
+    NoSuchWindowException, WebDriverException
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
 import pyperclip
@@ -35,6 +39,24 @@ import ctypes
 from logger import Logger
 from sign_in_handler import SignInHandler
 from handlers.config_handler import ConfigHandler
+from screencast_recorder import ScreencastRecorder
+from visual_regression import VisualRegressionEngine
+from step_tracer import StepTracer, traced
+from async_logging import enable_async_logging, set_test_id
+from webdriver_profiler import WebDriverProfiler
+from fixture_generator import FixtureGenerator
+from local_app_server import start_local_app
+from local_mail_server import start_local_mail_server
+from preflight import run_preflight
+from retry import Deadline, RetryPolicy, retry_call
+from step_watchdog import StepWatchdog, watchdog_step
+from locator_registry import LocatorRegistry
+from adaptive_timeouts import AdaptiveTimeouts, environment_name
+from results_store import ResultsStore, file_size
+from dashboard import DashboardBuilder
+from step_graph import StepGraph
+from network_idle import NetworkTracker
+from download_capture import CapturedDownload, DownloadCapture
 
 # Load configuration
 config = ConfigHandler.get_config()
@@ -52,6 +74,38 @@ VALID_FACTORS = ["Power Analysis"]  # List of valid analysis factors
 SHORT_TIMEOUT = 10
 LONG_TIMEOUT = 30
 
+# Locators shared by the processing wait and the latency benchmark
+PROCESSING_SPINNER_XPATH = "//span[@class='loading spinner spinner-container text-white loading-md']"
+PROGRESS_MESSAGE_XPATH = "//div[contains(@class, 'p-4 rounded-[10px] border')]//p"
+RESULTS_TABLE_ROWS_XPATH = "//table[@class='table-auto w-full overflow-x-auto']/tbody/tr"
+
+# Page locators shared across steps; LocatorRegistry compiles them to CSS where possible
+LOCATORS = {
+    "processing_spinner": PROCESSING_SPINNER_XPATH,
+    "progress_message": PROGRESS_MESSAGE_XPATH,
+    "results_table_body": "//table[@class='table-auto w-full overflow-x-auto']/tbody",
+    "results_table_rows": RESULTS_TABLE_ROWS_XPATH,
+    "severity_buttons": "//div[contains(@class, 'flex bg-white')]//button",
+    "download_html_button": "//div[span[text()='Download HTML']]/button",
+    "issue_detail_blocks": "//div[contains(@class, 'text-[14px] sm:text-[20px] flex flex-col gap-4 my-5')]",
+    "file_input": "//input[@type='file']",
+    "submit_button": "//img[contains(@alt,'Submit')]",
+    "history_entries": "//div[contains(@class, 'flex flex-col item-start gap-4')]/a",
+}
+
+GENERATED_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generated_fixtures')
+
+# Retry policies. A dead browser session or rejected IMAP credentials are never retried.
+TRANSIENT_UI_ERRORS = (StaleElementReferenceException, ElementClickInterceptedException,
+                       ElementNotInteractableException, TimeoutException)
+IMAP_TRANSIENT_ERRORS = (imaplib.IMAP4.abort, OSError)
+LOGIN_RETRY = RetryPolicy(attempts=3, base_delay=1.0, max_delay=8.0,
+                          retry_on=(WebDriverException,) + IMAP_TRANSIENT_ERRORS,
+                          give_up_on=(InvalidSessionIdException, NoSuchWindowException))
+EMAIL_POLL_RETRY = RetryPolicy(attempts=6, base_delay=1.0, max_delay=10.0, retry_on=IMAP_TRANSIENT_ERRORS)
+OTP_RETRY = RetryPolicy(attempts=3, base_delay=2.0, max_delay=10.0, retry_on=IMAP_TRANSIENT_ERRORS)
+CLICK_RETRY = RetryPolicy(attempts=3, base_delay=0.25, max_delay=2.0, retry_on=TRANSIENT_UI_ERRORS)
+
 #class ScreenshotHandler
 class ScreenshotHandler:
     """
@@ -68,7 +122,17 @@ class ScreenshotHandler:
         os.makedirs(self.success_dir, exist_ok=True)
         os.makedirs(self.failure_dir, exist_ok=True)
 
-    def take_screenshot(self, driver, status, additional_info=""):
+    def take_screenshot(self, driver, status, additional_info="", full_page=False, element=None):
+        """
+        Capture a screenshot into the success or failure directory.
+
+        Args:
+            driver: WebDriver instance
+            status: "success" or any failure status
+            additional_info: Context appended to the file name
+            full_page: Capture the whole scrollable page instead of the viewport
+            element: Capture only this element (takes precedence over full_page)
+        """
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"{status}_{additional_info}_{timestamp}.png"
@@ -77,8 +141,19 @@ class ScreenshotHandler:
             screenshot_dir = self.success_dir if status == "success" else self.failure_dir
             screenshot_path = os.path.join(screenshot_dir, filename)
 
-            # Simple screenshot without scrolling
-            driver.save_screenshot(screenshot_path)
+            if element is not None:
+                png = self.capture_element_png(driver, element)
+            elif full_page:
+                png = self.capture_full_page_png(driver)
+            else:
+                png = None
+
+            if png is None:
+                # Simple screenshot without scrolling
+                driver.save_screenshot(screenshot_path)
+            else:
+                with open(screenshot_path, 'wb') as file:
+                    file.write(png)
 
             self.logger.info(f"Screenshot saved to {screenshot_path}")
             return screenshot_path
@@ -88,6 +163,77 @@ class ScreenshotHandler:
             self.logger.debug(f"Screenshot failure details:", exc_info=True)
             return None
 
+    @staticmethod
+    def _supports_cdp(driver):
+        return hasattr(driver, "execute_cdp_cmd")
+
+    def _capture_cdp_png(self, driver, clip):
+        """Capture a clip region in one Page.captureScreenshot call, including off-viewport content."""
+        result = driver.execute_cdp_cmd("Page.captureScreenshot", {
+            "format": "png",
+            "captureBeyondViewport": True,
+            "fromSurface": True,
+            "clip": dict(clip, scale=1),
+        })
+        return base64.b64decode(result["data"])
+
+    def capture_full_page_png(self, driver):
+        """
+        Capture the whole scrollable page as PNG bytes.
+
+        Chromium browsers use a single CDP call. Firefox uses its native full page
+        command, and any other browser falls back to scrolling and stitching viewports.
+        """
+        if self._supports_cdp(driver):
+            metrics = driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+            content = metrics.get("cssContentSize") or metrics["contentSize"]
+            return self._capture_cdp_png(driver, {
+                "x": 0, "y": 0, "width": content["width"], "height": content["height"]
+            })
+        if hasattr(driver, "get_full_page_screenshot_as_png"):
+            return driver.get_full_page_screenshot_as_png()
+        return self._capture_stitched_png(driver)
+
+    def capture_element_png(self, driver, element):
+        """Capture a single element, even if it extends beyond the viewport."""
+        if self._supports_cdp(driver):
+            rect = driver.execute_script("""
+                var r = arguments[0].getBoundingClientRect();
+                return {x: r.left + window.scrollX, y: r.top + window.scrollY,
+                        width: r.width, height: r.height};
+            """, element)
+            return self._capture_cdp_png(driver, rect)
+        return element.screenshot_as_png
+
+    def _capture_stitched_png(self, driver):
+        """Fallback full page capture: scroll one viewport at a time and paste the captures together."""
+        total_height, viewport_height, original_offset = driver.execute_script(
+            "return [document.documentElement.scrollHeight, window.innerHeight, window.pageYOffset];"
+        )
+        stitched = None
+        offset = 0
+        try:
+            while offset < total_height:
+                driver.execute_script("window.scrollTo(0, arguments[0]);", offset)
+                actual_offset = driver.execute_script("return window.pageYOffset;")
+                viewport = Image.open(io.BytesIO(driver.get_screenshot_as_png()))
+
+                # Screenshots are in device pixels; scale CSS offsets accordingly
+                ratio = viewport.height / viewport_height
+                if stitched is None:
+                    stitched = Image.new("RGB", (viewport.width, int(total_height * ratio)))
+                stitched.paste(viewport, (0, int(actual_offset * ratio)))
+
+                if actual_offset + viewport_height >= total_height:
+                    break
+                offset += viewport_height
+        finally:
+            driver.execute_script("window.scrollTo(0, arguments[0]);", original_offset)
+
+        output = io.BytesIO()
+        stitched.save(output, format="PNG")
+        return output.getvalue()
+
 
 class FileHandler:
     """
@@ -156,7 +302,50 @@ class FileUploadTests(unittest.TestCase):
         cls.logger.info("Setting up test environment")
         
         try:
+            # Optionally run against the local stand-in app (and its IMAP server) instead of the live service
+            cls.local_mail = None
+            cls.local_app = None
+            if getattr(config, "USE_LOCAL_APP", False):
+                if getattr(config, "USE_LOCAL_MAIL", True):
+                    cls.local_mail = start_local_mail_server(config, cls.logger)
+                cls.local_app = start_local_app(config, cls.logger, mailer=cls.local_mail)
+
+            # Fail in seconds on a broken mailbox, app URL, download dir or driver, not minutes into a run
+            if getattr(config, "PREFLIGHT_ENABLED", True):
+                run_preflight(config, cls.logger)
+
             cls.driver = WebDriverSetup.get_driver()
+            cls.tracer = StepTracer(cls.logger)
+            # Log through a queue so file/console I/O happens off the test thread
+            cls.async_logging = None
+            if getattr(config, "ASYNC_LOGGING_ENABLED", True):
+                cls.async_logging = enable_async_logging(
+                    cls.logger, cls.tracer.run_id, step_source=cls.tracer.current_step,
+                    duplicate_interval=getattr(config, "LOG_DUPLICATE_INTERVAL", 5.0))
+            if getattr(config, "TRACE_WEBDRIVER", True):
+                cls.tracer.instrument_driver(cls.driver)
+            # Wait timeouts learned from earlier runs against the same environment
+            cls.timeouts = None
+            if getattr(config, "ADAPTIVE_TIMEOUTS_ENABLED", True):
+                cls.timeouts = AdaptiveTimeouts(cls.logger, environment_name(config))
+            cls.locators = LocatorRegistry(cls.logger, LOCATORS, timeouts=cls.timeouts)
+            cls.locators.attach(cls.driver)
+            # Steps resume when the app's XHR/fetch traffic settles instead of after fixed sleeps
+            cls.network = None
+            if getattr(config, "NETWORK_IDLE_ENABLED", True):
+                cls.network = NetworkTracker(cls.driver, cls.logger, idle_ms=getattr(config, "NETWORK_IDLE_MS", 500))
+                cls.network.start()
+            # Opt-in: read downloaded reports straight from the page instead of DOWNLOAD_DIR
+            cls.download_capture = None
+            if getattr(config, "DOWNLOAD_CAPTURE_ENABLED", False):
+                cls.download_capture = DownloadCapture(cls.driver, cls.logger,
+                                                       timeout=getattr(config, "DOWNLOAD_CAPTURE_TIMEOUT", 30))
+            cls.webdriver_profiler = None
+            if getattr(config, "WEBDRIVER_PROFILER_ENABLED", False):
+                cls.webdriver_profiler = WebDriverProfiler(cls.logger, tracer=cls.tracer)
+                cls.webdriver_profiler.enable(cls.driver)
+            # Hard per-step time limits; a hung browser is replaced instead of stalling the suite
+            cls.watchdog = StepWatchdog(cls.logger) if getattr(config, "STEP_WATCHDOG_ENABLED", True) else None
             cls.wait = WebDriverWait(cls.driver, 20)
             cls.screenshot_handler = ScreenshotHandler(cls.logger)
             cls.sign_in_handler = SignInHandler(
@@ -168,9 +357,49 @@ class FileUploadTests(unittest.TestCase):
                 app_password=config.APP_PASSWORD,
                 sender_email=config.SENDER_EMAIL
             )
+            if cls.local_mail:
+                # SignInHandler only knows IMAP_SERVER (port 993); read OTPs from the stand-in's store
+                cls.local_mail.attach(cls.sign_in_handler, config.EMAIL_ADDRESS)
             
             # Initialize file handler
             cls.file_handler = FileHandler(cls.logger)
+
+            # Upload either the configured file or a generated fixture of the requested size
+            cls.upload_file_path = config.FILE_PATH
+            generated_lines = getattr(config, "GENERATED_FIXTURE_LINES", None)
+            if generated_lines:
+                generator = FixtureGenerator(seed=getattr(config, "GENERATED_FIXTURE_SEED", 0),
+                                             issue_density=getattr(config, "GENERATED_FIXTURE_DENSITY", 0.3))
+                cls.upload_file_path = generator.ensure_fixtures(GENERATED_FIXTURE_DIR, [generated_lines])[0]
+                cls.logger.info(f"Using generated {generated_lines}-line fixture: {cls.upload_file_path}")
+
+            # Per-run metrics history for rolling baselines (python results_store.py check)
+            cls.results = None
+            cls.run_failed = False
+            if getattr(config, "RESULTS_STORE_ENABLED", True):
+                cls.results = ResultsStore(getattr(config, "RESULTS_DB", None))
+                cls.results.start_run(cls.tracer.run_id, "File_Upload", environment_name(config),
+                                      os.path.basename(cls.upload_file_path))
+
+            # Optional continuous screencast (replaces per-step screenshots for run history)
+            cls.screencast_recorder = None
+            if getattr(config, "SCREENCAST_ENABLED", False):
+                cls.screencast_recorder = ScreencastRecorder(
+                    cls.driver,
+                    cls.logger,
+                    fps=getattr(config, "SCREENCAST_FPS", 2),
+                    max_width=getattr(config, "SCREENCAST_MAX_WIDTH", 960),
+                    max_height=getattr(config, "SCREENCAST_MAX_HEIGHT", 540),
+                    video_format=getattr(config, "SCREENCAST_FORMAT", "webp")
+                )
+
+            # Optional visual regression checks against stored baselines
+            cls.visual_regression = None
+            if getattr(config, "VISUAL_REGRESSION_ENABLED", False):
+                cls.visual_regression = VisualRegressionEngine(
+                    cls.logger,
+                    max_diff_percentage=getattr(config, "VISUAL_MAX_DIFF_PERCENTAGE", 0.0)
+                )
             
             cls.logger.info("Test environment setup completed successfully")
             
@@ -184,35 +413,165 @@ class FileUploadTests(unittest.TestCase):
             cls.logger.info("Tearing down WebDriver after tests")
             cls.logger.info("Waiting for 15 seconds before quitting WebDriver")
             time.sleep(15)
+            if getattr(cls, 'visual_regression', None):
+                cls.visual_regression.shutdown()
+            if getattr(cls, 'webdriver_profiler', None):
+                cls.webdriver_profiler.log_report(limit=getattr(config, "WEBDRIVER_PROFILER_TOP_N", 20))
+                cls.webdriver_profiler.write_report(
+                    os.path.join(cls.tracer.output_dir, f"{cls.tracer.run_id}.webdriver_profile.json"))
+            if getattr(cls, 'locators', None):
+                cls.locators.log_stats()
+            if getattr(cls, 'timeouts', None):
+                cls.timeouts.record_spans(cls.tracer.finished_spans("step"), prefix="step.")
+                cls.timeouts.save()
+                cls.timeouts.log_summary()
+            if getattr(cls, 'tracer', None):
+                cls.tracer.close()
+            if getattr(cls, 'results', None):
+                cls.record_run_results()
+            if getattr(cls, 'network', None):
+                cls.network.stop()
             if hasattr(cls, 'driver') and cls.driver:
                 cls.driver.quit()
                 cls.logger.info("WebDriver quit successfully.")
             else:
                 cls.logger.warning("WebDriver was not initialized.")
+            if getattr(cls, 'local_app', None):
+                cls.local_app.stop()
+            if getattr(cls, 'local_mail', None):
+                cls.local_mail.stop()
         except Exception as e:
             cls.logger.error(f"Error during teardown: {e}")
+        finally:
+            if getattr(cls, 'async_logging', None):
+                cls.async_logging.stop()
+
+    @classmethod
+    def record_run_results(cls):
+        """Store the run's step metrics and trace sizes, then log regressions against earlier runs."""
+        run_id = cls.tracer.run_id
+        try:
+            cls.results.record_tracer(run_id, cls.tracer)
+            if getattr(cls, 'locators', None):
+                cls.results.record_locator_stats(run_id, cls.locators.stats())
+            cls.results.record(run_id, "artifact_bytes.trace",
+                               (file_size(cls.tracer.jsonl_path) or 0) + (file_size(cls.tracer.trace_path) or 0))
+            cls.results.finish_run(run_id, passed=not cls.run_failed)
+            for regression in cls.results.detect_regressions(run_id):
+                cls.logger.warning(f"Regression against rolling baseline: {regression}")
+            if getattr(config, "DASHBOARD_ENABLED", True):
+                DashboardBuilder(cls.logger, cls.results.path).build()
+        except Exception as e:
+            cls.logger.error(f"Failed to record run results: {e}")
+
+    def record_result(self, name, value, step="", factor=""):
+        """Store one metric for this run in the results store, if enabled."""
+        if getattr(self, "results", None):
+            self.results.record(self.tracer.run_id, name, value, step=step, factor=factor)
+
+    def setUp(self):
+        # Per-test time budget shared by every retry_call in the test
+        self.addCleanup(Deadline(getattr(config, "TEST_DEADLINE", 1800)).activate())
+        set_test_id(self.id())
+        self.addCleanup(set_test_id, None)
+
+    def step_timeout(self, key, default, step):
+        """Time limit in seconds for a watchdog-guarded step: config override, else learned."""
+        configured = getattr(config, key, None)
+        if configured is not None:
+            return configured
+        timeouts = getattr(self, "timeouts", None)
+        # A wider margin than for single waits: an overrun kills and replaces the browser
+        return timeouts.timeout(f"step.{step}", default, margin=3.0) if timeouts else default
+
+    def timed_wait(self, name, default_timeout):
+        """WebDriverWait whose timeout and poll interval are learned from earlier runs."""
+        timeouts = getattr(self, "timeouts", None)
+        if timeouts is None:
+            return WebDriverWait(self.driver, default_timeout)
+        return timeouts.wait(self.driver, name, default_timeout)
+
+    def wait_for_network_idle(self, name, default_timeout, idle_ms=None):
+        """
+        Wait until the app has had no request in flight for ``idle_ms`` (learned timeout).
+
+        Without a network tracker this falls back to waiting for ``document.readyState``.
+        A page that never settles is logged and the step carries on; its own element
+        waits still guard it.
+
+        Returns:
+            bool: True if the page went idle in time
+        """
+        network = getattr(self, "network", None)
+        if network is None:
+            self.timed_wait(name, default_timeout).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+            return True
+
+        timeouts = getattr(self, "timeouts", None)
+        timeout = timeouts.timeout(name, default_timeout) if timeouts else default_timeout
+        started = time.perf_counter()
+        if network.wait_for_idle(idle_ms, timeout):
+            if timeouts:
+                timeouts.record(name, time.perf_counter() - started)
+            return True
+        if timeouts:
+            timeouts.record_timeout(name, timeout, default_timeout)
+        self.logger.warning(f"Network not idle after {timeout}s ({name}): {network.in_flight()} request(s) "
+                            f"in flight {network.pending_urls()[:5]}")
+        return False
 
+    def recover_driver(self):
+        """
+        Replace a hung WebDriver with a fresh, logged-in session.
+
+        Rewires every helper holding the old driver so later steps run on the new one.
+        """
+        owner = self if "driver" in vars(self) else type(self)
+        try:
+            owner.driver.quit()
+        except Exception as e:
+            self.logger.warning(f"Old driver did not quit cleanly: {e}")
+
+        owner.driver = WebDriverSetup.get_driver()
+        if getattr(self, "tracer", None) and getattr(config, "TRACE_WEBDRIVER", True):
+            self.tracer.instrument_driver(owner.driver)
+        self.locators.attach(owner.driver)
+        if getattr(self, "network", None):
+            self.network.stop()
+            self.network.driver = owner.driver
+            self.network.start()
+        if getattr(self, "download_capture", None):
+            self.download_capture.driver = owner.driver
+        if getattr(self, "screencast_recorder", None):
+            self.screencast_recorder.rebind(owner.driver)
+        if getattr(self, "webdriver_profiler", None):
+            self.webdriver_profiler.disable()
+            self.webdriver_profiler.enable(owner.driver)
+        owner.wait = WebDriverWait(owner.driver, 20)
+        self.sign_in_handler.driver = owner.driver
+        self.sign_in_handler.wait = owner.wait
+
+        self.driver.get(config.LOGIN_URL)
+        if not self.handle_login():
+            self.logger.error("Login failed on the recovered driver")
+
+    @traced()
     def handle_login(self):
         """Handle the login process"""
-        max_retries = 3
-        retry_delay = 5  # seconds
+        try:
+            logged_in = retry_call(self.sign_in_handler.handle_login, policy=LOGIN_RETRY,
+                                   logger=self.logger, description="Login")
+        except Exception as e:
+            self.logger.error(f"Error during login: {e}")
+            self.take_screenshot("failure", "login_error")
+            return False
 
-        for attempt in range(max_retries):
-            try:
-                message_div_xpath = "//div[contains(@class, 'message-class')]//span"
-                if self.sign_in_handler.handle_login():
-                    self.logger.info("Login successful")
-                    return True
-                return False
-            except Exception as e:
-                self.logger.warning(f"Login attempt {attempt + 1} failed: {e}")
-                if attempt < max_retries - 1:
-                    self.logger.info(f"Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                else:
-                    self.logger.error(f"Error during login after {max_retries} attempts: {e}")
-                    self.take_screenshot("failure", "login_error")
-                    return False
+        if logged_in:
+            self.logger.info("Login successful")
+            return True
+        return False
 
     def resend_otp(self):
         """Handle the OTP resend process"""
@@ -227,6 +586,7 @@ class FileUploadTests(unittest.TestCase):
         except Exception as e:
             self.logger.error(f"Error during OTP resend: {e}")
 
+    @traced()
     def handle_factor_selection(self, factor):
         try:
             div_xpath = "//div[contains(@class, 'cursor-pointer') and .//div[text()='Factors']]"
@@ -243,7 +603,7 @@ class FileUploadTests(unittest.TestCase):
             else:
                 self.logger.info("Arrow is already Up! Dropdown already expanded")
 
-            factor_label = WebDriverWait(self.driver, 10).until(
+            factor_label = self.timed_wait("factor_label", 10).until(
                 EC.presence_of_element_located((By.XPATH, f"//label[normalize-space()='{factor}']"))
             )
             self.logger.info(f"Found factor label for '{factor}', preparing to click...")
@@ -257,12 +617,11 @@ class FileUploadTests(unittest.TestCase):
             self.screenshot_handler.take_screenshot(self.driver, "failure", "factor_selection_error")
             return False
 
+    @traced()
     def handle_file_upload(self, file_path):
         try:
             self.logger.info("Searching for file input element...")
-            file_input = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, "//input[@type='file']"))
-            )
+            file_input = self.locators.wait_for("file_input")
             self.logger.info("File input element found successfully")
             time.sleep(7)
             self.logger.info(f"Attempting to upload file: {file_path}")
@@ -305,20 +664,19 @@ class FileUploadTests(unittest.TestCase):
             self.logger.error(f"Error extracting severity counts: {e}")
             return Counter()
 
+    @traced()
     def handle_submit(self, factor):
         try:
-            self.logger.info("Waiting for page to be fully loaded...")
-            WebDriverWait(self.driver, 10).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
-            self.logger.info("Page fully loaded, searching for submit button...")
+            self.logger.info("Waiting for the page's requests to settle...")
+            self.wait_for_network_idle("page_ready", 10)
+            self.logger.info("Page settled, searching for submit button...")
 
-            submit_image = WebDriverWait(self.driver, 100).until(
-                EC.element_to_be_clickable((By.XPATH, "//img[contains(@alt,'Submit')]"))
-            )
+            submit_image = self.locators.wait_for("submit_button", timeout=100, condition=EC.element_to_be_clickable)
             self.logger.info("Submit button found and clickable")
 
             submit_image.click()
+            # Latency measurements start at the click, not after the logging and screenshot below
+            self.submitted_at = time.perf_counter()
             self.logger.info(f"Successfully clicked submit button for factor: '{factor}'")
             self.screenshot_handler.take_screenshot(self.driver, "success", "submit_click")
             return True
@@ -327,6 +685,7 @@ class FileUploadTests(unittest.TestCase):
             self.screenshot_handler.take_screenshot(self.driver, "failure", "submit_error")
             return False
 
+    @watchdog_step("SPINNER_CHECK_TIMEOUT", 600, failed_result=None)
     def check_spinner_and_message_visibility(self):
         """Continuously check if the spinner is visible and log the message element if present.
         Returns the last logged message when the spinner disappears.
@@ -335,11 +694,12 @@ class FileUploadTests(unittest.TestCase):
             previous_message = None
             last_logged_message = None
             spinner_xpath = "//span[@style='display: inherit;']"
-            message_div_xpath = "//div[contains(@class, 'p-4 rounded-[10px] border')]//p"
+            message_div_xpath = PROGRESS_MESSAGE_XPATH
 
             while True:
                 try:
-                    # Use WebDriverWait to handle stale elements for spinner check
+                    # Use WebDriverWait to handle stale elements for spinner check. Not a learned
+                    # wait: timing out is how this probe sees the spinner go, not a slow page
                     spinner_visible = len(WebDriverWait(self.driver, 3).until(
                         EC.presence_of_all_elements_located((By.XPATH, spinner_xpath))
                     )) > 0
@@ -377,19 +737,24 @@ class FileUploadTests(unittest.TestCase):
             self.logger.error(f"Error in check_spinner_and_message_visibility: {e}")
             return None
 
+    def is_spinner_visible(self):
+        """True while the processing spinner is shown."""
+        try:
+            return len(self.locators.find_all("processing_spinner")) > 0
+        except NoSuchElementException:
+            return False
+
+    @traced()
+    @watchdog_step("WAIT_FOR_PROCESSING_TIMEOUT", 900)
     def wait_for_processing(self):
         try:
-            spinner_xpath = "//span[@class='loading spinner spinner-container text-white loading-md']"
             spinner_visible = True  # Initialize spinner visibility
 
             while spinner_visible:
-                try:
-                    spinner_visible = len(self.driver.find_elements(By.XPATH, spinner_xpath)) > 0
-                    if spinner_visible:
-                        last_logged_message = self.check_spinner_and_message_visibility()
-                        time.sleep(3)  # Wait before checking again
-                except NoSuchElementException:
-                    spinner_visible = False  # Exit the loop if the spinner is not found
+                spinner_visible = self.is_spinner_visible()
+                if spinner_visible:
+                    last_logged_message = self.check_spinner_and_message_visibility()
+                    time.sleep(3)  # Wait before checking again
 
             time.sleep(5)  # Wait for additional processing time
             return True
@@ -398,6 +763,52 @@ class FileUploadTests(unittest.TestCase):
             self.logger.error(f"Error while waiting for processing: {e}")
             return False
 
+    def measure_processing_latency(self, submitted_at, timeout=900, poll_interval=0.25):
+        """
+        Polls the page after a submit and timestamps each processing milestone.
+
+        Results and upload errors are checked on every poll, so processing that finishes
+        before the first poll (or fails without ever showing the spinner) still ends the wait.
+
+        Args:
+            submitted_at: time.perf_counter() value taken at the submit click
+                          (``handle_submit`` stores it as ``self.submitted_at``)
+            timeout: Maximum time to wait for results in seconds (default: 900)
+            poll_interval: Delay between DOM checks in seconds (default: 0.25)
+
+        Returns:
+            dict: Seconds from submit to "first_progress", "spinner_gone" and
+                  "results_rendered" (None for milestones that were not reached or
+                  fell between two polls), plus "error" set to True if an upload
+                  error message was shown
+        """
+        milestones = {"first_progress": None, "spinner_gone": None, "results_rendered": None, "error": False}
+        deadline = submitted_at + timeout
+
+        while time.perf_counter() < deadline:
+            now = time.perf_counter() - submitted_at
+            try:
+                spinner_visible = self.is_spinner_visible()
+                if milestones["first_progress"] is None and (
+                        spinner_visible or self.locators.find_all("progress_message")):
+                    milestones["first_progress"] = now
+
+                if not spinner_visible:
+                    if milestones["first_progress"] is not None and milestones["spinner_gone"] is None:
+                        milestones["spinner_gone"] = now
+                    if self.locators.find_all("results_table_rows"):
+                        milestones["results_rendered"] = time.perf_counter() - submitted_at
+                        return milestones
+                if self.check_error_messages():
+                    milestones["error"] = True
+                    return milestones
+            except StaleElementReferenceException:
+                pass
+            time.sleep(poll_interval)
+
+        self.logger.error(f"Processing milestones not reached within {timeout} seconds: {milestones}")
+        return milestones
+
     def check_error_messages(self):
         try:
             paragraphs1 = self.driver.find_elements(By.XPATH,
@@ -419,11 +830,16 @@ class FileUploadTests(unittest.TestCase):
             self.logger.error(f"Error checking error messages: {e}")
             return True
 
-    def process_table_data(self, expected_rows):
-        """Processes and validates table data, including testing issue links."""
+    def process_table_data(self, expected_rows, view="overview"):
+        """Processes and validates table data, including testing issue links.
+
+        Args:
+            expected_rows (int): Row count shown on the severity tab, or None
+            view (str): Severity tab (or "overview") the table belongs to; keeps baselines apart
+        """
         try:
-            table_body = self.driver.find_element(By.XPATH, "//table[@class='table-auto w-full overflow-x-auto']/tbody")
-            rows = table_body.find_elements(By.XPATH, ".//tr")
+            table_body = self.locators.wait_for("results_table_body")
+            rows = table_body.find_elements(By.CSS_SELECTOR, "tr")
             row_cnt, all_data_present = 0, True
 
             for row in rows:
@@ -443,14 +859,14 @@ class FileUploadTests(unittest.TestCase):
                 current_issue_id = issue_id
 
                 # Click the issue link
-                self.logger.info(f"Clicking issue link for Issue {current_issue_id}")
+                self.logger.info("Clicking issue link for Issue %s", current_issue_id)
                 issue_link.click()
                 time.sleep(1)  # Brief wait for the UI to update
 
                 # Verify the corresponding issue details are displayed
                 try:
                     # Wait for and verify the issue details section
-                    issue_details = WebDriverWait(self.driver, 10).until(
+                    issue_details = self.timed_wait("issue_details", 10).until(
                         EC.presence_of_element_located((
                             By.XPATH,
                             f"//div[contains(@class, 'text-[14px] sm:text-[20px]')]//p[@id='{current_issue_id}']"
@@ -471,7 +887,9 @@ class FileUploadTests(unittest.TestCase):
                 self.logger.info("Row count matches successfully")
 
             screenshot_name = "success_data_check" if all_data_present else "failure_data_check"
-            self.take_screenshot(screenshot_name, "Data validation result")
+            screenshot_path = self.take_screenshot(screenshot_name, "Data validation result", full_page=True)
+            self.check_visual_regression(
+                f"results_table_{getattr(self, 'selected_factor', '')}_{view}_{row_cnt}", screenshot_path)
             return all_data_present
 
         except Exception as e:
@@ -482,8 +900,7 @@ class FileUploadTests(unittest.TestCase):
     def process_issue_details(self):
         """Extracts and validates issue details."""
         try:
-            issue_divs = self.driver.find_elements(By.XPATH,
-                                                   "//div[contains(@class, 'text-[14px] sm:text-[20px] flex flex-col gap-4 my-5')]")
+            issue_divs = self.locators.find_all("issue_detail_blocks")
 
             for div in issue_divs:
                 try:
@@ -533,12 +950,14 @@ class FileUploadTests(unittest.TestCase):
             self.take_screenshot("failure_issue_processing", "Error processing issue details")
             return False
 
-    def take_screenshot(self, status, additional_info=""):
+    def take_screenshot(self, status, additional_info="", full_page=False, element=None):
         """Take a screenshot with proper naming and directory structure
         
         Args:
             status (str): Status of the test (success/failure)
             additional_info (str): Additional context for the screenshot name
+            full_page (bool): Capture the whole page in one call instead of the viewport
+            element: Optional element to clip the screenshot to
         """
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -551,13 +970,33 @@ class FileUploadTests(unittest.TestCase):
             screenshot_path = os.path.join(screenshot_dir, filename)
             
             # Take the screenshot
-            self.driver.save_screenshot(screenshot_path)
+            if element is not None or full_page:
+                png = (self.screenshot_handler.capture_element_png(self.driver, element) if element is not None
+                       else self.screenshot_handler.capture_full_page_png(self.driver))
+                with open(screenshot_path, 'wb') as file:
+                    file.write(png)
+            else:
+                self.driver.save_screenshot(screenshot_path)
             self.logger.info(f"Screenshot saved to {screenshot_path}")
             return screenshot_path
         except Exception as e:
             self.logger.error(f"Failed to take screenshot: {str(e)}")
             return None
 
+    def check_visual_regression(self, name, screenshot_path):
+        """Queue a baseline comparison for a screenshot when visual regression is enabled.
+
+        Args:
+            name (str): Baseline name of the page or element
+            screenshot_path (str): Path of the screenshot to compare
+        """
+        if not self.visual_regression:
+            return
+        # Masks are configured per baseline name prefix, e.g. {"results_table": [(x, y, w, h)]}
+        masks = [region for prefix, regions in getattr(config, "VISUAL_REGRESSION_MASKS", {}).items()
+                 if name.startswith(prefix) for region in regions]
+        self.visual_regression.submit(name, screenshot_path, masks=masks)
+
     def handle_like_dislike_functionality(self):
         """
         Handles the like/dislike functionality.
@@ -566,7 +1005,7 @@ class FileUploadTests(unittest.TestCase):
             self.logger.info("Starting like/dislike functionality testing")
 
             # Wait for the container div to be present
-            container = WebDriverWait(self.driver, 10).until(
+            container = self.timed_wait("feedback_container", 10).until(
                 EC.presence_of_element_located((
                     By.XPATH,
                     "//div[contains(@class, 'flex items-center') and .//span[contains(text(), 'Is this analysis useful')]]"
@@ -578,7 +1017,7 @@ class FileUploadTests(unittest.TestCase):
             time.sleep(1)  # Wait for scroll to complete
 
             # Find the like button within the container
-            like_button = WebDriverWait(self.driver, 10).until(
+            like_button = self.timed_wait("like_button", 10).until(
                 EC.element_to_be_clickable((
                     By.XPATH,
                     "//img[contains(@src, 'data:image/png;base64') and contains(@class, 'cursor-pointer')]"
@@ -595,7 +1034,7 @@ class FileUploadTests(unittest.TestCase):
             time.sleep(5)
 
             # Find and click the dislike button
-            dislike_button = WebDriverWait(self.driver, 10).until(
+            dislike_button = self.timed_wait("dislike_button", 10).until(
                 EC.element_to_be_clickable((
                     By.XPATH,
                     "//img[contains(@src, 'data:image/png;base64') and @class='h-[20.36px] w-[22px] cursor-pointer']"
@@ -652,6 +1091,7 @@ class FileUploadTests(unittest.TestCase):
             self.logger.error(f"Error extracting severity counts from downloaded file: {e}")
             return Counter()
 
+    @traced()
     def handle_download(self):
         """
         Handles the download functionality with improved error handling and validation.
@@ -664,40 +1104,42 @@ class FileUploadTests(unittest.TestCase):
             time.sleep(2)  # Wait for the scroll to complete
 
             # Find and click the download button
-            download_button = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, "//div[span[text()='Download HTML']]/button"))
-            )
+            download_button = self.locators.wait_for("download_html_button")
             self.driver.execute_script("arguments[0].scrollIntoView(true);", download_button)
             time.sleep(2)  # Wait for the scroll to complete
 
             # Ensure the button is clickable
-            WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable(download_button))
-            download_button.click()  # Click the download button
+            self.timed_wait("download_clickable", 10).until(EC.element_to_be_clickable(download_button))
+            report = self.download_report(download_button.click)
             self.logger.info("Successfully clicked download button")
-
-            time.sleep(10)  # LONG_TIMEOUT - adjust value as needed
-            # Wait for download to complete and get the file path
-            downloaded_file = self.get_latest_file(config.DOWNLOAD_DIR, ".html")
-            if not downloaded_file:
+            if not report:
                 self.logger.error("No downloaded file found after clicking the download button.")
                 return False
 
-            self.logger.info(f"Downloaded file: {downloaded_file}")
+            self.logger.info(f"Downloaded file: {report.path or report.filename}")
 
-            # Verify file exists and is not empty
-            if not self.check_file_empty(downloaded_file):
-                self.logger.error(f"Downloaded file '{downloaded_file}' is empty or invalid.")
+            # Verify the report is not empty
+            if not report.size:
+                self.logger.error(f"Downloaded file '{report.filename}' is empty or invalid.")
                 return False
 
-            # Read the content of the downloaded file
-            with open(downloaded_file, 'r', encoding='utf-8') as file:
-                html_content = file.read()
+            html_content = report.text
 
             # Extract severity counts from the downloaded HTML content
             severity_counts = self.get_downloaded_severity_counts(html_content)
 
             # Get severity counts from UI
             ui_severity_counts = self.get_ui_severity_counts()
+            if not severity_counts and ui_severity_counts:
+                self.logger.error(f"No issues found in downloaded report '{report.filename}' "
+                                  f"although the results show {sum(ui_severity_counts.values())}")
+                return False
+
+            factor = getattr(self, "selected_factor", "")
+            for severity, count in severity_counts.items():
+                self.record_result(f"severity.{severity}", count, factor=factor)
+            self.record_result("issue_count", sum(severity_counts.values()), factor=factor)
+            self.record_result("artifact_bytes.report", report.size, factor=factor)
 
             # Verify severity counts in downloaded content
             for severity, count in severity_counts.items():
@@ -708,43 +1150,42 @@ class FileUploadTests(unittest.TestCase):
 
             self.logger.info("Severity counts match between UI and downloaded content")
 
-            buttons = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'flex bg-white')]//button")
+            buttons = self.locators.find_all("severity_buttons")
 
             # Download individual severity reports
-            downloaded_files = []
+            severity_reports = []
             for button in buttons:
                 if not button.get_attribute('disabled'):
                     button_text = button.text.split("\n")[0]
-                    self.logger.info(f"Clicking on enabled button: {button_text}")
+                    self.logger.info("Clicking on enabled button: %s", button_text)
                     button.click()
                     time.sleep(2)  # Wait for content to load
 
                     # Find and click the download button for this severity
-                    download_button = WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.XPATH, "//div[span[text()='Download HTML']]/button"))
-                    )
+                    download_button = self.locators.wait_for("download_html_button")
                     self.driver.execute_script("arguments[0].scrollIntoView(true);", download_button)
                     time.sleep(1)
 
-                    WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable(download_button))
-                    download_button.click()
+                    self.timed_wait("severity_download_clickable", 10).until(EC.element_to_be_clickable(download_button))
+                    new_report = self.download_report(download_button.click)
                     self.logger.info(f"Clicked download button for severity: {button_text}")
 
-                    time.sleep(10)  # Wait for download
-
-                    # Get and verify the downloaded file
-                    new_file = self.get_latest_file(config.DOWNLOAD_DIR, ".html")
-                    if new_file and new_file not in downloaded_files:
-                        downloaded_files.append(new_file)
-                        self.logger.info(f"Added downloaded file to list: {new_file}")
+                    # A report read from disk must be a new file, not the previous download again
+                    if new_report and (new_report.path is None
+                                       or new_report.path not in {r.path for r in severity_reports}):
+                        severity_reports.append(new_report)
+                        self.logger.info(f"Added downloaded file to list: {new_report.path or new_report.filename}")
                     else:
                         self.logger.error("Failed to find new downloaded file.")
 
+            self.record_result("artifact_bytes.severity_reports",
+                               sum(r.size for r in severity_reports), factor=factor)
+
             # Compare downloaded reports if we have at least 2 files
-            if len(downloaded_files) >= 2:
+            if len(severity_reports) >= 2:
                 self.logger.info("Comparing downloaded reports...")
-                content1 = self.convert_html_to_text(downloaded_files[0])
-                content2 = self.convert_html_to_text(downloaded_files[1])
+                content1 = self.html_to_text(severity_reports[0].text)
+                content2 = self.html_to_text(severity_reports[1].text)
 
                 if content1 and content2:
                     if content1 == content2:
@@ -770,6 +1211,24 @@ class FileUploadTests(unittest.TestCase):
             self.logger.error(f"Error during download process: {str(e)}")
             return False
 
+    def download_report(self, click, wait_seconds=10):
+        """
+        Start a download with ``click`` and return the report, or None if none arrived.
+
+        With download capture enabled the bytes come straight from the page; otherwise the
+        browser saves the file to DOWNLOAD_DIR and it is read back from there.
+
+        Returns:
+            CapturedDownload: ``path`` is set only for a file read from disk
+        """
+        download_capture = getattr(self, "download_capture", None)
+        if download_capture:
+            return download_capture.capture(click)
+        click()
+        time.sleep(wait_seconds)  # Wait for the browser to finish writing the file
+        path = self.get_latest_file(config.DOWNLOAD_DIR, ".html")
+        return CapturedDownload.from_file(path) if path else None
+
     def get_latest_file(self, download_dir, file_extension=None, timeout=30):
         """
         Get the latest downloaded file with improved error handling
@@ -800,25 +1259,19 @@ class FileUploadTests(unittest.TestCase):
             time.sleep(1)
         return None
 
-    def check_file_empty(self, file_path):
-        """Check if the file exists and is not empty"""
-        try:
-            return os.path.exists(file_path) and os.path.getsize(file_path) > 0
-        except Exception:
-            return False
-
     def convert_html_to_text(self, file_path):
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
-                html_content = file.read()
-                soup = BeautifulSoup(html_content, 'html.parser')
-                text_content = soup.get_text(strip=True)
+                text_content = self.html_to_text(file.read())
                 self.logger.info(f"Successfully converted HTML content from {file_path} to text")
                 return text_content
         except Exception as e:
             self.logger.error(f"Error reading or parsing HTML file: {e}")
             return None
 
+    def html_to_text(self, html_content):
+        return BeautifulSoup(html_content, 'html.parser').get_text(strip=True)
+
     def log_error_with_screenshot(self, message, screenshot_context="error"):
         """
         Logs an error message and captures a screenshot.
@@ -829,59 +1282,47 @@ class FileUploadTests(unittest.TestCase):
         self.logger.error(message)
         self.take_screenshot("failure", screenshot_context)
 
+    @traced()
     def verify_analysis_completion_email(self, factor):
         """
-        Verifies if the analysis completion email is received with up to 3 retry attempts.
+        Verifies that the analysis completion email was received, polling the inbox with
+        exponential backoff (EMAIL_POLL_RETRY).
         """
-        max_attempts = 3
-        delay_between_attempts = 10  # seconds
-
+        expected_subject = f"Tell us what you think of {factor} analysis"
         self.logger.info(f"Checking for analysis completion email for factor: {factor}")
 
-        for attempt in range(max_attempts):
-            try:
-                self.logger.info(f"Attempt {attempt + 1} of {max_attempts}")
+        try:
+            found = retry_call(self.search_completion_email, expected_subject, policy=EMAIL_POLL_RETRY,
+                               until=bool, logger=self.logger, description="Completion email check")
+        except Exception as e:
+            self.logger.error(f"Error checking email: {e}")
+            return False
 
-                # Connect to email server
-                mail = imaplib.IMAP4_SSL(IMAP_SERVER, timeout=30)
+        if found:
+            self.logger.info(f"Found email with subject: '{expected_subject}'")
+            return True
+        self.logger.error(f"No email found with subject: '{expected_subject}'")
+        return False
+
+    def search_completion_email(self, expected_subject):
+        """Return True if the inbox holds an email from SENDER_EMAIL with ``expected_subject``."""
+        mail = None
+        try:
+            with self.tracer.span("imap.connect", category="imap"):
+                mail = imaplib.IMAP4_SSL(config.IMAP_SERVER, getattr(config, "IMAP_PORT", 993), timeout=30)
                 mail.login(EMAIL_ADDRESS, APP_PASSWORD)
                 mail.select("inbox")
 
-                # Search for the exact subject line
-                expected_subject = f"Tell us what you think of {factor} analysis"
-                search_criteria = f'(FROM "{SENDER_EMAIL}" SUBJECT "{expected_subject}")'
-
+            search_criteria = f'(FROM "{SENDER_EMAIL}" SUBJECT "{expected_subject}")'
+            with self.tracer.span("imap.search", category="imap"):
                 status, messages = mail.search(None, search_criteria.encode())
-
-                if status == "OK" and messages[0]:
-                    self.logger.info(f"Found email with subject: '{expected_subject}' on attempt {attempt + 1}")
-                    return True
-                else:
-                    self.logger.warning(f"No email found with subject: '{expected_subject}' on attempt {attempt + 1}")
-
-                    # If this isn't the last attempt, wait before trying again
-                    if attempt < max_attempts - 1:
-                        self.logger.info(f"Waiting {delay_between_attempts} seconds before next attempt...")
-                        time.sleep(delay_between_attempts)
-
-            except Exception as e:
-                self.logger.error(f"Error checking email (attempt {attempt + 1}): {e}")
-
-                # If this isn't the last attempt, wait before trying again
-                if attempt < max_attempts - 1:
-                    self.logger.info(f"Waiting {delay_between_attempts} seconds before next attempt...")
-                    time.sleep(delay_between_attempts)
-
-            finally:
-                if 'mail' in locals():
-                    try:
-                        mail.logout()
-                    except Exception as e:
-                        self.logger.warning(f"Error logging out from email: {e}")
-
-        # If we get here, all attempts failed
-        self.logger.error(f"Failed to find email after {max_attempts} attempts")
-        return False
+            return status == "OK" and bool(messages[0])
+        finally:
+            if mail is not None:
+                try:
+                    mail.logout()
+                except Exception as e:
+                    self.logger.warning(f"Error logging out from email: {e}")
 
     def extract_email_body(self, msg):
         """
@@ -943,7 +1384,7 @@ class FileUploadTests(unittest.TestCase):
             arrow_xpath = history_xpath + "/div[last()]/img"
 
             # Locate History section element
-            history_element = WebDriverWait(self.driver, 15).until(
+            history_element = self.timed_wait("history_section", 15).until(
                 EC.element_to_be_clickable((By.XPATH, history_xpath))
             )
 
@@ -952,92 +1393,50 @@ class FileUploadTests(unittest.TestCase):
         except Exception as e:
             self.logger.error(f"Error opening History section: {e}")
 
-    def compare_html_files(self, file1_path, file2_path):
-        """Compare two HTML files for equality
-        
-        Args:
-            file1_path (str): Path to first HTML file
-            file2_path (str): Path to second HTML file
-            
-        Returns:
-            bool: True if files are equal, False otherwise
-        """
-        try:
-            if not file1_path or not file2_path:
-                self.logger.error("One or both file paths are None")
-                return False
-
-            content1 = self.convert_html_to_text(file1_path)
-            content2 = self.convert_html_to_text(file2_path)
-
-            if content1 and content2:
-                return content1 == content2
-            return False
-
-        except Exception as e:
-            self.logger.error(f"Error comparing HTML files: {str(e)}")
-            return False
-
+    @traced()
     def history_analysis(self):
         """
         Analyzes the history entry with improved click handling and form interference mitigation
         """
         try:
-            # Store the first downloaded file path
-            first_download_path = None
 
            # Scroll down to ensure the download button is in view
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             time.sleep(2)  # Wait for the scroll to complete
 
             # Find and click the download button
-            download_button = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, "//div[span[text()='Download HTML']]/button"))
-            )
+            download_button = self.locators.wait_for("download_html_button")
             self.driver.execute_script("arguments[0].scrollIntoView(true);", download_button)
             time.sleep(2)  # Wait for the scroll to complete
 
             # Ensure the button is clickable
-            WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable(download_button))
-            download_button.click()  # Click the download button
+            self.timed_wait("download_clickable", 10).until(EC.element_to_be_clickable(download_button))
+            first_report = self.download_report(download_button.click)
             self.logger.info("Successfully clicked download button")
-
-            time.sleep(10)  # LONG_TIMEOUT - adjust value as needed
-            # Wait for download to complete and get the file path
-            downloaded_file = self.get_latest_file(config.DOWNLOAD_DIR, ".html")
-            if not downloaded_file:
-                self.logger.error("No downloaded file found after clicking the download button.")
-                return False
-
-            self.logger.info(f"Downloaded file: {downloaded_file}")
-
-            first_download_path = self.get_latest_file(config.DOWNLOAD_DIR, ".html", timeout=30)
-            if not first_download_path:
+            if not first_report:
                 self.logger.error("First download failed")
                 self.take_screenshot("failure", "first_download_failed")
                 return False
 
-            self.logger.info(f"First download successful: {first_download_path}")
+            self.logger.info(f"First download successful: {first_report.path or first_report.filename}")
 
             # Step 1: Open the History section and wait for any forms to load
             self.logger.info("Opening History section")
             self.open_history_section()
-            time.sleep(3)  # Increased wait time for forms to fully load
+            self.wait_for_network_idle("history_loaded", 10)
 
             # Wait for any loading forms to complete
             try:
-                WebDriverWait(self.driver, 10).until(
+                self.timed_wait("history_forms", 10).until(
                     lambda d: len(d.find_elements(By.XPATH, "//form[contains(@class, 'flex flex-col justify-around')]")) > 0
                 )
-                time.sleep(2)  # Additional wait after forms are found
             except TimeoutException:
                 self.logger.info("No interfering forms found")
 
             # Step 2: Locate all history entries
             self.logger.info("Locating history entries")
-            history_items = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_all_elements_located((By.XPATH,
-                    "//div[contains(@class, 'flex flex-col item-start gap-4')]/a"))
+            history_items = self.timed_wait("history_entries", 10).until(
+                EC.presence_of_all_elements_located(self.locators.locator("history_entries"))
             )
 
             if not history_items:
@@ -1058,7 +1457,7 @@ class FileUploadTests(unittest.TestCase):
             entry_factor = first_entry.find_element(By.XPATH, ".//span").text.strip()
 
             # Get expected values
-            actual_file = os.path.basename(config.FILE_PATH)
+            actual_file = os.path.basename(self.upload_file_path)
             actual_factor = self.selected_factor
 
             # Verify file name and factor match
@@ -1079,71 +1478,51 @@ class FileUploadTests(unittest.TestCase):
             """)
 
             # Click the entry with retry logic
-            max_click_attempts = 3
-            for attempt in range(max_click_attempts):
+            def open_entry():
+                # Try different click methods
                 try:
-                    # Try different click methods
+                    # Try regular click first
+                    first_entry.click()
+                except:
                     try:
-                        # Try regular click first
-                        first_entry.click()
+                        # Try JavaScript click if regular click fails
+                        self.driver.execute_script("arguments[0].click();", first_entry)
                     except:
-                        try:
-                            # Try JavaScript click if regular click fails
-                            self.driver.execute_script("arguments[0].click();", first_entry)
-                        except:
-                            # Try moving to element and clicking
-                            actions = ActionChains(self.driver)
-                            actions.move_to_element(first_entry).click().perform()
-
-                    # Wait for page load
-                    WebDriverWait(self.driver, 10).until(
-                        lambda d: d.execute_script("return document.readyState") == "complete"
-                    )
-                    break
-                except Exception as e:
-                    if attempt == max_click_attempts - 1:
-                        raise e
-                    time.sleep(2)
+                        # Try moving to element and clicking
+                        actions = ActionChains(self.driver)
+                        actions.move_to_element(first_entry).click().perform()
+
+                # Wait for the entry's analysis to load
+                self.wait_for_network_idle("history_entry_load", 10)
 
-            # Wait for any animations or transitions to complete
-            time.sleep(3)
+            retry_call(open_entry, policy=CLICK_RETRY, logger=self.logger, description="History entry click")
 
             # Find and click download button with retry logic
-            download_button = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, "//div[span[text()='Download HTML']]/button"))
-            )
+            download_button = self.locators.wait_for("download_html_button")
             
             # Scroll to download button
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", download_button)
             time.sleep(2)
 
             # Try to click download button with retry logic
-            for attempt in range(max_click_attempts):
-                try:
-                    self.driver.execute_script("arguments[0].click();", download_button)
-                    self.logger.info("Clicked download button for history entry")
-                    break
-                except Exception as e:
-                    if attempt == max_click_attempts - 1:
-                        raise e
-                    time.sleep(2)
-
-            # Wait for download to complete
-            time.sleep(5)
+            def click_download():
+                retry_call(self.driver.execute_script, "arguments[0].click();", download_button,
+                           policy=CLICK_RETRY, logger=self.logger, description="History download click")
+                self.logger.info("Clicked download button for history entry")
 
-            # Get the history download file
-            history_download_path = self.get_latest_file(config.DOWNLOAD_DIR, ".html", timeout=30)
-            if not history_download_path:
+            history_report = self.download_report(click_download, wait_seconds=5)
+            if not history_report:
                 self.logger.error("History download failed")
                 self.take_screenshot("failure", "history_download_failed")
                 return False
 
-            self.logger.info(f"History download successful: {history_download_path}")
+            self.logger.info(f"History download successful: {history_report.path or history_report.filename}")
 
-            # Compare the files
-            if self.compare_html_files(first_download_path, history_download_path):
+            # Compare the reports
+            first_text = self.html_to_text(first_report.text)
+            if first_text and first_text == self.html_to_text(history_report.text):
                 self.logger.info("HTML files are identical")
-                self.take_screenshot("success", "history_analysis_complete")
+                self.take_screenshot("success", "history_analysis_complete", full_page=True)
                 return True
             else:
                 self.logger.error("HTML files are different")
@@ -1176,7 +1555,7 @@ class FileUploadTests(unittest.TestCase):
             self.logger.info("Successfully clicked on logout button.")
 
             # Wait for and verify the logout success popup
-            logout_popup = WebDriverWait(self.driver, 10).until(
+            logout_popup = self.timed_wait("logout_popup", 10).until(
                 EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Logged out successfully!')]"))
             )
 
@@ -1190,7 +1569,7 @@ class FileUploadTests(unittest.TestCase):
 
             # Validate session clearance
             try:
-                sign_in_message = WebDriverWait(self.driver, 10).until(
+                sign_in_message = self.timed_wait("sign_in_message", 10).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR,
                         "body > div:nth-child(2) > div:nth-child(1) > div:nth-child(2) > div:nth-child(1) > div:nth-child(1) > div:nth-child(3)"))
                     )
@@ -1212,6 +1591,7 @@ class FileUploadTests(unittest.TestCase):
             self.take_screenshot("failure", "logout_error")
             self.fail(f"Logout failed with error: {str(e)}")
 
+    @traced()
     def handle_analysis_buttons(self):
         """
         Handles the analysis buttons, clicking only on enabled buttons.
@@ -1219,26 +1599,26 @@ class FileUploadTests(unittest.TestCase):
         try:
             self.logger.info("Starting to handle analysis buttons")
 
-            buttons = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'flex bg-white')]//button")
+            buttons = self.locators.find_all("severity_buttons")
 
             for button in buttons:
                 button_text = button.text.split("\n")[0]
                 is_disabled = button.get_attribute("disabled")
 
                 if is_disabled:
-                    self.logger.info(f"Skipping disabled button: {button_text}")
+                    self.logger.info("Skipping disabled button: %s", button_text)
                     continue
 
                 expected_rows = int(button.find_element(By.TAG_NAME, "span").text)
-                self.logger.info(f"Found notification - {button_text}: {expected_rows}")
+                self.logger.info("Found notification - %s: %s", button_text, expected_rows)
 
                 # Click the button and wait for content update
-                self.logger.info(f"Clicking on enabled button: {button_text}")
+                self.logger.info("Clicking on enabled button: %s", button_text)
                 button.click()
                 time.sleep(2)  # Wait for any potential page updates
 
                 # Process table data with expected row count
-                if not self.process_table_data(expected_rows):
+                if not self.process_table_data(expected_rows, view=button_text):
                     self.logger.error(f"Table data validation failed for {button_text}")
                     return False
 
@@ -1262,7 +1642,7 @@ class FileUploadTests(unittest.TestCase):
         """
         try:
             table_data = []
-            rows = self.driver.find_elements(By.XPATH, "//table[@class='table-auto w-full overflow-x-auto']/tbody/tr")
+            rows = self.locators.find_all("results_table_rows")
 
             for row in rows:
                 cells = row.find_elements(By.TAG_NAME, "td")
@@ -1293,7 +1673,7 @@ class FileUploadTests(unittest.TestCase):
 
             # Wait for the up arrow button with better error handling
             try:
-                up_arrow_button = WebDriverWait(self.driver, 10).until(
+                up_arrow_button = self.timed_wait("scroll_up_button", 10).until(
                     EC.presence_of_element_located((By.XPATH, up_arrow_xpath))
                 )
 
@@ -1330,16 +1710,15 @@ class FileUploadTests(unittest.TestCase):
 
     def click_element(self, element):
         """Helper function to click an element with retry logic."""
-        for _ in range(3):  # Retry up to 3 times
-            try:
-                # Scroll the element into view
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable(element)).click()
-                return
-            except Exception as e:
-                self.logger.warning(f"Click failed: {e}")
-                time.sleep(1)  # Wait before retrying
-        self.logger.error("Failed to click the element after retries.")
+        def scroll_and_click():
+            # Scroll the element into view
+            self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+            self.timed_wait("element_clickable", 10).until(EC.element_to_be_clickable(element)).click()
+
+        try:
+            retry_call(scroll_and_click, policy=CLICK_RETRY, logger=self.logger, description="Click")
+        except Exception as e:
+            self.logger.error(f"Failed to click the element after retries: {e}")
 
     def handle_otp_flow(self):
         """
@@ -1347,21 +1726,24 @@ class FileUploadTests(unittest.TestCase):
         Returns True if OTP verification is successful, False otherwise.
         """
         try:
-            max_attempts = 3
-            last_resend_time = datetime.now()
-
-            for attempt in range(max_attempts):
-                otp = self.sign_in_handler.fetch_latest_unseen_email(last_resend_time)
-                if otp:
-                    self.logger.info(f"Retrieved OTP: {otp}")
-                    if self.sign_in_handler.enter_and_verify_otp(otp):
-                        return True
-                else:
-                    self.logger.warning(f"Attempt {attempt + 1} failed to retrieve OTP.")
-                    if attempt < max_attempts - 1:
-                        self.sign_in_handler.click_resend_otp()
-                        last_resend_time = datetime.now()  # Update last resend time
-                        time.sleep(10)  # Wait before retrying
+            state = {"last_resend_time": datetime.now(), "otp": None}
+
+            def fetch_and_verify():
+                state["otp"] = self.sign_in_handler.fetch_latest_unseen_email(state["last_resend_time"])
+                if not state["otp"]:
+                    return False
+                self.logger.info(f"Retrieved OTP: {state['otp']}")
+                return self.sign_in_handler.enter_and_verify_otp(state["otp"])
+
+            def resend_if_missing(attempt, result, error):
+                # Only ask for a new OTP when none arrived; a rejected OTP is simply retried
+                if not state["otp"]:
+                    self.sign_in_handler.click_resend_otp()
+                    state["last_resend_time"] = datetime.now()
+
+            if retry_call(fetch_and_verify, policy=OTP_RETRY, until=bool, on_retry=resend_if_missing,
+                          logger=self.logger, description="OTP verification"):
+                return True
 
             self.logger.error("Failed to verify OTP after maximum attempts")
             return False
@@ -1390,22 +1772,21 @@ class FileUploadTests(unittest.TestCase):
             self.logger.info("Starting copy code functionality testing")
 
             # Locate all buttons within the specified div
-            buttons = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'flex bg-white')]//button")
+            buttons = self.locators.find_all("severity_buttons")
 
             for button in buttons:
                 button_text = button.text.split("\n")[0]
                 is_disabled = button.get_attribute("disabled")
 
                 if is_disabled:
-                    self.logger.info(f"Skipping disabled button: {button_text}")
+                    self.logger.info("Skipping disabled button: %s", button_text)
                     continue
 
-                self.logger.info(f"Clicking on enabled button: {button_text}")
+                self.logger.info("Clicking on enabled button: %s", button_text)
                 button.click()  # Click the enabled button
                 time.sleep(2)  # Wait for any potential page updates
 
-                issue_divs = self.driver.find_elements(By.XPATH,
-                                                       "//div[contains(@class, 'text-[14px] sm:text-[20px] flex flex-col gap-4 my-5')]")
+                issue_divs = self.locators.find_all("issue_detail_blocks")
                 div = issue_divs[0]
                 # Locate the code blocks after clicking the button
                 code_blocks = div.find_elements(By.XPATH, ".//pre//code")
@@ -1418,7 +1799,7 @@ class FileUploadTests(unittest.TestCase):
 
                 # Locate and click the "Copy Code" button
                 copy_button_xpath = "//button[contains(text(), 'Copy Code')]"
-                copy_button = WebDriverWait(self.driver, 10).until(
+                copy_button = self.timed_wait("copy_code_button", 10).until(
                     EC.presence_of_element_located((By.XPATH, copy_button_xpath))
                 )
 
@@ -1451,96 +1832,84 @@ class FileUploadTests(unittest.TestCase):
             self.logger.error(f"Error during copy code functionality testing: {e}")
             return False
         
+    def checked_step(self, step, description, screenshot_context, *args):
+        """Run a step method; log its success, or log its failure with a screenshot."""
+        if step(*args):
+            self.logger.info(f"{description} successful")
+            return True
+        self.log_error_with_screenshot(f"{description} failed", screenshot_context)
+        return False
+
+    def build_factor_graph(self, factor):
+        """
+        The steps for one factor as a dependency graph. Upload and processing form a chain;
+        every later step only needs the rendered results, and the completion email check
+        needs no browser at all, so it runs while the UI steps do.
+        """
+        graph = StepGraph(self.logger)
+        graph.add("factor_selection", self.checked_step, self.handle_factor_selection,
+                  f"Factor selection for {factor}", "factor_selection_failure", factor)
+        graph.add("file_upload", self.checked_step, self.handle_file_upload,
+                  f"File upload of {self.upload_file_path}", "file_upload_failure", self.upload_file_path,
+                  depends_on=("factor_selection",))
+        graph.add("submit", self.checked_step, self.handle_submit, f"Submit for factor {factor}", "submit_failure",
+                  factor, depends_on=("file_upload",))
+        graph.add("processing", self.checked_step, self.wait_for_processing, f"Processing for factor {factor}",
+                  "processing_timeout", depends_on=("submit",))
+        graph.add("completion_email", self.verify_analysis_completion_email, factor,
+                  depends_on=("processing",), driver=False)
+        for name, step, description, screenshot_context in (
+                ("analysis_buttons", self.handle_analysis_buttons, "Analysis button handling", "analysis_failed"),
+                ("like_dislike", self.handle_like_dislike_functionality, "Like/dislike functionality testing",
+                 "like_dislike_failure"),
+                ("download", self.handle_download, "Download", "download_failure"),
+                ("history", self.history_analysis, "History analysis", "history_analysis_failure"),
+                ("scroll_to_top", self.scroll_to_top, "Arrow button handling", "arrow_button_failure"),
+                ("copy_code", self.handle_copy_code_functionality, "Copy code functionality", "copy_code_failure")):
+            graph.add(name, self.checked_step, step, f"{description} for factor {factor}", screenshot_context,
+                      depends_on=("processing",))
+        return graph
+
     def test_signup_and_login(self):
         self.logger.info("Starting signup and login test")
+        screencast_marker_handler = None
+        regressions = []
+        if self.screencast_recorder and self.screencast_recorder.start(self._testMethodName):
+            screencast_marker_handler = self.screencast_recorder.marker_handler()
+            self.logger.addHandler(screencast_marker_handler)
         try:
             self.handle_login()
 
             for factor in VALID_FACTORS:
                 self.logger.info(f"=== Starting test for factor: {factor} ===")
-
-                # Factor Selection
                 # Store selected factor for history checking
                 self.selected_factor = factor
-                if not self.handle_factor_selection(factor):
-                    self.log_error_with_screenshot(f"Factor selection failed for: {factor}", "factor_selection_failure")
-                    self.logger.error(f"Factor selection failed for: {factor}")
-                else:
-                    self.logger.info(f"Factor selection successful for: {factor}")
-
-                # File Upload
-                if not self.handle_file_upload(config.FILE_PATH):
-                    self.log_error_with_screenshot(f"File upload failed for file: {config.FILE_PATH}",
-                                                   "file_upload_failure")
-                    self.logger.error(f"File upload failed for file: {config.FILE_PATH}")
-                else:
-                    self.logger.info(f"File upload successful for file: {config.FILE_PATH}")
-
-                # Submit Analysis
-                if not self.handle_submit(factor):
-                    self.log_error_with_screenshot(f"Submit operation failed for factor: {factor}", "submit_failure")
-                    self.logger.error(f"Submit operation failed for factor: {factor}")
-                else:
-                    self.logger.info(f"Submit operation successful for factor: {factor}")
-
-                # Wait for Processing
-                if not self.wait_for_processing():
-                    self.log_error_with_screenshot("Processing timeout - operation took too long", "processing_timeout")
-                    self.logger.error("Processing timeout - operation took too long")
-                else:
-                    self.logger.info("No error messages found, continuing with analysis")
-                    self.logger.info(f"Processing successful for factor: {factor}")
-
-                if not self.handle_analysis_buttons():
-                    self.log_error_with_screenshot("Analysis button handling failed", "analysis_failed")
-                    self.logger.error("Analysis button handling failed")
-                else:
-                    self.logger.info(f"Analysis button handling successful for factor: {factor}")
-
-                # Like/Dislike Functionality
-                if not self.handle_like_dislike_functionality():
-                    self.log_error_with_screenshot("Like/dislike functionality testing failed", "like_dislike_failure")
-                    self.logger.error("Like/dislike functionality testing failed")
-                else:
-                    self.logger.info(f"Like/dislike functionality testing successful for factor: {factor}")
-
-                # Download Results
-                if not self.handle_download():
-                    self.log_error_with_screenshot("Download failed", "download_failure")
-                    self.logger.error("Download failed")
-                else:
-                    self.logger.info(f"Download successful for factor: {factor}")
-
-                # History Analysis
-                if not self.history_analysis():
-                    self.log_error_with_screenshot("History analysis failed", "history_analysis_failure")
-                    self.logger.error("History analysis failed")
-                else:
-                    self.logger.info(f"History analysis successful for factor: {factor}")
-
-                # Scroll down to ensure we are not at the top
-                if not self.scroll_to_top():
-                    self.log_error_with_screenshot("Arrow button handling failed", "arrow_button_failure")
-                    self.logger.error("Arrow button handling failed")
-                else:
-                    self.logger.info(f"Arrow button handling successful for factor: {factor}")
-
-                if not self.handle_copy_code_functionality():
-                    self.log_error_with_screenshot("Copy code functionality failed", "copy_code_failure")
-                    self.logger.error("Copy code functionality failed")
-                else:
-                    self.logger.info(f"Copy code functionality successful for factor: {factor}")
-
+                report = self.build_factor_graph(factor).run()
+                report.log(self.logger, label=f"Factor {factor}")
+                self.record_result("duration_s", report.wall_seconds, factor=factor)
+                self.record_result("critical_path_s", report.critical_seconds, factor=factor)
                 self.logger.info(f"=== Completed all tests for factor: {factor} ===")
 
         except Exception as e:
+            type(self).run_failed = True
             self.log_error_with_screenshot(f"Test failed with error: {e}", "unexpected_error")
             self.logger.error(f"Test failed with error: {e}")
             raise  # Re-raise the exception to mark the test as failed
         finally:
             self.logger.info("Test execution completed")
+            if self.visual_regression:
+                regressions = [r for r in self.visual_regression.collect() if not r.passed]
+                if regressions:
+                    type(self).run_failed = True
+                    self.logger.error(f"{len(regressions)} visual regression(s) detected: {regressions}")
+            if screencast_marker_handler:
+                self.logger.removeHandler(screencast_marker_handler)
+                self.screencast_recorder.stop()
             # self.handle_logout()
 
+        if regressions:
+            self.fail(f"{len(regressions)} visual regression(s): {', '.join(r.name for r in regressions)}")
+
    
 
 
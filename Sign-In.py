@@ -14,10 +14,17 @@ from email import message_from_bytes
 from email.header import decode_header
 from datetime import datetime, timedelta
 from handlers.config_handler import ConfigHandler
+from preflight import run_preflight
+from retry import Deadline, RetryPolicy, retry_call
+from background_tasks import BackgroundTasks
 
 # Get configuration
 config = ConfigHandler.get_config()
 
+# Poll the inbox with backoff; only dropped connections are retried, not rejected credentials
+WELCOME_EMAIL_RETRY = RetryPolicy(attempts=6, base_delay=1.0, max_delay=10.0,
+                                  retry_on=(imaplib.IMAP4.abort, OSError))
+
 
 
 #class ScreenshotHandler
@@ -48,6 +55,8 @@ class AutomationTests(unittest.TestCase):
         cls.logger = Logger.setup_logger()
         cls.logger.info("Setting up WebDriver for tests")
         try:
+            if getattr(config, "PREFLIGHT_ENABLED", True):
+                run_preflight(config, cls.logger, checks=("imap", "app_url", "driver"))
             cls.driver = WebDriverSetup.get_driver()
             cls.wait = WebDriverWait(cls.driver, 20)
             cls.screenshot_handler = ScreenshotHandler(cls.logger)
@@ -72,6 +81,11 @@ class AutomationTests(unittest.TestCase):
             raise
     #setup class
     def setUp(self):
+        # Per-test time budget shared by every retry_call in the test
+        self.addCleanup(Deadline(getattr(config, "TEST_DEADLINE", 1800)).activate())
+        # The welcome email check runs here while the login is verified in the browser
+        self.background = BackgroundTasks(self.logger)
+        self.addCleanup(self.background.shutdown)
         # Take screenshot before each test
         self.screenshot_handler.take_screenshot(self.driver, "success", f"before_{self._testMethodName}")
 
@@ -149,32 +163,29 @@ class AutomationTests(unittest.TestCase):
                 self.logger.info("New email detected, signup process initiated")
 
                 if login_result.success and login_result.is_new_signup:
-                    self.logger.info("Signup successful, verifying welcome email")
-
-                    # Wait for welcome email
-                    time.sleep(10)  # Allow time for welcome email to arrive
-
-                    # Verify welcome email
-                    email_verified = self.verify_welcome_email(
-                        login_result.first_name,
-                        self.sign_in_handler.email_address
-                    )
+                    self.logger.info("Signup successful, verifying welcome email in the background")
+
+                    # Verify welcome email, allowing time for it to arrive, while the login is checked
+                    self.background.submit("welcome_email", self.verify_welcome_email,
+                                           login_result.first_name, self.sign_in_handler.email_address, delay=10)
+
+                    # Add verification of successful login
+                    self.logger.info("Verifying successful login after signup...")
+                    login_verified = self.sign_in_handler.verify_successful_login()
+                    if not login_verified:
+                        self.logger.error("Failed to verify successful login after signup")
+                        self.screenshot_handler.take_screenshot(self.driver, "failure", "login_verification_failed")
+                    else:
+                        self.logger.info("Successfully verified login after signup")
 
+                    email_verified = self.background.join()[0].ok
                     if email_verified:
                         self.screenshot_handler.take_screenshot(self.driver, "success", "welcome_email_verified")
-                        
-                        # Add verification of successful login
-                        self.logger.info("Verifying successful login after signup...")
-                        login_verified = self.sign_in_handler.verify_successful_login()
-                        if not login_verified:
-                            self.logger.error("Failed to verify successful login after signup")
-                            self.screenshot_handler.take_screenshot(self.driver, "failure", "login_verification_failed")
-                            return
-                        self.logger.info("Successfully verified login after signup")
                     else:
                         self.logger.error("Welcome email verification failed")
                         self.screenshot_handler.take_screenshot(self.driver, "failure",
                                                                 "welcome_email_verification_failed")
+                    if not (login_verified and email_verified):
                         return
                 else:
                     self.logger.error("Signup process failed")
@@ -203,87 +214,84 @@ class AutomationTests(unittest.TestCase):
             self.screenshot_handler.take_screenshot(self.driver, "failure", f"signin_exception_{str(e)[:30]}")
 
     def verify_welcome_email(self, first_name, email_address):
-        max_retries = 3
-        retry_delay = 10  # seconds
+        try:
+            found = retry_call(self.find_welcome_email, first_name, email_address, policy=WELCOME_EMAIL_RETRY,
+                               until=bool, logger=self.logger, description="Welcome email verification")
+        except imaplib.IMAP4.error as e:
+            self.logger.error(f"IMAP error during welcome email verification: {str(e)}")
+            return False
+        except Exception as e:
+            self.logger.error(f"Unexpected error during welcome email verification: {str(e)}")
+            return False
 
-        for attempt in range(max_retries):
-            mail = None
-            try:
-                self.logger.info(f"Welcome email verification attempt {attempt + 1} of {max_retries}")
-
-                mail = imaplib.IMAP4_SSL(self.sign_in_handler.imap_server)
-                mail.login(email_address, self.sign_in_handler.app_password)
-                mail.select("inbox")
-
-                # Search for recent emails (last 5 minutes)
-                date = (datetime.now() - timedelta(minutes=5)).strftime("%d-%b-%Y")
-                search_criteria = f'(FROM "{self.sign_in_handler.sender_email}" SINCE {date})'
-                status, messages = mail.search(None, search_criteria.encode())
-
-                if status != "OK" or not messages[0]:
-                    self.logger.warning(f"No emails found matching criteria on attempt {attempt + 1}")
-                    if attempt < max_retries - 1:
-                        self.logger.info(f"Waiting {retry_delay} seconds before next attempt...")
-                        time.sleep(retry_delay)
-                    continue
+        if found:
+            return True
+        self.logger.error("Welcome email verification failed after all attempts")
+        return False
 
-                # Get all recent emails and check each one
-                email_ids = messages[0].split()
-                self.logger.info(f"Found {len(email_ids)} emails to check")
-
-                for email_id in reversed(email_ids):  # Check most recent first
-                    try:
-                        status, msg_data = mail.fetch(email_id, "(RFC822)")
-
-                        if status != "OK":
-                            self.logger.error("Failed to fetch email content")
-                            continue
-
-                        email_body = msg_data[0][1]
-                        msg = message_from_bytes(email_body)
-
-                        # Get and log the subject
-                        subject = decode_header(msg["Subject"])[0][0]
-                        if isinstance(subject, bytes):
-                            subject = subject.decode()
-                        self.logger.info(f"Checking email with subject: {subject}")
-
-                        # Check for any of the expected subjects
-                        expected_subjects = [
-                            "Let's Verify Your CodeSherlock Account!",
-                            f"Welcome, {first_name}",
-                            "Welcome to CodeSherlock",
-                            "Verify Your CodeSherlock Account"
-                        ]
-
-                        if any(expected.lower() in subject.lower() for expected in expected_subjects):
-                            self.logger.info("Welcome email found with matching subject")
-                            return True
-
-                        self.logger.info(f"Subject did not match any expected patterns: {subject}")
-                    except Exception as e:
-                        self.logger.error(f"Error processing email ID {email_id}: {str(e)}")
-                        continue
+    def find_welcome_email(self, first_name, email_address):
+        """Return True if a recent email from the sender has one of the welcome subjects."""
+        mail = None
+        try:
+            mail = imaplib.IMAP4_SSL(self.sign_in_handler.imap_server, getattr(config, "IMAP_PORT", 993))
+            mail.login(email_address, self.sign_in_handler.app_password)
+            mail.select("inbox")
 
-                self.logger.warning(f"No matching welcome email found in attempt {attempt + 1}")
+            # Search for recent emails (last 5 minutes)
+            date = (datetime.now() - timedelta(minutes=5)).strftime("%d-%b-%Y")
+            search_criteria = f'(FROM "{self.sign_in_handler.sender_email}" SINCE {date})'
+            status, messages = mail.search(None, search_criteria.encode())
 
-            except imaplib.IMAP4.error as e:
-                self.logger.error(f"IMAP error during welcome email verification: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-            except Exception as e:
-                self.logger.error(f"Unexpected error during welcome email verification: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-            finally:
-                if mail:
-                    try:
-                        mail.logout()
-                    except Exception as e:
-                        self.logger.warning(f"Error during mail logout: {str(e)}")
+            if status != "OK" or not messages[0]:
+                self.logger.warning("No emails found matching criteria")
+                return False
 
-        self.logger.error("Welcome email verification failed after all attempts")
-        return False
+            # Get all recent emails and check each one
+            email_ids = messages[0].split()
+            self.logger.info(f"Found {len(email_ids)} emails to check")
+
+            for email_id in reversed(email_ids):  # Check most recent first
+                try:
+                    status, msg_data = mail.fetch(email_id, "(RFC822)")
+
+                    if status != "OK":
+                        self.logger.error("Failed to fetch email content")
+                        continue
+
+                    email_body = msg_data[0][1]
+                    msg = message_from_bytes(email_body)
+
+                    # Get and log the subject
+                    subject = decode_header(msg["Subject"])[0][0]
+                    if isinstance(subject, bytes):
+                        subject = subject.decode()
+                    self.logger.info(f"Checking email with subject: {subject}")
+
+                    # Check for any of the expected subjects
+                    expected_subjects = [
+                        "Let's Verify Your CodeSherlock Account!",
+                        f"Welcome, {first_name}",
+                        "Welcome to CodeSherlock",
+                        "Verify Your CodeSherlock Account"
+                    ]
+
+                    if any(expected.lower() in subject.lower() for expected in expected_subjects):
+                        self.logger.info("Welcome email found with matching subject")
+                        return True
+
+                    self.logger.info(f"Subject did not match any expected patterns: {subject}")
+                except Exception as e:
+                    self.logger.error(f"Error processing email ID {email_id}: {str(e)}")
+                    continue
+
+            self.logger.warning("No matching welcome email found")
+            return False
+        finally:
+            if mail:
+                try:
+                    mail.logout()
+                except Exception as e:
+                    self.logger.warning(f"Error during mail logout: {str(e)}")
 
     def _get_email_body(self, msg):
         """Helper method to extract email body from message."""
@@ -0,0 +1,75 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+def plus_alias(address, tag):
+    """``user@domain`` -> ``user+tag@domain`` (mail to the alias lands in the base mailbox)."""
+    local, _, domain = address.partition("@")
+    return f"{local.split('+')[0]}+{tag}@{domain}"
+
+
+class AccountPool:
+    """
+    Leases distinct test accounts to concurrent workers so their OTP and welcome emails
+    never collide.
+
+    Every address must deliver to the mailbox read by the shared MailRouter, e.g. plus
+    aliases of one inbox (``aliases``) or accounts forwarding to it. ``lease`` blocks
+    while all accounts are in use.
+    """
+
+    def __init__(self, addresses):
+        if not addresses:
+            raise ValueError("AccountPool needs at least one address")
+        self._free = list(dict.fromkeys(address.lower() for address in addresses))
+        self._leased = {}
+        self._condition = threading.Condition()
+
+    @classmethod
+    def aliases(cls, base_address, count, tag="worker{n}"):
+        """Pool of ``count`` plus aliases of ``base_address`` (``user+worker0@...``, ...)."""
+        return cls([plus_alias(base_address, tag.format(n=n)) for n in range(count)])
+
+    @classmethod
+    def from_config(cls, config, count):
+        """TEST_ACCOUNTS from config when set, else ``count`` aliases of EMAIL_ADDRESS."""
+        addresses = getattr(config, "TEST_ACCOUNTS", None)
+        return cls(addresses) if addresses else cls.aliases(config.EMAIL_ADDRESS, count)
+
+    @property
+    def size(self):
+        with self._condition:
+            return len(self._free) + len(self._leased)
+
+    def acquire(self, worker, timeout=None):
+        """
+        Take a free account for ``worker``.
+
+        Raises:
+            TimeoutError: If none became free within ``timeout`` seconds
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while not self._free:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No free test account for {worker} within {timeout}s")
+                self._condition.wait(remaining)
+            address = self._free.pop(0)
+            self._leased[address] = worker
+            return address
+
+    def release(self, address):
+        with self._condition:
+            if self._leased.pop(address, None) is not None:
+                self._free.append(address)
+                self._condition.notify()
+
+    @contextmanager
+    def lease(self, worker, timeout=None):
+        address = self.acquire(worker, timeout)
+        try:
+            yield address
+        finally:
+            self.release(address)
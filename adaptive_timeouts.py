@@ -0,0 +1,145 @@
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from latency_stats import percentile
+
+TIMING_HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'timing_history')
+
+
+def environment_name(config):
+    """TIMING_ENVIRONMENT from config, else the LOGIN_URL host (ports change between local runs)."""
+    name = getattr(config, "TIMING_ENVIRONMENT", None) or urlparse(getattr(config, "LOGIN_URL", "")).hostname
+    return re.sub(r"[^\w.-]", "_", name or "default")
+
+
+class AdaptiveWait:
+    """``WebDriverWait`` stand-in whose timeout and poll interval are learned; records each outcome."""
+
+    def __init__(self, timeouts, driver, name, default_timeout):
+        self.timeouts = timeouts
+        self.name = name
+        self.default_timeout = default_timeout
+        self.timeout = timeouts.timeout(name, default_timeout)
+        self._wait = WebDriverWait(driver, self.timeout, poll_frequency=timeouts.poll_interval(name))
+
+    def until(self, method, message=""):
+        started = time.perf_counter()
+        try:
+            result = self._wait.until(method, message)
+        except TimeoutException:
+            self.timeouts.record_timeout(self.name, self.timeout, self.default_timeout)
+            raise
+        self.timeouts.record(self.name, time.perf_counter() - started)
+        return result
+
+
+class AdaptiveTimeouts:
+    """
+    Learns wait timeouts from durations observed in earlier runs of the same environment.
+
+    A wait's timeout is the ``pct`` percentile of its history times ``margin`` plus
+    ``min_slack`` seconds, clamped to [``min_timeout``, ``max_factor`` x default]. Until
+    ``min_samples`` observations exist the hard-coded default is used. The poll interval is
+    a tenth of the median duration, clamped to [0.05, 0.5] s, so fast waits poll quickly.
+    A timeout under a learned limit widens that limit for the next run.
+    """
+
+    def __init__(self, logger, environment="default", history_dir=None, pct=99, margin=1.5, min_slack=1.0,
+                 min_samples=5, max_samples=200, min_timeout=1.0, max_factor=3.0):
+        self.logger = logger
+        self.environment = environment
+        self.pct = pct
+        self.margin = margin
+        self.min_slack = min_slack
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.min_timeout = min_timeout
+        self.max_factor = max_factor
+        history_dir = history_dir or TIMING_HISTORY_DIR
+        os.makedirs(history_dir, exist_ok=True)
+        self.path = os.path.join(history_dir, f"{environment}.json")
+        self._lock = threading.Lock()
+        self._history = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable timing history {self.path}: {e}")
+            return {}
+
+    def _samples(self, name):
+        with self._lock:
+            return list(self._history.get(name, []))
+
+    def timeout(self, name, default, margin=None):
+        """
+        Learned timeout for ``name`` in seconds, or ``default`` while history is short.
+
+        Args:
+            margin: Overrides the multiplier, e.g. a wider one for whole steps
+        """
+        samples = self._samples(name)
+        if len(samples) < self.min_samples:
+            return default
+        learned = percentile(samples, self.pct) * (margin or self.margin) + self.min_slack
+        return round(min(max(learned, self.min_timeout), default * self.max_factor), 2)
+
+    def poll_interval(self, name, default=0.5):
+        samples = self._samples(name)
+        if len(samples) < self.min_samples:
+            return default
+        return min(max(percentile(samples, 50) / 10, 0.05), 0.5)
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self._history.setdefault(name, [])
+            samples.append(round(seconds, 3))
+            del samples[:-self.max_samples]
+
+    def record_timeout(self, name, timeout, default):
+        """
+        Note a timeout. Only timeouts under a learned (shorter than default) limit are
+        evidence that the limit is too tight; a wait that timed out at its default may
+        simply be waiting for something that is legitimately absent.
+        """
+        if timeout < default:
+            self.logger.warning(f"Learned wait '{name}' timed out after {timeout}s, widening it")
+            self.record(name, timeout * self.margin)
+
+    def record_spans(self, spans, prefix=""):
+        """Add the durations of finished, successful tracer spans (e.g. test steps) to the history."""
+        for span in spans:
+            if span.error is None and span.attributes.get("result") is not False:
+                self.record(f"{prefix}{span.name}", span.duration)
+
+    def wait(self, driver, name, default_timeout):
+        """Return an AdaptiveWait for ``name``; use it like ``WebDriverWait(...)``."""
+        return AdaptiveWait(self, driver, name, default_timeout)
+
+    def save(self):
+        with self._lock:
+            history = {name: list(samples) for name, samples in self._history.items()}
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(history, file, indent=1)
+        os.replace(temporary, self.path)
+
+    def log_summary(self):
+        lines = []
+        for name in sorted(self._history):
+            samples = self._samples(name)
+            lines.append(f"{name:<40} n={len(samples):<4} p50={percentile(samples, 50):.2f}s "
+                         f"p{self.pct}={percentile(samples, self.pct):.2f}s")
+        if lines:
+            self.logger.info(f"Timing history ({self.environment}):\n" + "\n".join(lines))
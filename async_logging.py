@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
+
+_context = threading.local()
+
+
+def set_test_id(test_id):
+    """Tag records logged from the calling thread with ``test_id`` (None clears it)."""
+    _context.test_id = test_id
+
+
+def current_test_id():
+    return getattr(_context, "test_id", None)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Stamps run_id, test_id and step on each record in the logging thread.
+
+    It runs before the record is queued, so the ids are those of the thread that logged,
+    not of the listener thread that writes the record.
+    """
+
+    def __init__(self, run_id, step_source=None):
+        super().__init__()
+        self.run_id = run_id
+        self.step_source = step_source
+
+    def filter(self, record):
+        record.run_id = self.run_id
+        record.test_id = current_test_id()
+        record.step = self.step_source() if self.step_source else None
+        return True
+
+
+class DuplicateFilter(logging.Filter):
+    """
+    Rate-limits identical records (same logger, level, message template and args).
+
+    A repeat within ``interval`` seconds is dropped; the next one let through after the
+    interval carries a "suppressed N duplicates" note. Polling loops can then log freely.
+    Records at ``max_level`` or above (warnings and errors by default) are never dropped.
+    """
+
+    def __init__(self, interval=5.0, max_keys=1000, max_level=logging.WARNING):
+        super().__init__()
+        self.interval = interval
+        self.max_keys = max_keys
+        self.max_level = max_level
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= self.max_level:
+            return True
+        try:
+            key = (record.name, record.levelno, record.msg, record.args)
+            hash(key)
+        except TypeError:
+            return True  # unhashable args: never suppress
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._seen.get(key, (None, 0))
+            if last is not None and now - last < self.interval:
+                self._seen[key] = (last, suppressed + 1)
+                return False
+            if len(self._seen) >= self.max_keys:
+                self._seen.clear()
+            self._seen[key] = (now, 0)
+        record.suppressed = suppressed
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record with the run/test/step ids added by ContextFilter."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "run_id": getattr(record, "run_id", None),
+            "test_id": getattr(record, "test_id", None),
+            "step": getattr(record, "step", None),
+            "thread": record.threadName,
+        }
+        if getattr(record, "suppressed", 0):
+            entry["suppressed_duplicates"] = record.suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler that queues the record untouched.
+
+    The stock ``prepare`` formats the message in the logging thread; here message
+    formatting happens in the listener thread, so arguments must not be mutated after the
+    call (pass immutable values or copies).
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class _SuppressionNoteFilter(logging.Filter):
+    """Appends the duplicate count to the plain-text message for the original handlers."""
+
+    def filter(self, record):
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed and not getattr(record, "_suppression_noted", False):
+            record.msg = f"{record.msg} (suppressed {suppressed} duplicate(s))"
+            record._suppression_noted = True
+        return True
+
+
+class AsyncLogging:
+    """
+    Moves a logger's handlers behind a QueueListener so logging calls never block on I/O.
+
+    The logger keeps a single LazyQueueHandler (with context stamping and duplicate
+    suppression); the original file/console handlers plus a JSON-lines file handler run
+    on the listener thread. ``stop`` drains the queue and restores the original handlers.
+    """
+
+    def __init__(self, logger, run_id, step_source=None, json_path=None, duplicate_interval=5.0):
+        self.logger = logger
+        self.json_path = json_path or os.path.join(LOG_DIR, f"{run_id}.jsonl")
+        os.makedirs(os.path.dirname(self.json_path), exist_ok=True)
+
+        self._original_handlers = list(logger.handlers)
+        self._json_handler = logging.FileHandler(self.json_path, encoding='utf-8')
+        self._json_handler.setFormatter(JsonLinesFormatter())
+        note = _SuppressionNoteFilter()
+        for handler in self._original_handlers:
+            handler.addFilter(note)
+
+        self._queue = queue.SimpleQueue()
+        self.handler = LazyQueueHandler(self._queue)
+        self.handler.addFilter(ContextFilter(run_id, step_source))
+        if duplicate_interval:
+            self.handler.addFilter(DuplicateFilter(duplicate_interval))
+        self._listener = QueueListener(self._queue, self._json_handler, *self._original_handlers,
+                                       respect_handler_level=True)
+
+    def start(self):
+        for handler in self._original_handlers:
+            self.logger.removeHandler(handler)
+        self.logger.addHandler(self.handler)
+        self._listener.start()
+        return self
+
+    def stop(self):
+        """Flush pending records and put the original handlers back."""
+        self._listener.stop()
+        self.logger.removeHandler(self.handler)
+        for handler in self._original_handlers:
+            self.logger.addHandler(handler)
+        self._json_handler.close()
+
+
+def enable_async_logging(logger, run_id, step_source=None, duplicate_interval=5.0):
+    """
+    Switch ``logger`` to queue-based logging unless it already is.
+
+    Returns:
+        AsyncLogging or None: The new backend (call ``stop`` at teardown), None if one is active
+    """
+    if any(isinstance(handler, LazyQueueHandler) for handler in logger.handlers):
+        return None
+    return AsyncLogging(logger, run_id, step_source, duplicate_interval=duplicate_interval).start()
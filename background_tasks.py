@@ -0,0 +1,105 @@
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from async_logging import current_test_id, set_test_id
+from retry import current_deadline
+
+
+def carry_context(func):
+    """Wrap ``func`` to run on another thread with the calling thread's retry deadline and log test id."""
+    deadline = current_deadline()
+    test_id = current_test_id()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        restore = deadline.activate() if deadline is not None else None
+        set_test_id(test_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            set_test_id(None)
+            if restore is not None:
+                restore()
+
+    return wrapper
+
+
+class TaskOutcome:
+    """Result of one background task: ``result`` if it returned, ``error`` if it raised or never finished."""
+
+    def __init__(self, name, result=None, error=None, seconds=None):
+        self.name = name
+        self.result = result
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.error is None and self.result is not False
+
+    def __repr__(self):
+        status = f"error={self.error!r}" if self.error is not None else f"result={self.result!r}"
+        return f"TaskOutcome({self.name}, {status})"
+
+
+class BackgroundTasks:
+    """
+    Runs checks that do not touch the browser (mail, HTTP) concurrently with UI steps.
+
+    Tasks inherit the submitting thread's deadline and log test id, so their retries stay
+    within the test budget and their log lines are attributed to the test. Tasks must not
+    use the WebDriver; anything driver-related (screenshots) belongs after ``join``.
+    """
+
+    def __init__(self, logger, max_workers=2):
+        self.logger = logger
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="background")
+        self._futures = {}
+
+    def submit(self, name, func, *args, delay=0, **kwargs):
+        """
+        Start ``func(*args, **kwargs)`` in the background, optionally after ``delay`` seconds.
+
+        Submitting a name again replaces the earlier handle (its result is then not joined).
+        """
+        @carry_context
+        def run():
+            started = time.perf_counter()
+            if delay:
+                time.sleep(delay)
+            return func(*args, **kwargs), time.perf_counter() - started
+
+        self.logger.info(f"Started background task: {name}")
+        self._futures[name] = self._executor.submit(run)
+
+    def join(self, timeout=None):
+        """
+        Wait for every submitted task, at most ``timeout`` seconds (default: the current deadline).
+
+        Returns:
+            list[TaskOutcome]: In submission order; tasks still running get a TimeoutError
+        """
+        if timeout is None and current_deadline() is not None:
+            timeout = current_deadline().remaining()
+        futures, self._futures = self._futures, {}
+        wait(futures.values(), timeout=timeout)
+        outcomes = []
+        for name, future in futures.items():
+            if not future.done():
+                future.cancel()
+                outcome = TaskOutcome(name, error=TimeoutError(f"{name} still running after {timeout}s"))
+            elif future.exception() is not None:
+                outcome = TaskOutcome(name, error=future.exception())
+            else:
+                result, seconds = future.result()
+                outcome = TaskOutcome(name, result=result, seconds=seconds)
+            if outcome.ok:
+                self.logger.info(f"Background task {name} succeeded in {outcome.seconds:.1f}s")
+            else:
+                self.logger.error(f"Background task {name} failed: {outcome.error or outcome.result}")
+            outcomes.append(outcome)
+        return outcomes
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,174 @@
+import itertools
+import json
+import threading
+import urllib.request
+
+try:
+    import websocket  # websocket-client, only needed for CDP event streams
+except ImportError:
+    websocket = None
+
+
+class CDPSession:
+    """
+    Direct Chrome DevTools Protocol connection to the page the driver is controlling.
+
+    ``driver.execute_cdp_cmd`` can only send commands; features that need CDP events
+    (screencast frames, network activity) open this websocket session alongside it.
+    Works for Chromium based drivers (Chrome and Edge) that expose a debugger address.
+    """
+
+    CAPABILITY_KEYS = ("ms:edgeOptions", "goog:chromeOptions")
+
+    def __init__(self, driver, logger, timeout=10):
+        self.driver = driver
+        self.logger = logger
+        self.timeout = timeout
+        self._ws = None
+        self._reader = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+    @classmethod
+    def is_supported(cls, driver):
+        """Return True if the driver exposes a DevTools debugger address."""
+        return cls.get_debugger_address(driver) is not None
+
+    @classmethod
+    def get_debugger_address(cls, driver):
+        capabilities = getattr(driver, "capabilities", None) or {}
+        for key in cls.CAPABILITY_KEYS:
+            address = capabilities.get(key, {}).get("debuggerAddress")
+            if address:
+                return address
+        return None
+
+    def _find_page_websocket_url(self, address):
+        """Resolve the websocket URL of the target backing the current window."""
+        with urllib.request.urlopen(f"http://{address}/json", timeout=self.timeout) as response:
+            targets = json.loads(response.read().decode("utf-8"))
+
+        pages = [t for t in targets if t.get("type") == "page" and t.get("webSocketDebuggerUrl")]
+        if not pages:
+            raise RuntimeError(f"No debuggable page target found at {address}")
+
+        # Chromium drivers use the DevTools target id as the window handle
+        current_handle = self.driver.current_window_handle
+        for page in pages:
+            if page.get("id", "").upper() == current_handle.upper():
+                return page["webSocketDebuggerUrl"]
+        return pages[0]["webSocketDebuggerUrl"]
+
+    def connect(self):
+        """Open the websocket and start the event reader thread."""
+        if websocket is None:
+            raise RuntimeError("CDP sessions require the 'websocket-client' package")
+
+        address = self.get_debugger_address(self.driver)
+        if not address:
+            raise RuntimeError("Driver does not expose a DevTools debugger address")
+
+        url = self._find_page_websocket_url(address)
+        self._ws = websocket.create_connection(url, timeout=self.timeout, suppress_origin=True)
+        self._ws.settimeout(None)
+        self._closed.clear()
+        self._reader = threading.Thread(target=self._read_loop, name="cdp-reader", daemon=True)
+        self._reader.start()
+        self.logger.info(f"Connected CDP session to {url}")
+        return self
+
+    def send(self, method, params=None, wait=True):
+        """
+        Send a CDP command over the websocket.
+
+        Args:
+            method: CDP method name, e.g. "Page.startScreencast"
+            params: Optional parameter dict
+            wait: Block until the browser replies (default: True)
+
+        Returns:
+            dict: The command result, or None when ``wait`` is False
+        """
+        if self._ws is None:
+            raise RuntimeError("CDP session is not connected")
+
+        message_id = next(self._ids)
+        reply = None
+        if wait:
+            reply = {"event": threading.Event()}
+            with self._lock:
+                self._pending[message_id] = reply
+
+        self._ws.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+        if not wait:
+            return None
+
+        if not reply["event"].wait(self.timeout):
+            with self._lock:
+                self._pending.pop(message_id, None)
+            raise TimeoutError(f"No CDP reply to {method} within {self.timeout}s")
+        if "error" in reply:
+            raise RuntimeError(f"CDP {method} failed: {reply['error']}")
+        return reply.get("result", {})
+
+    def add_listener(self, event_name, callback):
+        """Register ``callback(params)`` for a CDP event such as "Network.requestWillBeSent"."""
+        with self._lock:
+            self._listeners.setdefault(event_name, []).append(callback)
+
+    def remove_listener(self, event_name, callback):
+        with self._lock:
+            callbacks = self._listeners.get(event_name, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def _read_loop(self):
+        while not self._closed.is_set():
+            try:
+                raw = self._ws.recv()
+            except Exception as e:
+                if not self._closed.is_set():
+                    self.logger.warning(f"CDP session closed unexpectedly: {e}")
+                break
+            if not raw:
+                continue
+
+            message = json.loads(raw)
+            if "id" in message:
+                with self._lock:
+                    reply = self._pending.pop(message["id"], None)
+                if reply is not None:
+                    reply.update({k: message[k] for k in ("result", "error") if k in message})
+                    reply["event"].set()
+                continue
+
+            with self._lock:
+                callbacks = list(self._listeners.get(message.get("method"), []))
+            for callback in callbacks:
+                try:
+                    callback(message.get("params", {}))
+                except Exception as e:
+                    self.logger.error(f"Error in CDP listener for {message.get('method')}: {e}")
+
+        self._closed.set()
+
+    def close(self):
+        self._closed.set()
+        if self._ws is not None:
+            try:
+                self._ws.close()
+            except Exception as e:
+                self.logger.debug(f"Error closing CDP websocket: {e}")
+            self._ws = None
+        if self._reader is not None:
+            self._reader.join(timeout=2)
+            self._reader = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
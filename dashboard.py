@@ -0,0 +1,236 @@
+import argparse
+import html
+import json
+import logging
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+from latency_stats import percentile
+from results_store import RESULTS_DB
+
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard')
+STATE_VERSION = 1
+MAX_POINTS = 500      # per-series points kept for charts; older ones only count towards totals
+RECENT_RUNS = 50
+TOP_N = 15
+
+
+def _empty_state():
+    return {"version": STATE_VERSION, "last_finished_at": 0.0, "runs": 0, "passed": 0,
+            "steps": {}, "locators": {}, "artifacts": {}, "recent_runs": []}
+
+
+def _append_point(series, point):
+    series.append(point)
+    del series[:-MAX_POINTS]
+
+
+class DashboardBuilder:
+    """
+    Builds a self-contained static HTML dashboard from the results store.
+
+    Aggregates live in ``state.json`` next to the page together with a watermark (the
+    finish time of the last run folded in). Each build reads only runs finished after the
+    watermark, updates the aggregates and re-renders from them, so build time depends on
+    the number of new runs and the capped chart series, not on the whole history.
+    """
+
+    def __init__(self, logger, db_path=None, output_dir=None):
+        self.logger = logger
+        self.db_path = db_path or RESULTS_DB
+        self.output_dir = output_dir or DASHBOARD_DIR
+        self.state_path = os.path.join(self.output_dir, "state.json")
+        self.page_path = os.path.join(self.output_dir, "index.html")
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+            if state.get("version") == STATE_VERSION:
+                return state
+        except (OSError, ValueError):
+            pass
+        return _empty_state()
+
+    def _save_state(self, state):
+        temporary = f"{self.state_path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(state, file)
+        os.replace(temporary, self.state_path)
+
+    def update(self, state, connection):
+        """
+        Fold runs finished since the watermark into ``state``.
+
+        Returns:
+            int: Number of new runs
+        """
+        runs = connection.execute(
+            "SELECT run_id, fixture, finished_at, passed FROM runs WHERE finished_at > ? ORDER BY finished_at",
+            (state["last_finished_at"],)).fetchall()
+        for run_id, fixture, finished_at, passed in runs:
+            state["runs"] += 1
+            state["passed"] += bool(passed)
+            state["recent_runs"].append([run_id, finished_at, passed, fixture])
+            del state["recent_runs"][:-RECENT_RUNS]
+            metrics = connection.execute("SELECT step, factor, name, value FROM metrics WHERE run_id = ?", (run_id,))
+            for step, factor, name, value in metrics:
+                self._fold_metric(state, finished_at, step, factor, name, value)
+            state["last_finished_at"] = finished_at
+        return len(runs)
+
+    @staticmethod
+    def _fold_metric(state, finished_at, step, factor, name, value):
+        if step and name in ("duration_s", "failures"):
+            entry = state["steps"].setdefault(step, {"points": [], "count": 0, "total": 0.0, "failures": 0})
+            if name == "duration_s":
+                entry["count"] += 1
+                entry["total"] += value
+                _append_point(entry["points"], [finished_at, round(value, 3)])
+            else:
+                entry["failures"] += int(value)
+        elif name.startswith("locator.") and not step:
+            locator, counter = name[len("locator."):].rsplit(".", 1)
+            entry = state["locators"].setdefault(locator, {"lookups": 0, "stale_recoveries": 0, "runs": 0,
+                                                           "runs_with_stale": 0})
+            if counter == "lookups":
+                entry["lookups"] += int(value)
+                entry["runs"] += 1
+            elif counter == "stale_recoveries":
+                entry["stale_recoveries"] += int(value)
+                entry["runs_with_stale"] += value > 0
+        elif name.startswith("artifact_bytes."):
+            key = name[len("artifact_bytes."):] + (f" ({factor})" if factor else "")
+            _append_point(state["artifacts"].setdefault(key, []), [finished_at, int(value)])
+
+    def build(self, rebuild=False):
+        """
+        Update the aggregates with new runs and write ``index.html``.
+
+        Args:
+            rebuild: Discard the saved aggregates and fold in every run again
+
+        Returns:
+            str: Path of the dashboard page
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        state = _empty_state() if rebuild else self._load_state()
+        connection = sqlite3.connect(self.db_path)
+        try:
+            new_runs = self.update(state, connection)
+        finally:
+            connection.close()
+        if new_runs or rebuild or not os.path.exists(self.page_path):
+            self._save_state(state)
+            with open(self.page_path, 'w', encoding='utf-8') as file:
+                file.write(render(state))
+        self.logger.info(f"Dashboard: {new_runs} new run(s), {state['runs']} total, written to {self.page_path}")
+        return self.page_path
+
+
+def _time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M')
+
+
+def _sparkline(points, width=360, height=60):
+    """Inline SVG line chart of [timestamp, value] points (evenly spaced by run)."""
+    if not points:
+        return ""
+    values = [value for _, value in points]
+    top = max(values) or 1
+    step = width / max(len(values) - 1, 1)
+    coordinates = " ".join(f"{index * step:.1f},{height - value / top * (height - 4) - 2:.1f}"
+                           for index, value in enumerate(values))
+    return (f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+            f'<polyline fill="none" stroke="#2563eb" stroke-width="1.5" points="{coordinates}"/></svg>')
+
+
+def _table(headers, rows):
+    head = "".join(f"<th>{html.escape(header)}</th>" for header in headers)
+    body = "".join("<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>" for row in rows)
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def _bytes(value):
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def render(state):
+    """Render the aggregates as one HTML page with inline CSS and SVG (no external assets)."""
+    sections = []
+
+    step_rows = []
+    for name, entry in state["steps"].items():
+        recent = [value for _, value in entry["points"]]
+        step_rows.append((percentile(recent, 90) or 0, name, entry, recent))
+    step_rows.sort(key=lambda row: row[0], reverse=True)
+    sections.append("<h2>Slowest steps (p90 of recent runs)</h2>" + _table(
+        ["Step", "p50", "p90", "Latest", "Runs", "Failures"],
+        [[html.escape(name), f"{percentile(recent, 50):.2f}s", f"{p90:.2f}s", f"{recent[-1]:.2f}s",
+          entry["count"], entry["failures"]] for p90, name, entry, recent in step_rows[:TOP_N] if recent]))
+
+    sections.append("<h2>Step latency over time</h2>" + _table(
+        ["Step", f"Duration (last {MAX_POINTS} runs)", "Max"],
+        [[html.escape(name), _sparkline(entry["points"]), f"{max(recent):.2f}s"]
+         for _, name, entry, recent in sorted(step_rows, key=lambda row: row[1]) if recent]))
+
+    locators = sorted(state["locators"].items(),
+                      key=lambda item: item[1]["stale_recoveries"] / max(item[1]["lookups"], 1), reverse=True)
+    sections.append("<h2>Flakiest locators</h2>" + _table(
+        ["Locator", "Stale recoveries", "Lookups", "Stale rate", "Runs affected"],
+        [[html.escape(name), entry["stale_recoveries"], entry["lookups"],
+          f"{entry['stale_recoveries'] / max(entry['lookups'], 1):.1%}",
+          f"{entry['runs_with_stale']}/{entry['runs']}"]
+         for name, entry in locators[:TOP_N] if entry["stale_recoveries"]]))
+
+    sections.append("<h2>Artifact growth</h2>" + _table(
+        ["Artifact", "Size over time", "First", "Latest"],
+        [[html.escape(name), _sparkline(points), _bytes(points[0][1]), _bytes(points[-1][1])]
+         for name, points in sorted(state["artifacts"].items()) if points]))
+
+    sections.append("<h2>Recent runs</h2>" + _table(
+        ["Run", "Finished", "Fixture", "Result"],
+        [[html.escape(run_id), _time(finished_at), html.escape(fixture or ""),
+          {1: "passed", 0: '<span class="failed">failed</span>'}.get(passed, "-")]
+         for run_id, finished_at, passed, fixture in reversed(state["recent_runs"])]))
+
+    pass_rate = state["passed"] / state["runs"] if state["runs"] else 0
+    updated = _time(state["last_finished_at"]) if state["last_finished_at"] else "never"
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Test run dashboard</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; color: #1f2937; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+th, td {{ border-bottom: 1px solid #e5e7eb; padding: 4px 12px; text-align: left; vertical-align: middle; }}
+th {{ background: #f3f4f6; }}
+.failed {{ color: #b91c1c; font-weight: bold; }}
+</style></head><body>
+<h1>Test run dashboard</h1>
+<p>{state['runs']} runs, {pass_rate:.0%} passed. Last run finished {updated}.</p>
+{''.join(sections)}
+</body></html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the static HTML dashboard from the results store")
+    parser.add_argument("--db", default=RESULTS_DB, help="Path to the SQLite results database")
+    parser.add_argument("--output-dir", default=DASHBOARD_DIR)
+    parser.add_argument("--rebuild", action="store_true", help="Ignore saved aggregates and process every run")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if not os.path.exists(args.db):
+        parser.error(f"results database not found: {args.db}")
+    DashboardBuilder(logging.getLogger("dashboard"), args.db, args.output_dir).build(rebuild=args.rebuild)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
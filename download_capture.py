@@ -0,0 +1,166 @@
+import base64
+import os
+
+# Keeps a reference to every Blob turned into an object URL and, while armed, turns the
+# next click on an <a download> link into an in-page read instead of a browser download.
+# Installing it twice is a no-op.
+_HOOK = """
+(function () {
+    if (window.__downloadCapture) { return; }
+    var state = window.__downloadCapture = {armed: false, captures: [], waiters: [], blobs: {}};
+
+    var createObjectURL = URL.createObjectURL;
+    URL.createObjectURL = function (object) {
+        var url = createObjectURL.apply(this, arguments);
+        if (object instanceof Blob) { state.blobs[url] = object; }
+        return url;
+    };
+    var revokeObjectURL = URL.revokeObjectURL;
+    URL.revokeObjectURL = function (url) {
+        delete state.blobs[url];
+        return revokeObjectURL.apply(this, arguments);
+    };
+
+    var deliver = function (capture) {
+        state.captures.push(capture);
+        state.waiters.splice(0).forEach(function (waiter) { waiter(); });
+    };
+    var encode = function (blob) {
+        return new Promise(function (resolve, reject) {
+            var reader = new FileReader();
+            reader.onload = function () { resolve(reader.result.slice(reader.result.indexOf(',') + 1)); };
+            reader.onerror = function () { reject(reader.error); };
+            reader.readAsDataURL(blob);
+        });
+    };
+    var intercept = function (anchor) {
+        if (!state.armed || !anchor || !anchor.hasAttribute('download')) { return false; }
+        state.armed = false;
+        var href = anchor.href;
+        var filename = anchor.getAttribute('download') || href.split('/').pop();
+        // Take the Blob now: apps often revoke the object URL right after clicking
+        var blob = state.blobs[href];
+        var body = blob ? Promise.resolve(blob)
+                        : fetch(href, {credentials: 'include'}).then(function (response) { return response.blob(); });
+        body.then(function (blob) {
+            return encode(blob).then(function (data) {
+                deliver({filename: filename, type: blob.type, data: data});
+            });
+        }).catch(function (error) {
+            deliver({filename: filename, error: String(error)});
+        });
+        return true;
+    };
+
+    var click = HTMLAnchorElement.prototype.click;
+    HTMLAnchorElement.prototype.click = function () {
+        if (!intercept(this)) { return click.apply(this, arguments); }
+    };
+    document.addEventListener('click', function (event) {
+        var anchor = event.target && event.target.closest ? event.target.closest('a[download]') : null;
+        if (anchor && intercept(anchor)) { event.preventDefault(); }
+    }, true);
+})();
+"""
+
+_ARM = """
+var state = window.__downloadCapture;
+state.captures = [];
+state.armed = true;
+"""
+
+_WAIT = """
+var done = arguments[arguments.length - 1];
+var state = window.__downloadCapture;
+if (!state) { done(null); return; }
+var finished = false;
+var timer = setTimeout(function () { finished = true; done(null); }, arguments[0]);
+var check = function () {
+    if (finished) { return; }
+    if (state.captures.length) {
+        finished = true;
+        clearTimeout(timer);
+        done(state.captures.shift());
+    } else {
+        state.waiters.push(check);
+    }
+};
+check();
+"""
+
+
+class CapturedDownload:
+    """A downloaded report held in memory; ``path`` is set only when it was read from disk."""
+
+    def __init__(self, filename, mime_type, data, path=None):
+        self.filename = filename
+        self.mime_type = mime_type
+        self.data = data
+        self.path = path
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'rb') as file:
+            return cls(os.path.basename(path), None, file.read(), path=path)
+
+    @property
+    def size(self):
+        return len(self.data)
+
+    @property
+    def text(self):
+        return self.data.decode('utf-8', errors='replace')
+
+    def __repr__(self):
+        return f"CapturedDownload({self.filename}, {self.size} bytes)"
+
+
+class DownloadCapture:
+    """
+    Captures file downloads inside the page and returns their bytes through an async
+    script, so nothing is written to the download directory.
+
+    ``capture`` arms a hook, runs the click that starts the download and waits for the
+    page to hand over the file. The hook intercepts ``<a download>`` links, whether the
+    app clicks them from script or the user does: a Blob behind an object URL is read
+    directly; any other URL is fetched with the page's cookies. Downloads started in
+    other ways (navigation to an attachment URL, ``window.open``) are not captured.
+    """
+
+    def __init__(self, driver, logger, timeout=30):
+        self.driver = driver
+        self.logger = logger
+        self.timeout = timeout
+
+    def install(self):
+        """Install the hook in the current document; ``capture`` reinstalls it after navigations."""
+        self.driver.execute_script(_HOOK)
+
+    def capture(self, trigger, timeout=None):
+        """
+        Run ``trigger`` (e.g. a button's ``click``) and return the download it starts.
+
+        Returns:
+            CapturedDownload or None if no download arrived within ``timeout`` seconds
+
+        Raises:
+            RuntimeError: The page could not read the file
+        """
+        timeout = self.timeout if timeout is None else timeout
+        self.driver.execute_script(_HOOK + _ARM)
+        trigger()
+        # The script ends itself after ``timeout``; widen the driver's limit just for this call
+        previous = self.driver.timeouts.script
+        self.driver.set_script_timeout(timeout + 5)
+        try:
+            result = self.driver.execute_async_script(_WAIT, int(timeout * 1000))
+        finally:
+            self.driver.set_script_timeout(previous)
+        if result is None:
+            self.logger.warning(f"No download captured within {timeout}s")
+            return None
+        if "error" in result:
+            raise RuntimeError(f"Could not capture download {result['filename']}: {result['error']}")
+        download = CapturedDownload(result["filename"], result["type"], base64.b64decode(result["data"]))
+        self.logger.info(f"Captured download in page: {download}")
+        return download
@@ -0,0 +1,244 @@
+import argparse
+import os
+import random
+
+VERBS = ["load", "parse", "compute", "merge", "filter", "render", "collect", "update", "resolve", "encode"]
+NOUNS = ["records", "orders", "metrics", "events", "users", "tokens", "reports", "samples", "batches", "rows"]
+
+HEADER = [
+    '"""Generated fixture for CodeSherlock scaling tests. Do not edit by hand."""',
+    "import json",
+    "import os",
+    "import time",
+    "",
+]
+
+
+# --- Clean templates -----------------------------------------------------------------------
+
+def _clean_transform(rng, name):
+    factor = rng.randint(2, 9)
+    return [
+        f"def {name}(items):",
+        f'    """Return each value scaled by {factor}."""',
+        f"    return [item * {factor} for item in items if item is not None]",
+        "",
+        "",
+    ]
+
+
+def _clean_lookup(rng, name):
+    return [
+        f"def {name}(mapping, keys, default=None):",
+        '    """Look up several keys at once."""',
+        "    result = {}",
+        "    for key in keys:",
+        "        result[key] = mapping.get(key, default)",
+        "    return result",
+        "",
+        "",
+    ]
+
+
+def _clean_class(rng, name):
+    class_name = "".join(part.capitalize() for part in name.split("_"))
+    limit = rng.randint(10, 500)
+    return [
+        f"class {class_name}:",
+        f'    """Bounded buffer of {limit} entries."""',
+        "",
+        "    def __init__(self):",
+        "        self.entries = []",
+        "",
+        "    def add(self, entry):",
+        f"        if len(self.entries) >= {limit}:",
+        "            self.entries.pop(0)",
+        "        self.entries.append(entry)",
+        "",
+        "    def total(self):",
+        "        return sum(self.entries)",
+        "",
+        "",
+    ]
+
+
+# --- Templates with a deliberate issue for the analysis to find ------------------------------
+
+def _issue_string_concat(rng, name):
+    return [
+        f"def {name}(rows):",
+        "    output = ''",
+        "    for row in rows:",
+        "        output = output + str(row) + ','",
+        "    return output",
+        "",
+        "",
+    ]
+
+
+def _issue_busy_wait(rng, name):
+    interval = rng.choice(["0.01", "0.05", "0.1"])
+    return [
+        f"def {name}(path):",
+        "    while not os.path.exists(path):",
+        f"        time.sleep({interval})",
+        "    return True",
+        "",
+        "",
+    ]
+
+
+def _issue_quadratic_membership(rng, name):
+    return [
+        f"def {name}(left, right):",
+        "    common = []",
+        "    for item in left:",
+        "        if item in right and item not in common:",
+        "            common.append(item)",
+        "    return common",
+        "",
+        "",
+    ]
+
+
+def _issue_mutable_default(rng, name):
+    return [
+        f"def {name}(value, seen=[]):",
+        "    seen.append(value)",
+        "    return len(seen)",
+        "",
+        "",
+    ]
+
+
+def _issue_swallowed_errors(rng, name):
+    return [
+        f"def {name}(path):",
+        "    try:",
+        "        handle = open(path)",
+        "        data = json.loads(handle.read())",
+        "    except:",
+        "        data = None",
+        "    return data",
+        "",
+        "",
+    ]
+
+
+def _issue_repeated_work(rng, name):
+    return [
+        f"def {name}(values):",
+        "    index = 0",
+        "    results = []",
+        "    while index < len(values):",
+        "        results.append(sorted(values)[index] * 2)",
+        "        index += 1",
+        "    return results",
+        "",
+        "",
+    ]
+
+
+CLEAN_TEMPLATES = [_clean_transform, _clean_lookup, _clean_class]
+ISSUE_TEMPLATES = [_issue_string_concat, _issue_busy_wait, _issue_quadratic_membership,
+                   _issue_mutable_default, _issue_swallowed_errors, _issue_repeated_work]
+
+
+class FixtureGenerator:
+    """
+    Produces deterministic Python source files of an exact line count for upload scaling tests.
+
+    The same seed, line count and issue density always yield the same file. Lines are
+    generated block by block and streamed to disk, so file size is not limited by memory.
+    """
+
+    def __init__(self, seed=0, issue_density=0.3):
+        if not 0.0 <= issue_density <= 1.0:
+            raise ValueError("issue_density must be between 0 and 1")
+        self.seed = seed
+        self.issue_density = issue_density
+
+    def iter_lines(self, line_count):
+        """
+        Yield exactly ``line_count`` lines of valid Python source (without newlines).
+
+        Args:
+            line_count: Number of lines to produce
+        """
+        rng = random.Random(f"{self.seed}:{line_count}:{self.issue_density}")
+        remaining = line_count
+
+        for line in HEADER[:remaining]:
+            yield line
+        remaining -= min(remaining, len(HEADER))
+
+        block_index = 0
+        while remaining > 0:
+            templates = ISSUE_TEMPLATES if rng.random() < self.issue_density else CLEAN_TEMPLATES
+            name = f"{rng.choice(VERBS)}_{rng.choice(NOUNS)}_{block_index}"
+            block = rng.choice(templates)(rng, name)
+            block_index += 1
+
+            if len(block) > remaining:
+                # Not enough room for another block: pad with module level constants
+                for index in range(remaining):
+                    yield f"SETTING_{block_index}_{index} = {rng.randint(0, 1000)}"
+                return
+
+            for line in block:
+                yield line
+            remaining -= len(block)
+
+    def write(self, path, line_count):
+        """
+        Stream a generated fixture to ``path``.
+
+        Returns:
+            str: The path written
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            for line in self.iter_lines(line_count):
+                file.write(line)
+                file.write("\n")
+        return path
+
+    def fixture_path(self, output_dir, line_count):
+        """Return the canonical file name for a generated fixture."""
+        density = int(round(self.issue_density * 100))
+        return os.path.join(output_dir, f"Generated_{line_count}lines_d{density}_s{self.seed}.py")
+
+    def ensure_fixtures(self, output_dir, line_counts):
+        """
+        Generate the fixtures for ``line_counts`` that are not on disk yet.
+
+        Returns:
+            list[str]: Fixture paths in the order of ``line_counts``
+        """
+        paths = []
+        for line_count in line_counts:
+            path = self.fixture_path(output_dir, line_count)
+            if not os.path.exists(path):
+                self.write(path, line_count)
+            paths.append(path)
+        return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate deterministic Python upload fixtures")
+    parser.add_argument("--lines", type=int, nargs="+", required=True, help="Line count(s) to generate")
+    parser.add_argument("--density", type=float, default=0.3, help="Fraction of blocks containing an issue")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                             "generated_fixtures"))
+    args = parser.parse_args()
+
+    generator = FixtureGenerator(seed=args.seed, issue_density=args.density)
+    for path in generator.ensure_fixtures(args.output_dir, args.lines):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
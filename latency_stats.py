@@ -0,0 +1,62 @@
+import math
+
+
+def percentile(values, pct):
+    """
+    Return the ``pct`` percentile (0-100) of ``values`` using linear interpolation.
+
+    Returns None for an empty sequence.
+    """
+    ordered = sorted(v for v in values if v is not None)
+    if not ordered:
+        return None
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values):
+    """Return count, mean, p50, p90, p99, min and max of ``values`` (None entries are ignored)."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return {"count": 0, "mean": None, "p50": None, "p90": None, "p99": None, "min": None, "max": None}
+    return {
+        "count": len(present),
+        "mean": sum(present) / len(present),
+        "p50": percentile(present, 50),
+        "p90": percentile(present, 90),
+        "p99": percentile(present, 99),
+        "min": min(present),
+        "max": max(present),
+    }
+
+
+def fit_power_law(sizes, latencies):
+    """
+    Fit ``latency = coefficient * size ** exponent`` by least squares in log-log space.
+
+    An exponent near 1 means latency grows linearly with input size, above 1 super-linearly.
+
+    Returns:
+        dict: coefficient, exponent and r_squared, or None with fewer than two distinct sizes
+    """
+    points = [(math.log(s), math.log(l)) for s, l in zip(sizes, latencies) if s and l and s > 0 and l > 0]
+    if len({x for x, _ in points}) < 2:
+        return None
+
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    exponent = sxy / sxx
+    intercept = mean_y - exponent * mean_x
+
+    ss_total = sum((y - mean_y) ** 2 for _, y in points)
+    ss_residual = sum((y - (intercept + exponent * x)) ** 2 for x, y in points)
+    r_squared = 1 - ss_residual / ss_total if ss_total else 1.0
+
+    return {"coefficient": math.exp(intercept), "exponent": exponent, "r_squared": r_squared}
@@ -0,0 +1,374 @@
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from queue import Queue, Empty
+
+from latency_stats import summarize
+
+LOAD_REPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+
+
+class ApiAnalysisClient:
+    """
+    Submits analyses through the service's HTTP API.
+
+    Endpoint paths default to the ones served by ``MockAnalysisServer`` and can be
+    overridden to match the deployed service.
+    """
+
+    def __init__(self, base_url, email, login_path="/api/login", analyze_path="/api/analyze",
+                 poll_interval=0.5, timeout=900):
+        self.base_url = base_url.rstrip("/")
+        self.email = email
+        self.login_path = login_path
+        self.analyze_path = analyze_path
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.token = None
+
+    def _request(self, method, path, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", errors="ignore")
+            raise RuntimeError(f"{method} {path} returned {e.code}: {detail}") from e
+
+    def login(self):
+        self.token = self._request("POST", self.login_path, {"email": self.email})["token"]
+
+    def run_analysis(self, factor, fixture_path):
+        """
+        Submit one fixture and wait for the result.
+
+        Returns:
+            dict: "submitted", "started" and "completed" wall clock times (server side
+                  "started" when the API reports it) and the final "status"
+        """
+        with open(fixture_path, 'r', encoding='utf-8') as file:
+            code = file.read()
+
+        submitted = time.time()
+        job = self._request("POST", self.analyze_path, {
+            "factor": factor, "filename": os.path.basename(fixture_path), "code": code
+        })
+        deadline = submitted + self.timeout
+        while job.get("status") not in ("done", "failed"):
+            if time.time() > deadline:
+                raise TimeoutError(f"Analysis {job.get('id')} did not finish within {self.timeout}s")
+            time.sleep(self.poll_interval)
+            job = self._request("GET", f"{self.analyze_path}/{job['id']}")
+
+        if job["status"] == "failed":
+            raise RuntimeError(job.get("error") or "Analysis failed")
+        return {"submitted": submitted, "started": job.get("started_at"), "completed": time.time(),
+                "status": job["status"], "issues": len(job.get("issues", []))}
+
+    def close(self):
+        self.token = None
+
+
+class BrowserAnalysisClient:
+    """
+    Submits analyses through a (headless) browser using the FileUploadTests step helpers.
+
+    ``driver_factory`` returns a new WebDriver per client so concurrent clients never share
+    a browser session. With an ``account_pool`` each client logs in as its own leased
+    account, and with a ``mail_router`` its OTP is read from the shared IMAP connection,
+    so parallel logins do not pick up each other's OTP emails.
+    """
+
+    def __init__(self, driver_factory, logger, account_pool=None, mail_router=None):
+        self.driver_factory = driver_factory
+        self.logger = logger
+        self.account_pool = account_pool
+        self.mail_router = mail_router
+        self.account = None
+        self.steps = None
+
+    def login(self):
+        import File_Upload
+        from selenium.webdriver.support.ui import WebDriverWait
+        from sign_in_handler import SignInHandler
+
+        config = File_Upload.config
+        steps = File_Upload.FileUploadTests()
+        steps.logger = self.logger
+        steps.driver = self.driver_factory()
+        self.steps = steps  # close() quits the browser even if the rest of the login fails
+        steps.wait = WebDriverWait(steps.driver, 20)
+        steps.tracer = None
+        steps.watchdog = None
+        steps.timeouts = None
+        steps.locators = File_Upload.LocatorRegistry(self.logger, File_Upload.LOCATORS)
+        steps.locators.attach(steps.driver)
+        steps.screenshot_handler = File_Upload.ScreenshotHandler(self.logger)
+        steps.visual_regression = None
+        if self.account_pool is not None:
+            self.account = self.account_pool.acquire(threading.current_thread().name)
+        steps.sign_in_handler = SignInHandler(
+            driver=steps.driver, wait=steps.wait, logger=self.logger,
+            email_address=self.account or config.EMAIL_ADDRESS, imap_server=config.IMAP_SERVER,
+            app_password=config.APP_PASSWORD, sender_email=config.SENDER_EMAIL
+        )
+        if self.mail_router is not None:
+            self.mail_router.attach(steps.sign_in_handler, self.account or config.EMAIL_ADDRESS)
+        if not steps.handle_login():
+            raise RuntimeError("Browser client login failed")
+
+    def run_analysis(self, factor, fixture_path):
+        steps = self.steps
+        steps.driver.get(steps.driver.current_url)
+        steps.selected_factor = factor
+        if not steps.handle_factor_selection(factor) or not steps.handle_file_upload(fixture_path):
+            raise RuntimeError("Could not prepare the upload")
+        if not steps.handle_submit(factor):
+            raise RuntimeError("Submit failed")
+        # Wall-clock time of the click that handle_submit timestamped
+        submitted = time.time() - (time.perf_counter() - steps.submitted_at)
+        milestones = steps.measure_processing_latency(steps.submitted_at)
+        if milestones["error"] or milestones["results_rendered"] is None:
+            raise RuntimeError(f"Analysis did not render results: {milestones}")
+        started = submitted + milestones["first_progress"] if milestones["first_progress"] is not None else None
+        return {"submitted": submitted, "started": started,
+                "completed": submitted + milestones["results_rendered"], "status": "done"}
+
+    def close(self):
+        try:
+            if self.steps is not None:
+                steps, self.steps = self.steps, None
+                steps.driver.quit()
+        finally:
+            if self.account is not None:
+                self.account_pool.release(self.account)
+                self.account = None
+
+
+class LoadGenerator:
+    """
+    Drives K concurrent authenticated clients against the analysis service.
+
+    Requests arrive open-loop as a Poisson process at ``arrival_rate`` per second, each
+    picking a fixture and factor from the pools, and are served by the first free client.
+    A request that waits for a free client accumulates client-side queueing delay; the
+    time until the service starts processing is recorded as server-side queueing delay.
+    """
+
+    def __init__(self, client_factory, fixtures, factors, logger, concurrency=4, arrival_rate=1.0,
+                 duration=60, bucket_seconds=10, seed=0):
+        self.client_factory = client_factory
+        self.fixtures = list(fixtures)
+        self.factors = list(factors)
+        self.logger = logger
+        self.concurrency = concurrency
+        self.arrival_rate = arrival_rate
+        self.duration = duration
+        self.bucket_seconds = bucket_seconds
+        self._rng = random.Random(seed)
+        self._requests = Queue()
+        self._records = []
+        self._records_lock = threading.Lock()
+
+    def _schedule(self, start):
+        """Enqueue arrivals until the run duration is over, then one stop marker per client."""
+        arrival = start
+        while True:
+            arrival += self._rng.expovariate(self.arrival_rate)
+            if arrival - start > self.duration:
+                break
+            delay = arrival - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            self._requests.put({"arrival": arrival, "factor": self._rng.choice(self.factors),
+                                "fixture": self._rng.choice(self.fixtures)})
+        for _ in range(self.concurrency):
+            self._requests.put(None)
+
+    def _client_loop(self, index):
+        client = self.client_factory(index)
+        try:
+            client.login()
+        except Exception as e:
+            self.logger.error(f"Load client {index} failed to authenticate: {e}")
+            try:
+                client.close()  # releases the browser and any leased account
+            except Exception as close_error:
+                self.logger.warning(f"Load client {index} did not close cleanly: {close_error}")
+            client = None
+
+        while True:
+            try:
+                request = self._requests.get(timeout=self.duration + 60)
+            except Empty:
+                break
+            if request is None:
+                break
+
+            record = {"client": index, "arrival": request["arrival"], "dequeued": time.time(),
+                      "factor": request["factor"], "fixture": os.path.basename(request["fixture"]), "error": None}
+            if client is None:
+                record["error"] = "client not authenticated"
+            else:
+                try:
+                    record.update(client.run_analysis(request["factor"], request["fixture"]))
+                except Exception as e:
+                    record["error"] = str(e)
+            record["finished"] = time.time()
+            with self._records_lock:
+                self._records.append(record)
+
+        if client is not None:
+            client.close()
+
+    def run(self):
+        """
+        Run the load test.
+
+        Returns:
+            dict: Overall summary and per-bucket throughput, queueing delay and error rate
+        """
+        self.logger.info(f"Starting load run: {self.concurrency} clients, {self.arrival_rate} req/s "
+                         f"for {self.duration}s")
+        start = time.time()
+        clients = [threading.Thread(target=self._client_loop, args=(i,), name=f"load-client-{i}", daemon=True)
+                   for i in range(self.concurrency)]
+        for client in clients:
+            client.start()
+        self._schedule(start)
+        for client in clients:
+            client.join()
+        return self.build_report(start)
+
+    def build_report(self, start):
+        with self._records_lock:
+            records = sorted(self._records, key=lambda r: r["arrival"])
+
+        def client_queue_delay(record):
+            return record["dequeued"] - record["arrival"]
+
+        def server_queue_delay(record):
+            return record["started"] - record["submitted"] if record.get("started") and record.get("submitted") else None
+
+        def latency(record):
+            return record["finished"] - record["arrival"]
+
+        buckets = []
+        end = max([r["finished"] for r in records], default=start)
+        bucket_start = start
+        while bucket_start < end:
+            bucket_end = bucket_start + self.bucket_seconds
+            arrived = [r for r in records if bucket_start <= r["arrival"] < bucket_end]
+            finished = [r for r in records if bucket_start <= r["finished"] < bucket_end]
+            ok = [r for r in finished if not r["error"]]
+            buckets.append({
+                "offset": round(bucket_start - start, 1),
+                "arrivals": len(arrived),
+                "throughput_per_s": round(len(ok) / self.bucket_seconds, 3),
+                "error_rate": round((len(finished) - len(ok)) / len(finished), 3) if finished else 0.0,
+                "client_queue_delay_p50": summarize([client_queue_delay(r) for r in arrived])["p50"],
+                "server_queue_delay_p50": summarize([server_queue_delay(r) for r in arrived])["p50"],
+            })
+            bucket_start = bucket_end
+
+        successful = [r for r in records if not r["error"]]
+        report = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "concurrency": self.concurrency,
+            "arrival_rate": self.arrival_rate,
+            "duration": self.duration,
+            "requests": len(records),
+            "errors": len(records) - len(successful),
+            "throughput_per_s": round(len(successful) / max(end - start, 1e-9), 3),
+            "latency": summarize([latency(r) for r in successful]),
+            "client_queue_delay": summarize([client_queue_delay(r) for r in records]),
+            "server_queue_delay": summarize([server_queue_delay(r) for r in records]),
+            "timeline": buckets,
+            "records": records,
+        }
+        self.logger.info(f"Load run finished: {report['requests']} requests, {report['errors']} errors, "
+                         f"{report['throughput_per_s']} analyses/s, latency p90={report['latency']['p90']}")
+        return report
+
+    @staticmethod
+    def write_report(report, output_dir=LOAD_REPORT_DIR):
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent upload load generator for the analysis service")
+    parser.add_argument("--base-url", help="Service API base URL (omit with --mock)")
+    parser.add_argument("--mock", action="store_true", help="Run against a local mock analysis backend")
+    parser.add_argument("--browser", action="store_true",
+                        help="Drive the web app in one browser per client, each logged in as its own account")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=1.0, help="Target arrivals per second")
+    parser.add_argument("--duration", type=int, default=60, help="Arrival window in seconds")
+    parser.add_argument("--factor", action="append", default=None)
+    parser.add_argument("--fixture", action="append", default=None)
+    parser.add_argument("--email-template", default="loadtest+{index}@example.com")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logger = logging.getLogger("load_generator")
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    fixtures = args.fixture or [os.path.join(base_dir, name)
+                                for name in ("Testing_100lines.py", "Testing_300lines.py", "Testing_1500lines.py")]
+    factors = args.factor or ["Power Analysis"]
+
+    server = None
+    mail_router = None
+    base_url = args.base_url
+    if args.browser:
+        from handlers.config_handler import ConfigHandler
+        from webdriver_setup import WebDriverSetup
+        from account_pool import AccountPool
+        from mail_router import MailRouter
+
+        config = ConfigHandler.get_config()
+        mail_router = MailRouter.from_config(config, logger).start()
+        account_pool = AccountPool.from_config(config, args.clients)
+        client_factory = lambda index: BrowserAnalysisClient(WebDriverSetup.get_driver, logger,
+                                                             account_pool=account_pool, mail_router=mail_router)
+    elif args.mock:
+        from mock_analysis_backend import MockAnalysisBackend, MockAnalysisServer
+        server = MockAnalysisServer(MockAnalysisBackend(workers=2, base_latency=0.5, per_line_latency=0.001)).start()
+        base_url = server.url
+    if not args.browser:
+        if not base_url:
+            parser.error("--base-url is required unless --mock or --browser is given")
+        client_factory = lambda index: ApiAnalysisClient(base_url, args.email_template.format(index=index))
+
+    try:
+        generator = LoadGenerator(
+            client_factory, fixtures, factors, logger, concurrency=args.clients, arrival_rate=args.rate,
+            duration=args.duration, seed=args.seed
+        )
+        report = generator.run()
+        logger.info(f"Report written to {LoadGenerator.write_report(report)}")
+    finally:
+        if server is not None:
+            server.stop()
+        if mail_router is not None:
+            mail_router.stop()
+
+
+if __name__ == "__main__":
+    main()
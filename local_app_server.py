@@ -0,0 +1,523 @@
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+
+from mock_analysis_backend import AnalysisApiHandler, MockAnalysisBackend, MockAnalysisServer
+
+# Arrow icon paths the factor dropdown toggles between (File_Upload checks for the "down" path)
+ARROW_DOWN_SRC = ("data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 14 8'%3E"
+                  "%3Cpath d='M6.99999%205.61602L12.0016 0.614441L13.4158 2.02866L6.99999 8.44445L0.58417 2.02866"
+                  "L1.99838 0.614441L6.99999 5.61602Z'/%3E%3C/svg%3E")
+ARROW_UP_SRC = ("data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 14 8'%3E"
+                "%3Cpath d='M7 2.83L2 7.83L0.58 6.41L7 0L13.42 6.41L12 7.83Z'/%3E%3C/svg%3E")
+# 1x1 transparent PNG used for the like/dislike icons
+PIXEL_PNG = ("data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII=")
+
+FACTORS = ["Power Analysis"]
+
+APP_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>CodeSherlock (local)</title>
+<style>
+  .hidden { display: none !important; }
+  .fixed { position: fixed; right: 16px; bottom: 16px; }
+  body { font-family: sans-serif; }
+  #results { min-height: 1200px; }
+</style>
+</head>
+<body>
+<div id="toast"></div>
+<div id="root">
+  <div id="login-view">
+    <div>CodeSherlock</div>
+    <div>
+      <div>
+        <div>
+          <div>Welcome back</div>
+          <div>Analyse your code for performance issues</div>
+          <div>Sign in to continue</div>
+        </div>
+        <p id="loading-message">Please wait while we load the content for you.</p>
+        <input id="email" type="email" placeholder="Email">
+        <button id="continue-button" type="button">Continue</button>
+        <div id="otp-section" class="hidden">
+          <input id="otp" type="text" placeholder="Enter OTP">
+          <button id="verify-otp-button" type="button">Verify OTP</button>
+          <button id="resend-otp-button" type="button">Resend OTP</button>
+        </div>
+        <div class="message-class"><span id="login-message"></span></div>
+        <span class="underline cursor-pointer" id="security-privacy">Security &amp; Privacy</span>
+      </div>
+    </div>
+  </div>
+
+  <div id="app-view" class="hidden">
+    <div class="text-xl font-bold text-center cursor-pointer" id="profile-trigger">Profile</div>
+    <div id="profile-menu" class="hidden">
+      <span class="text-text_black cursor-pointer" id="logout-button">Log Out</span>
+    </div>
+
+    <aside>
+      <div class="cursor-pointer flex justify-between" id="history-toggle">
+        <div>History</div>
+        <div><img src="__ARROW_DOWN__"></div>
+      </div>
+      <div id="history-panel" class="hidden">
+        <form class="flex flex-col justify-around" onsubmit="return false;"><input placeholder="Search history"></form>
+        <div class="flex flex-col item-start gap-4" id="history-entries"></div>
+      </div>
+    </aside>
+
+    <main>
+      <div class="cursor-pointer flex justify-between" id="factors-toggle">
+        <div>Factors</div>
+        <div><img id="factors-arrow" src="__ARROW_DOWN__"></div>
+      </div>
+      <div id="factors-list" class="hidden">__FACTOR_LABELS__</div>
+
+      <input type="file" id="file-input">
+      <img alt="Submit analysis" id="submit" src="__PIXEL__" class="cursor-pointer" width="24" height="24">
+      <div id="upload-error"></div>
+
+      <div id="processing"></div>
+
+      <div id="results" class="hidden">
+        <div class="flex bg-white" id="severity-buttons"></div>
+        <table class="table-auto w-full overflow-x-auto"><tbody id="results-body"></tbody></table>
+        <table class="custom-table"><tbody id="severity-body"></tbody></table>
+        <div id="issue-details"></div>
+        <div class="flex items-center gap-2">
+          <span>Is this analysis useful?</span>
+          <img id="like" src="__PIXEL__" class="h-[20px] w-[22px] cursor-pointer" width="22" height="20">
+          <img id="dislike" src="__PIXEL__" class="h-[20.36px] w-[22px] cursor-pointer" width="22" height="20">
+        </div>
+        <div><span>Download HTML</span><button id="download-button" type="button">Download</button></div>
+      </div>
+    </main>
+    <button class="fixed" id="scroll-top" type="button">Top</button>
+  </div>
+</div>
+
+<script>
+var state = {job: null, severity: null};
+
+function api(method, path, body) {
+  return fetch(path, {method: method, credentials: 'same-origin',
+                      headers: {'Content-Type': 'application/json'},
+                      body: body ? JSON.stringify(body) : undefined})
+    .then(function (r) { return r.json().then(function (data) { data._status = r.status; return data; }); });
+}
+function show(id, visible) { document.getElementById(id).classList.toggle('hidden', !visible); }
+// The suites detect processing by spinner presence, so it is added to and removed from the DOM
+function showProcessing(visible) {
+  document.getElementById('processing').innerHTML = visible ?
+    '<span class="loading spinner spinner-container text-white loading-md"><span style="display: inherit;"></span></span>' +
+    '<div class="p-4 rounded-[10px] border"><p id="progress-message"></p></div>' : '';
+}
+function toast(text) {
+  var t = document.getElementById('toast');
+  t.innerHTML = '<div>' + text + '</div>';
+  setTimeout(function () { t.innerHTML = ''; }, 5000);
+}
+function escapeHtml(text) {
+  return String(text).replace(/[&<>"']/g, function (c) {
+    return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+  });
+}
+
+function showApp() {
+  show('login-view', false); show('app-view', true); loadHistory();
+}
+function showLogin() {
+  show('app-view', false); show('login-view', true); show('otp-section', false);
+}
+
+document.getElementById('continue-button').onclick = function () {
+  api('POST', '/api/otp/request', {email: document.getElementById('email').value}).then(function (r) {
+    document.getElementById('login-message').textContent = r.message || r.error;
+    if (r._status === 200) { show('otp-section', true); }
+  });
+};
+document.getElementById('resend-otp-button').onclick = document.getElementById('continue-button').onclick;
+document.getElementById('verify-otp-button').onclick = function () {
+  api('POST', '/api/otp/verify', {email: document.getElementById('email').value,
+                                  otp: document.getElementById('otp').value}).then(function (r) {
+    if (r._status === 200) { showApp(); } else { document.getElementById('login-message').textContent = r.error; }
+  });
+};
+document.getElementById('security-privacy').onclick = function () { window.open('about:blank', '_blank'); };
+
+document.getElementById('profile-trigger').onclick = function () { show('profile-menu', true); };
+document.getElementById('logout-button').onclick = function () {
+  api('POST', '/api/logout').then(function () { show('profile-menu', false); showLogin(); toast('Logged out successfully!'); });
+};
+
+document.getElementById('factors-toggle').onclick = function () {
+  var list = document.getElementById('factors-list');
+  var open = list.classList.contains('hidden');
+  show('factors-list', open);
+  document.getElementById('factors-arrow').src = open ? '__ARROW_UP__' : '__ARROW_DOWN__';
+};
+document.getElementById('history-toggle').onclick = function () {
+  show('history-panel', document.getElementById('history-panel').classList.contains('hidden'));
+};
+document.getElementById('scroll-top').onclick = function () { window.scrollTo(0, 0); };
+document.getElementById('like').onclick = function () { this.dataset.clicked = 'true'; };
+document.getElementById('dislike').onclick = function () { this.dataset.clicked = 'true'; };
+
+document.getElementById('submit').onclick = function () {
+  var input = document.getElementById('file-input');
+  var factor = document.querySelector('input[name=factor]:checked');
+  document.getElementById('upload-error').innerHTML = '';
+  if (!input.files.length || !factor) { return; }
+  var file = input.files[0];
+  var reader = new FileReader();
+  reader.onload = function () {
+    api('POST', '/api/analyze', {factor: factor.value, filename: file.name, code: reader.result}).then(function (job) {
+      if (job._status !== 202) {
+        document.getElementById('upload-error').innerHTML = '<div>' + escapeHtml(job.error) + '</div>';
+        return;
+      }
+      show('results', false); showProcessing(true);
+      poll(job.id);
+    });
+  };
+  reader.readAsText(file);
+};
+
+function poll(id) {
+  api('GET', '/api/analyze/' + id).then(function (job) {
+    var message = document.getElementById('progress-message');
+    if (message) { message.textContent = job.progress || ''; }
+    if (job.status === 'done' || job.status === 'failed') {
+      showProcessing(false);
+      if (job.status === 'failed') {
+        document.getElementById('upload-error').innerHTML = '<div>' + escapeHtml(job.error) + '</div>';
+      } else {
+        renderResults(job);
+      }
+      loadHistory();
+      return;
+    }
+    setTimeout(function () { poll(id); }, 250);
+  });
+}
+
+function renderResults(job) {
+  state.job = job;
+  var counts = {};
+  job.issues.forEach(function (issue) { counts[issue.severity] = (counts[issue.severity] || 0) + 1; });
+  var buttons = document.getElementById('severity-buttons');
+  buttons.innerHTML = '';
+  ['High', 'Medium', 'Low'].forEach(function (severity) {
+    var button = document.createElement('button');
+    button.type = 'button';
+    button.innerHTML = severity + '<br><span>' + (counts[severity] || 0) + '</span>';
+    button.disabled = !counts[severity];
+    button.onclick = function () { state.severity = severity; renderIssues(); };
+    buttons.appendChild(button);
+  });
+  state.severity = null;
+  renderIssues();
+  show('results', true);
+}
+
+function visibleIssues() {
+  return state.job.issues.filter(function (issue) { return !state.severity || issue.severity === state.severity; });
+}
+
+function renderIssues() {
+  var issues = visibleIssues();
+  document.getElementById('results-body').innerHTML = issues.map(function (issue) {
+    return '<tr><td><a href="#' + issue.id + '">' + issue.id + '</a></td><td>' + escapeHtml(issue.description) +
+           '</td><td>' + issue.severity + '</td></tr>';
+  }).join('');
+  document.getElementById('severity-body').innerHTML = issues.map(function (issue) {
+    return '<tr><td>' + issue.id + '</td><td>' + issue.severity + '</td></tr>';
+  }).join('');
+  document.getElementById('issue-details').innerHTML = issues.map(function (issue) {
+    return '<div class="text-[14px] sm:text-[20px] flex flex-col gap-4 my-5">' +
+           '<p class="text-[14px] sm:text-[22px] font-bold" id="' + issue.id + '">' + issue.id + '</p>' +
+           '<p>Issue</p><p>' + escapeHtml(issue.description) + '</p>' +
+           '<pre><code>' + escapeHtml(issue.code) + '</code></pre>' +
+           '<p>Solution</p><p>' + escapeHtml(issue.solution) + '</p>' +
+           '<pre><code>' + escapeHtml(issue.code) + '</code></pre>' +
+           '<button type="button" class="copy-code">Copy Code</button></div>';
+  }).join('');
+  Array.prototype.forEach.call(document.querySelectorAll('.copy-code'), function (button) {
+    button.onclick = function () {
+      var code = button.parentNode.querySelector('pre code').innerText;
+      if (navigator.clipboard) { navigator.clipboard.writeText(code); }
+    };
+  });
+}
+
+document.getElementById('download-button').onclick = function () {
+  if (!state.job) { return; }
+  // One "Issue-N <Severity> <description>" line per issue, which is what the tests parse
+  var lines = visibleIssues().map(function (issue) {
+    return issue.id + ' ' + issue.severity + ' ' + escapeHtml(issue.description);
+  });
+  var html = '<html><body><h1>' + escapeHtml(state.job.filename) + ' - ' + state.job.factor + '</h1>\\n<pre>\\n' +
+             lines.join('\\n') + '\\n</pre>\\n<p>Total issues: ' + lines.length + '</p></body></html>';
+  var link = document.createElement('a');
+  link.href = URL.createObjectURL(new Blob([html], {type: 'text/html'}));
+  link.download = 'CodeSherlock_' + state.job.id + '.html';
+  document.body.appendChild(link);
+  link.click();
+  link.remove();
+};
+
+function loadHistory() {
+  api('GET', '/api/history').then(function (r) {
+    var entries = document.getElementById('history-entries');
+    entries.innerHTML = '';
+    (r.analyses || []).filter(function (job) { return job.status === 'done'; }).forEach(function (job) {
+      var a = document.createElement('a');
+      a.href = '#analysis-' + job.id;
+      a.innerHTML = '<div class="text-[16px]">' + escapeHtml(job.filename) + '</div><span>' + job.factor + '</span>';
+      a.onclick = function () { api('GET', '/api/analyze/' + job.id).then(renderResults); };
+      entries.appendChild(a);
+    });
+  });
+}
+
+api('GET', '/api/session').then(function (r) {
+  document.getElementById('loading-message').classList.add('hidden');
+  if (r.email) { showApp(); } else { showLogin(); }
+});
+</script>
+</body>
+</html>
+"""
+
+
+class Outbox:
+    """Default mailer: keeps "sent" emails in memory so tests can inspect them."""
+
+    def __init__(self):
+        self.messages = []
+        self._lock = threading.Lock()
+
+    def send(self, to, subject, body):
+        with self._lock:
+            self.messages.append({"to": to, "subject": subject, "body": body, "sent_at": time.time()})
+
+
+class LocalAppHandler(AnalysisApiHandler):
+    """Serves the app page and the OTP/session endpoints on top of the analysis API."""
+
+    app = None
+
+    def _maybe_fail(self):
+        """Fault injection: fail a share of API requests with 503."""
+        if self.path.startswith("/api/") and self.app.should_fail_request():
+            self._send_json(503, {"error": "Service temporarily unavailable"})
+            return True
+        return False
+
+    def _send_session_cookie(self, status, payload, token):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        cookie = f"session={token}; Path=/" if token else "session=; Path=/; Max-Age=0"
+        self.send_header("Set-Cookie", cookie)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path in ("/", "/index.html") or self.path.startswith("/?"):
+            time.sleep(self.latency)
+            body = self.app.page.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self._maybe_fail():
+            return
+        if self.path == "/api/session":
+            time.sleep(self.latency)
+            return self._send_json(200, {"email": self._user()})
+        super().do_GET()
+
+    def do_POST(self):
+        if self._maybe_fail():
+            return
+        if self.path == "/api/otp/request":
+            time.sleep(self.latency)
+            email = self._read_json().get("email")
+            if not email:
+                return self._send_json(400, {"error": "Please enter a valid email"})
+            self.app.send_otp(email)
+            return self._send_json(200, {"message": "OTP sent to your email"})
+
+        if self.path == "/api/otp/verify":
+            time.sleep(self.latency)
+            payload = self._read_json()
+            if not self.app.verify_otp(payload.get("email"), payload.get("otp")):
+                return self._send_json(401, {"error": "Invalid OTP"})
+            token = self.backend.login(payload["email"])
+            return self._send_session_cookie(200, {"email": payload["email"]}, token)
+
+        if self.path == "/api/logout":
+            time.sleep(self.latency)
+            token = self._token()
+            if token:
+                self.backend.logout(token)
+            return self._send_session_cookie(200, {"message": "Logged out successfully!"}, None)
+
+        super().do_POST()
+
+
+class LocalCodeSherlockApp:
+    """
+    Local stand-in for the CodeSherlock web app that reproduces the DOM contracts the suites use.
+
+    Point ``config.LOGIN_URL`` at ``url`` to run the suites offline. Latency and faults are
+    configurable: ``latency`` delays every HTTP response, ``request_failure_rate`` returns 503
+    for a share of API calls, and the analysis backend's ``error_rate`` fails analyses.
+    Emails (OTP, welcome, analysis completion) go to ``mailer.send(to, subject, body)``,
+    an in-memory ``Outbox`` unless another mailer is given.
+    """
+
+    def __init__(self, backend=None, host="127.0.0.1", port=0, latency=0.0, request_failure_rate=0.0,
+                 mailer=None, seed=0):
+        self.backend = backend or MockAnalysisBackend(base_latency=2.0, per_line_latency=0.001)
+        self.mailer = mailer or Outbox()
+        self.request_failure_rate = request_failure_rate
+        self.page = (APP_PAGE.replace("__ARROW_DOWN__", ARROW_DOWN_SRC)
+                     .replace("__ARROW_UP__", ARROW_UP_SRC)
+                     .replace("__PIXEL__", PIXEL_PNG)
+                     .replace("__FACTOR_LABELS__", "".join(
+                         f'<label><input type="radio" name="factor" value="{factor}"> {factor}</label>'
+                         for factor in FACTORS)))
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._otps = {}
+        self._known_users = set()
+        self._notified_jobs = set()
+
+        handler = type("BoundLocalAppHandler", (LocalAppHandler,), {"app": self})
+        self._server = MockAnalysisServer(self.backend, host=host, port=port, latency=latency, handler_class=handler)
+        self._notifier = None
+        self._stopped = threading.Event()
+
+    @property
+    def url(self):
+        return self._server.url + "/"
+
+    def should_fail_request(self):
+        with self._lock:
+            return self._rng.random() < self.request_failure_rate
+
+    def send_otp(self, email):
+        otp = f"{secrets.randbelow(10 ** 6):06d}"
+        with self._lock:
+            self._otps[email] = otp
+        self.mailer.send(email, "Your CodeSherlock OTP", f"Your one time password is {otp}")
+        return otp
+
+    def verify_otp(self, email, otp):
+        with self._lock:
+            valid = bool(email) and self._otps.get(email) == otp
+            if not valid:
+                return False
+            del self._otps[email]
+            new_user = email not in self._known_users
+            self._known_users.add(email)
+        if new_user:
+            first_name = email.split("@")[0].split("+")[0].capitalize()
+            self.mailer.send(email, "Welcome to CodeSherlock", f"Welcome, {first_name}! Your account is ready.")
+        return True
+
+    def _notify_completed_jobs(self):
+        """Send the analysis completion email the real service sends after each analysis."""
+        while not self._stopped.wait(0.5):
+            with self._lock:
+                owners = list(self._known_users)
+            for owner in owners:
+                for job in self.backend.history(owner):
+                    if job.status == "done" and job.id not in self._notified_jobs:
+                        self._notified_jobs.add(job.id)
+                        self.mailer.send(owner, f"Tell us what you think of {job.factor} analysis",
+                                         f"Your {job.factor} analysis of {job.filename} is complete.")
+
+    def start(self):
+        self._server.start()
+        self._stopped.clear()
+        self._notifier = threading.Thread(target=self._notify_completed_jobs, name="local-app-notifier", daemon=True)
+        self._notifier.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._notifier is not None:
+            self._notifier.join(timeout=2)
+        self._server.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def start_local_app(config, logger, mailer=None):
+    """
+    Start the stand-in app from config values and point ``config.LOGIN_URL`` at it.
+
+    Args:
+        mailer: Receives the app's emails (e.g. a ``LocalMailServer``); in-memory ``Outbox`` if None
+
+    Returns:
+        LocalCodeSherlockApp: The running app; call ``stop`` when the suite is done
+    """
+    backend = MockAnalysisBackend(
+        base_latency=getattr(config, "LOCAL_APP_PROCESSING_LATENCY", 2.0),
+        per_line_latency=getattr(config, "LOCAL_APP_PER_LINE_LATENCY", 0.001),
+        error_rate=getattr(config, "LOCAL_APP_ERROR_RATE", 0.0)
+    )
+    app = LocalCodeSherlockApp(
+        backend,
+        port=getattr(config, "LOCAL_APP_PORT", 0),
+        latency=getattr(config, "LOCAL_APP_LATENCY", 0.0),
+        request_failure_rate=getattr(config, "LOCAL_APP_REQUEST_FAILURE_RATE", 0.0),
+        mailer=mailer
+    ).start()
+    config.LOGIN_URL = app.url
+    logger.info(f"Running against local CodeSherlock stand-in at {app.url}")
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local CodeSherlock stand-in app")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay added to every HTTP response (s)")
+    parser.add_argument("--processing-latency", type=float, default=2.0, help="Base analysis time (s)")
+    parser.add_argument("--per-line-latency", type=float, default=0.001, help="Extra analysis time per line (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of analyses that fail")
+    parser.add_argument("--request-failure-rate", type=float, default=0.0, help="Share of API calls returning 503")
+    args = parser.parse_args()
+
+    backend = MockAnalysisBackend(base_latency=args.processing_latency, per_line_latency=args.per_line_latency,
+                                  error_rate=args.error_rate)
+    app = LocalCodeSherlockApp(backend, port=args.port, latency=args.latency,
+                               request_failure_rate=args.request_failure_rate).start()
+    print(f"Local CodeSherlock app running at {app.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        app.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,795 @@
+import argparse
+import asyncio
+import mailbox
+import os
+import re
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from email.utils import format_datetime, make_msgid
+
+CAPABILITIES = "IMAP4rev1 IDLE LITERAL+"
+DEFAULT_SENDER = "noreply@codesherlock.local"
+OTP_PATTERN = re.compile(r"\b(\d{6})\b")
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+class StoredMessage:
+    """A message in a mailbox with its IMAP UID, flags and internal date."""
+
+    def __init__(self, uid, raw, flags=None, internal_date=None):
+        self.uid = uid
+        self.raw = raw
+        self.flags = set(flags or ())
+        self.internal_date = internal_date or time.time()
+        self._parsed = None
+
+    @property
+    def parsed(self):
+        if self._parsed is None:
+            self._parsed = message_from_bytes(self.raw, policy=policy.compat32)
+        return self._parsed
+
+    def header(self, name):
+        return str(self.parsed.get(name, ""))
+
+    def header_bytes(self):
+        head, _, _ = self.raw.partition(b"\r\n\r\n")
+        return head + b"\r\n\r\n"
+
+    def text(self):
+        """Decoded text of the first text part."""
+        for part in self.parsed.walk():
+            if part.get_content_maintype() == "text":
+                payload = part.get_payload(decode=True) or b""
+                return payload.decode(part.get_content_charset() or "utf-8", errors="ignore")
+        return ""
+
+
+class InMemoryMailStore:
+    """
+    Thread-safe mail store keyed by user. Every user has a single INBOX.
+
+    ``add_listener`` callbacks fire on delivery so IDLE sessions can push EXISTS updates.
+    """
+
+    def __init__(self, users=None):
+        self._users = dict(users or {})
+        self._boxes = {}
+        self._next_uid = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.uid_validity = int(time.time())
+
+    def add_user(self, email, password):
+        with self._lock:
+            self._users[email.lower()] = password
+
+    def authenticate(self, email, password):
+        with self._lock:
+            expected = self._users.get(email.lower())
+        # Unknown users are accepted when no users were configured (open test mailbox)
+        return expected == password if self._users else True
+
+    def add_listener(self, callback):
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _store(self, user, raw, flags, internal_date):
+        box = self._boxes.setdefault(user, [])
+        uid = self._next_uid.get(user, 1)
+        self._next_uid[user] = uid + 1
+        message = StoredMessage(uid, raw, flags, internal_date)
+        box.append(message)
+        return message
+
+    def append(self, user, raw, flags=(), internal_date=None):
+        """
+        Store a raw RFC 822 message in ``user``'s INBOX and notify listeners.
+
+        Plus-addressed recipients (``name+tag@domain``) land in ``name@domain``'s INBOX.
+        """
+        user = mailbox_owner(user)
+        with self._lock:
+            message = self._store(user, raw, flags, internal_date)
+            listeners = list(self._listeners)
+        for callback in listeners:
+            callback(user)
+        return message
+
+    def messages(self, user):
+        with self._lock:
+            return list(self._boxes.get(user.lower(), []))
+
+    def set_flags(self, user, message, flags, mode):
+        with self._lock:
+            if mode == "+":
+                message.flags |= flags
+            elif mode == "-":
+                message.flags -= flags
+            else:
+                message.flags = set(flags)
+
+    def expunge(self, user):
+        """Remove \\Deleted messages and return their sequence numbers (highest first)."""
+        with self._lock:
+            box = self._boxes.get(user.lower(), [])
+            removed = [index + 1 for index, message in enumerate(box) if "\\Deleted" in message.flags]
+            self._boxes[user.lower()] = [m for m in box if "\\Deleted" not in m.flags]
+        return sorted(removed, reverse=True)
+
+
+class MaildirMailStore(InMemoryMailStore):
+    """
+    Mail store persisted as one Maildir per user under ``root``.
+
+    Messages already on disk are loaded at startup; UIDs follow delivery order.
+    """
+
+    def __init__(self, root, users=None):
+        super().__init__(users)
+        self.root = root
+        self._maildirs = {}
+        self._keys = {}
+        os.makedirs(root, exist_ok=True)
+        for name in sorted(os.listdir(root)):
+            if os.path.isdir(os.path.join(root, name)):
+                self._load(name)
+
+    def _maildir(self, user):
+        if user not in self._maildirs:
+            self._maildirs[user] = mailbox.Maildir(os.path.join(self.root, user), create=True)
+        return self._maildirs[user]
+
+    def _load(self, user):
+        maildir = self._maildir(user)
+        entries = sorted(maildir.items(), key=lambda item: item[1].get_date())
+        for key, message in entries:
+            flags = {"\\Seen"} if "S" in message.get_flags() else set()
+            # Bypass our _store override: the message is already on disk
+            stored = InMemoryMailStore._store(self, user, message.as_bytes(), flags, message.get_date())
+            self._keys[id(stored)] = key
+
+    def _store(self, user, raw, flags, internal_date):
+        stored = super()._store(user, raw, flags, internal_date)
+        message = mailbox.MaildirMessage(raw)
+        message.set_date(stored.internal_date)
+        if "\\Seen" in stored.flags:
+            message.add_flag("S")
+        message.set_subdir("cur" if stored.flags else "new")
+        self._keys[id(stored)] = self._maildir(user).add(message)
+        return stored
+
+    def set_flags(self, user, message, flags, mode):
+        super().set_flags(user, message, flags, mode)
+        key = self._keys.get(id(message))
+        if key is None:
+            return
+        maildir = self._maildir(user.lower())
+        stored = maildir.get_message(key)
+        stored.set_flags("S" if "\\Seen" in message.flags else "")
+        stored.set_subdir("cur")
+        maildir[key] = stored
+
+    def expunge(self, user):
+        deleted = [m for m in self.messages(user) if "\\Deleted" in m.flags]
+        for message in deleted:
+            key = self._keys.pop(id(message), None)
+            if key is not None:
+                self._maildir(user.lower()).discard(key)
+        return super().expunge(user)
+
+
+def mailbox_owner(address):
+    """Return the mailbox an address delivers to, dropping any ``+tag``."""
+    local, _, domain = address.lower().partition("@")
+    return f"{local.split('+')[0]}@{domain}" if domain else local
+
+
+def build_message(to, subject, body, sender=DEFAULT_SENDER, date=None):
+    """Build a raw RFC 822 message with CRLF line endings."""
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = to
+    message["Subject"] = subject
+    message["Date"] = format_datetime(date or datetime.now(timezone.utc))
+    message["Message-ID"] = make_msgid(domain="codesherlock.local")
+    message.set_content(body)
+    return message.as_bytes(policy=policy.SMTP)
+
+
+# --- Command parsing ------------------------------------------------------------------------
+
+_TOKEN = re.compile(rb'\(|\)|"(?:[^"\\]|\\.)*"|\{\d+\+?\}|[^\s()"\[]+(?:\[[^\]]*\])?(?:<[^>]*>)?')
+
+
+def parse_arguments(data):
+    """Parse an IMAP argument string into nested lists of str tokens."""
+    stack = [[]]
+    for match in _TOKEN.finditer(data):
+        token = match.group(0)
+        if token == b"(":
+            stack.append([])
+        elif token == b")":
+            if len(stack) > 1:
+                group = stack.pop()
+                stack[-1].append(group)
+        elif token.startswith(b'"'):
+            stack[-1].append(re.sub(rb"\\(.)", rb"\1", token[1:-1]).decode("utf-8", errors="replace"))
+        else:
+            stack[-1].append(token.decode("utf-8", errors="replace"))
+    while len(stack) > 1:
+        group = stack.pop()
+        stack[-1].append(group)
+    return stack[0]
+
+
+def parse_sequence_set(text, maximum):
+    """Expand "1:3,5,7:*" into a set of integers (``*`` means ``maximum``)."""
+    numbers = set()
+    if maximum == 0:
+        return numbers
+    for part in text.split(","):
+        if ":" in part:
+            start, end = part.split(":", 1)
+            start = maximum if start == "*" else int(start)
+            end = maximum if end == "*" else int(end)
+            numbers.update(range(min(start, end), max(start, end) + 1))
+        else:
+            numbers.add(maximum if part == "*" else int(part))
+    return numbers
+
+
+def _parse_date(text):
+    day, month, year = text.split("-")
+    return datetime(int(year), MONTHS.index(month.capitalize()) + 1, int(day)).date()
+
+
+def _internal_date(message):
+    return datetime.fromtimestamp(message.internal_date).date()
+
+
+class SearchCriteria:
+    """Compiles IMAP SEARCH keys into a predicate over (sequence number, StoredMessage)."""
+
+    def __init__(self, tokens, maximum_sequence, maximum_uid):
+        self.maximum_sequence = maximum_sequence
+        self.maximum_uid = maximum_uid
+        self._tokens = list(tokens)
+        self.predicate = self._parse_all()
+
+    def _parse_all(self):
+        predicates = []
+        while self._tokens:
+            predicates.append(self._parse_one())
+        return lambda seq, msg: all(p(seq, msg) for p in predicates)
+
+    def _next(self):
+        return self._tokens.pop(0)
+
+    def _parse_one(self):
+        token = self._next()
+        if isinstance(token, list):
+            nested = SearchCriteria(token, self.maximum_sequence, self.maximum_uid).predicate
+            return nested
+        key = token.upper()
+
+        if key == "ALL":
+            return lambda seq, msg: True
+        if key in ("SEEN", "UNSEEN", "DELETED", "UNDELETED", "FLAGGED", "UNFLAGGED", "ANSWERED", "UNANSWERED"):
+            negate = key.startswith("UN")
+            flag = "\\" + (key[2:] if negate else key).capitalize()
+            return lambda seq, msg: (flag in msg.flags) != negate
+        if key in ("NEW", "RECENT"):
+            return lambda seq, msg: "\\Seen" not in msg.flags
+        if key in ("FROM", "TO", "CC", "SUBJECT"):
+            value = str(self._next()).lower()
+            return lambda seq, msg: value in msg.header(key.capitalize()).lower()
+        if key == "HEADER":
+            name, value = str(self._next()), str(self._next()).lower()
+            return lambda seq, msg: value in msg.header(name).lower()
+        if key in ("BODY", "TEXT"):
+            value = str(self._next()).lower().encode()
+            return lambda seq, msg: value in msg.raw.lower()
+        if key in ("SINCE", "BEFORE", "ON", "SENTSINCE", "SENTBEFORE", "SENTON"):
+            date = _parse_date(str(self._next()))
+            compare = {"SINCE": lambda d: d >= date, "BEFORE": lambda d: d < date, "ON": lambda d: d == date}
+            check = compare[key.replace("SENT", "")]
+            return lambda seq, msg: check(_internal_date(msg))
+        if key == "UID":
+            uids = parse_sequence_set(str(self._next()), self.maximum_uid)
+            return lambda seq, msg: msg.uid in uids
+        if key == "NOT":
+            inner = self._parse_one()
+            return lambda seq, msg: not inner(seq, msg)
+        if key == "OR":
+            left, right = self._parse_one(), self._parse_one()
+            return lambda seq, msg: left(seq, msg) or right(seq, msg)
+        if key == "CHARSET":
+            self._next()
+            return lambda seq, msg: True
+        if re.match(r"^[\d,:*]+$", key):
+            sequences = parse_sequence_set(key, self.maximum_sequence)
+            return lambda seq, msg: seq in sequences
+        raise ValueError(f"Unsupported SEARCH key {token}")
+
+
+# --- Server ---------------------------------------------------------------------------------
+
+class IMAPSession:
+    """One client connection: state machine for the supported IMAP4rev1 subset."""
+
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.store = server.store
+        self.reader = reader
+        self.writer = writer
+        self.user = None
+        self.selected = False
+        self.read_only = False
+        self.known_count = 0
+        self._new_mail = asyncio.Event()
+
+    async def send(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.writer.write(data)
+        await self.writer.drain()
+
+    async def read_command(self):
+        """Read one command line, inlining any {n} / {n+} literals."""
+        line = await self.reader.readline()
+        if not line:
+            return None
+        data = line.rstrip(b"\r\n")
+        while True:
+            literal = re.search(rb"\{(\d+)(\+?)\}$", data)
+            if not literal:
+                return data
+            size = int(literal.group(1))
+            if not literal.group(2):
+                await self.send("+ Ready for literal data\r\n")
+            payload = await self.reader.readexactly(size)
+            quoted = b'"' + payload.replace(b"\\", b"\\\\").replace(b'"', b'\\"') + b'"'
+            rest = (await self.reader.readline()).rstrip(b"\r\n")
+            data = data[:literal.start()] + quoted + rest
+
+    def on_delivery(self, user):
+        if user == self.user:
+            self.server.loop.call_soon_threadsafe(self._new_mail.set)
+
+    async def run(self):
+        self.store.add_listener(self.on_delivery)
+        try:
+            await self.send(f"* OK [CAPABILITY {CAPABILITIES}] Local IMAP stand-in ready\r\n")
+            while True:
+                line = await self.read_command()
+                if line is None:
+                    break
+                tag, _, rest = line.partition(b" ")
+                command, _, arguments = rest.partition(b" ")
+                tag = tag.decode("utf-8", errors="replace")
+                keep_going = await self.dispatch(tag, command.decode().upper(), arguments)
+                if not keep_going:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.store.remove_listener(self.on_delivery)
+            self.writer.close()
+
+    async def dispatch(self, tag, command, arguments):
+        uid_mode = command == "UID"
+        if uid_mode:
+            command, _, arguments = arguments.partition(b" ")
+            command = command.decode().upper()
+
+        handler = getattr(self, f"cmd_{command.lower()}", None)
+        if handler is None:
+            await self.send(f"{tag} BAD Unsupported command {command}\r\n")
+            return True
+        if command not in ("CAPABILITY", "NOOP", "LOGIN", "LOGOUT") and self.user is None:
+            await self.send(f"{tag} NO Not authenticated\r\n")
+            return True
+        if command in ("SEARCH", "FETCH", "STORE", "EXPUNGE", "CLOSE", "IDLE") and not self.selected:
+            await self.send(f"{tag} NO No mailbox selected\r\n")
+            return True
+        try:
+            if command in ("SEARCH", "FETCH", "STORE"):
+                return await handler(tag, parse_arguments(arguments), uid_mode)
+            return await handler(tag, parse_arguments(arguments))
+        except Exception as e:
+            await self.send(f"{tag} BAD {command} failed: {e}\r\n")
+            return True
+
+    async def cmd_capability(self, tag, arguments):
+        await self.send(f"* CAPABILITY {CAPABILITIES}\r\n{tag} OK CAPABILITY completed\r\n")
+        return True
+
+    async def cmd_noop(self, tag, arguments):
+        await self._report_new_messages()
+        await self.send(f"{tag} OK NOOP completed\r\n")
+        return True
+
+    async def cmd_login(self, tag, arguments):
+        email, password = str(arguments[0]), str(arguments[1])
+        if not self.store.authenticate(email, password):
+            await self.send(f"{tag} NO [AUTHENTICATIONFAILED] Invalid credentials\r\n")
+            return True
+        self.user = email.lower()
+        await self.send(f"{tag} OK [CAPABILITY {CAPABILITIES}] LOGIN completed\r\n")
+        return True
+
+    async def cmd_logout(self, tag, arguments):
+        await self.send(f"* BYE Logging out\r\n{tag} OK LOGOUT completed\r\n")
+        return False
+
+    async def cmd_select(self, tag, arguments, read_only=False):
+        if str(arguments[0]).upper() != "INBOX":
+            await self.send(f"{tag} NO Mailbox does not exist\r\n")
+            return True
+        messages = self.store.messages(self.user)
+        self.selected = True
+        self.read_only = read_only
+        self.known_count = len(messages)
+        unseen_sequences = [i + 1 for i, m in enumerate(messages) if "\\Seen" not in m.flags]
+        unseen = unseen_sequences[0] if unseen_sequences else None
+        next_uid = messages[-1].uid + 1 if messages else 1
+        lines = [
+            "* FLAGS (\\Answered \\Flagged \\Deleted \\Seen \\Draft)",
+            f"* {len(messages)} EXISTS",
+            f"* {len(unseen_sequences)} RECENT",
+            f"* OK [UIDVALIDITY {self.store.uid_validity}] UIDs valid",
+            f"* OK [UIDNEXT {next_uid}] Predicted next UID",
+        ]
+        if unseen:
+            lines.append(f"* OK [UNSEEN {unseen}] First unseen")
+        mode = "READ-ONLY" if read_only else "READ-WRITE"
+        await self.send("\r\n".join(lines) + f"\r\n{tag} OK [{mode}] {'EXAMINE' if read_only else 'SELECT'} completed\r\n")
+        return True
+
+    async def cmd_examine(self, tag, arguments):
+        return await self.cmd_select(tag, arguments, read_only=True)
+
+    async def cmd_close(self, tag, arguments):
+        if not self.read_only:
+            self.store.expunge(self.user)
+        self.selected = False
+        await self.send(f"{tag} OK CLOSE completed\r\n")
+        return True
+
+    async def cmd_expunge(self, tag, arguments):
+        for sequence in self.store.expunge(self.user):
+            await self.send(f"* {sequence} EXPUNGE\r\n")
+        self.known_count = len(self.store.messages(self.user))
+        await self.send(f"{tag} OK EXPUNGE completed\r\n")
+        return True
+
+    def _resolve(self, sequence_set, uid_mode):
+        messages = self.store.messages(self.user)
+        if uid_mode:
+            wanted = parse_sequence_set(sequence_set, messages[-1].uid if messages else 0)
+            return [(i + 1, m) for i, m in enumerate(messages) if m.uid in wanted]
+        wanted = parse_sequence_set(sequence_set, len(messages))
+        return [(i + 1, m) for i, m in enumerate(messages) if i + 1 in wanted]
+
+    async def cmd_search(self, tag, arguments, uid_mode=False):
+        messages = self.store.messages(self.user)
+        criteria = SearchCriteria(arguments or ["ALL"], len(messages), messages[-1].uid if messages else 0)
+        matches = [m.uid if uid_mode else i + 1 for i, m in enumerate(messages) if criteria.predicate(i + 1, m)]
+        await self.send(f"* SEARCH {' '.join(map(str, matches))}".rstrip() + f"\r\n{tag} OK SEARCH completed\r\n")
+        return True
+
+    async def cmd_fetch(self, tag, arguments, uid_mode=False):
+        sequence_set, items = str(arguments[0]), arguments[1] if len(arguments) > 1 else ["FLAGS"]
+        if not isinstance(items, list):
+            items = [items]
+        names = [str(item).upper() for item in items]
+        if "ALL" in names or "FAST" in names:
+            names = ["FLAGS", "INTERNALDATE", "RFC822.SIZE"]
+        if uid_mode and "UID" not in names:
+            names.insert(0, "UID")
+
+        for sequence, message in self._resolve(sequence_set, uid_mode):
+            parts = []
+            marks_seen = False
+            for name in names:
+                if name == "UID":
+                    parts.append(f"UID {message.uid}".encode())
+                elif name == "FLAGS":
+                    parts.append(f"FLAGS ({' '.join(sorted(message.flags))})".encode())
+                elif name == "RFC822.SIZE":
+                    parts.append(f"RFC822.SIZE {len(message.raw)}".encode())
+                elif name == "INTERNALDATE":
+                    date = datetime.fromtimestamp(message.internal_date).astimezone()
+                    parts.append(f'INTERNALDATE "{date.strftime("%d-%b-%Y %H:%M:%S %z")}"'.encode())
+                elif name in ("RFC822", "BODY[]", "BODY.PEEK[]", "RFC822.TEXT", "BODY[TEXT]", "BODY.PEEK[TEXT]"):
+                    data = message.raw if "TEXT" not in name else message.raw.partition(b"\r\n\r\n")[2]
+                    label = name.replace(".PEEK", "")
+                    parts.append(f"{label} {{{len(data)}}}\r\n".encode() + data)
+                    marks_seen = marks_seen or "PEEK" not in name
+                elif name in ("RFC822.HEADER", "BODY[HEADER]", "BODY.PEEK[HEADER]") or name.startswith(
+                        ("BODY[HEADER.FIELDS", "BODY.PEEK[HEADER.FIELDS")):
+                    data = message.header_bytes()
+                    label = "RFC822.HEADER" if name == "RFC822.HEADER" else "BODY[HEADER]"
+                    parts.append(f"{label} {{{len(data)}}}\r\n".encode() + data)
+                else:
+                    raise ValueError(f"Unsupported FETCH item {name}")
+
+            if marks_seen and not self.read_only and "\\Seen" not in message.flags:
+                self.store.set_flags(self.user, message, {"\\Seen"}, "+")
+            await self.send(f"* {sequence} FETCH (".encode() + b" ".join(parts) + b")\r\n")
+
+        await self.send(f"{tag} OK FETCH completed\r\n")
+        return True
+
+    async def cmd_store(self, tag, arguments, uid_mode=False):
+        sequence_set, action, flags = str(arguments[0]), str(arguments[1]).upper(), arguments[2]
+        flags = set(flags if isinstance(flags, list) else [flags])
+        mode = "+" if action.startswith("+") else "-" if action.startswith("-") else "="
+        for sequence, message in self._resolve(sequence_set, uid_mode):
+            self.store.set_flags(self.user, message, flags, mode)
+            if not action.endswith(".SILENT"):
+                uid = f"UID {message.uid} " if uid_mode else ""
+                await self.send(f"* {sequence} FETCH ({uid}FLAGS ({' '.join(sorted(message.flags))}))\r\n")
+        await self.send(f"{tag} OK STORE completed\r\n")
+        return True
+
+    async def _report_new_messages(self):
+        count = len(self.store.messages(self.user))
+        if count != self.known_count:
+            self.known_count = count
+            await self.send(f"* {count} EXISTS\r\n")
+
+    async def cmd_idle(self, tag, arguments):
+        await self.send("+ idling\r\n")
+        done = asyncio.ensure_future(self.reader.readline())
+        try:
+            while True:
+                self._new_mail.clear()
+                await self._report_new_messages()
+                waiter = asyncio.ensure_future(self._new_mail.wait())
+                finished, _ = await asyncio.wait({done, waiter}, timeout=self.server.idle_timeout,
+                                                 return_when=asyncio.FIRST_COMPLETED)
+                if done in finished:
+                    waiter.cancel()
+                    break
+                if not finished:
+                    waiter.cancel()
+                    await self.send("* OK Still here\r\n")
+        finally:
+            if not done.done():
+                done.cancel()
+        if not done.cancelled() and done.result().strip().upper() != b"DONE":
+            await self.send(f"{tag} BAD Expected DONE\r\n")
+            return True
+        await self.send(f"{tag} OK IDLE terminated\r\n")
+        return True
+
+
+class LocalMailServer:
+    """
+    In-process asyncio IMAP4rev1 server (LOGIN, SELECT/EXAMINE, SEARCH, FETCH, STORE, IDLE, UID).
+
+    The event loop runs on a background thread so synchronous tests can use it. Messages
+    are injected with ``deliver``; the server also implements the ``mailer.send`` interface
+    used by ``LocalCodeSherlockApp``, so the stand-in app's OTP, welcome and completion
+    emails land here. Pass an ``ssl_context`` to serve IMAPS.
+    """
+
+    def __init__(self, store=None, host="127.0.0.1", port=0, ssl_context=None, sender=DEFAULT_SENDER,
+                 idle_timeout=29 * 60):
+        self.store = store or InMemoryMailStore()
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.sender = sender
+        self.idle_timeout = idle_timeout
+        self.loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    async def _handle_client(self, reader, writer):
+        await IMAPSession(self, reader, writer).run()
+
+    async def _serve(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port, ssl=self.ssl_context)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start(self):
+        """Start serving on a background thread and return once the port is bound."""
+        self.loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.loop.run_until_complete(self._serve())
+            except asyncio.CancelledError:
+                pass
+
+        self._thread = threading.Thread(target=run, name="local-imap-server", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(10):
+            raise RuntimeError("Local IMAP server failed to start")
+        return self
+
+    def stop(self):
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self._server.close)
+        for task in asyncio.all_tasks(self.loop):
+            self.loop.call_soon_threadsafe(task.cancel)
+        self._thread.join(timeout=5)
+        self.loop = None
+
+    def deliver(self, to, subject, body, sender=None, date=None, seen=False):
+        """Inject a message into ``to``'s INBOX, waking any IDLE sessions."""
+        raw = build_message(to, subject, body, sender or self.sender, date)
+        return self.store.append(to, raw, {"\\Seen"} if seen else set())
+
+    def send(self, to, subject, body):
+        """Mailer interface for LocalCodeSherlockApp."""
+        self.deliver(to, subject, body)
+
+    def wait_for_otp(self, address, since=None, timeout=60, pattern=OTP_PATTERN):
+        """
+        Wait for an unseen OTP email to ``address`` delivered at or after ``since``, mark it
+        seen and return the code.
+
+        Reads the store directly; messages to a ``+tag`` alias must be addressed to that alias.
+
+        Args:
+            since: datetime or POSIX time; older messages are skipped (to the second, like
+                   the Date header a real mailbox filters on)
+
+        Returns:
+            str or None on timeout
+        """
+        address = address.lower()
+        owner = mailbox_owner(address)
+        since = since.timestamp() if hasattr(since, "timestamp") else since
+        if since is not None:
+            since = int(since)
+        arrived = threading.Event()
+
+        def on_delivery(user):
+            if user == owner:
+                arrived.set()
+
+        self.store.add_listener(on_delivery)
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                arrived.clear()
+                for message in reversed(self.store.messages(owner)):
+                    if "\\Seen" in message.flags or (since is not None and message.internal_date < since):
+                        continue
+                    if address != owner and address not in message.header("To").lower():
+                        continue
+                    match = pattern.search(message.text())
+                    if match:
+                        self.store.set_flags(owner, message, {"\\Seen"}, "+")
+                        return match.group(1)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                arrived.wait(remaining)
+        finally:
+            self.store.remove_listener(on_delivery)
+
+    def attach(self, sign_in_handler, address=None, timeout=60):
+        """
+        Make ``sign_in_handler`` read its OTPs from this server's store.
+
+        The external SignInHandler only takes ``imap_server`` and always connects to port
+        993, so it cannot reach this server's ephemeral port by itself.
+        """
+        address = address or sign_in_handler.email_address
+
+        def fetch_latest_unseen_email(since=None, *args, **kwargs):
+            return self.wait_for_otp(address, since, timeout=timeout)
+
+        sign_in_handler.fetch_latest_unseen_email = fetch_latest_unseen_email
+        return sign_in_handler
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def generate_self_signed_certificate(directory, host="127.0.0.1"):
+    """
+    Create a throwaway certificate/key pair with the ``openssl`` CLI.
+
+    Returns:
+        tuple: (certfile, keyfile)
+    """
+    if shutil.which("openssl") is None:
+        raise RuntimeError("openssl is required to generate a certificate for the local IMAPS server")
+    certfile = os.path.join(directory, "local_imap.crt")
+    keyfile = os.path.join(directory, "local_imap.key")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "2",
+                    "-subj", f"/CN={host}", "-keyout", keyfile, "-out", certfile],
+                   check=True, capture_output=True)
+    return certfile, keyfile
+
+
+def start_local_mail_server(config, logger):
+    """
+    Start the IMAP stand-in from config values and point the IMAP settings at it.
+
+    Serves IMAPS (imaplib.IMAP4_SSL does not verify certificates by default) with
+    LOCAL_MAIL_CERTFILE/LOCAL_MAIL_KEYFILE, or a generated self-signed pair. Messages are
+    kept in memory unless LOCAL_MAIL_MAILDIR names a Maildir root. The configured
+    EMAIL_ADDRESS/APP_PASSWORD is the only account, and mail is sent as SENDER_EMAIL so the
+    suites' FROM filters match. Code that builds its own IMAP4_SSL connection must pass
+    IMAP_PORT; a SignInHandler, which cannot, needs ``attach``.
+
+    Returns:
+        LocalMailServer: The running server; call ``stop`` when the suite is done
+    """
+    users = {config.EMAIL_ADDRESS: config.APP_PASSWORD}
+    maildir = getattr(config, "LOCAL_MAIL_MAILDIR", None)
+    store = MaildirMailStore(maildir, users) if maildir else InMemoryMailStore(users)
+
+    certfile = getattr(config, "LOCAL_MAIL_CERTFILE", None)
+    keyfile = getattr(config, "LOCAL_MAIL_KEYFILE", None)
+    if not certfile:
+        certfile, keyfile = generate_self_signed_certificate(tempfile.mkdtemp(prefix="local_imap_"))
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(certfile, keyfile)
+
+    server = LocalMailServer(store, port=getattr(config, "LOCAL_MAIL_PORT", 0), ssl_context=context,
+                             sender=config.SENDER_EMAIL).start()
+    config.IMAP_SERVER = server.host
+    config.IMAP_PORT = server.port
+    logger.info(f"Running against local IMAP stand-in at {server.host}:{server.port}")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local IMAP stand-in")
+    parser.add_argument("--port", type=int, default=1143)
+    parser.add_argument("--maildir", help="Persist mail in this Maildir root instead of memory")
+    parser.add_argument("--user", action="append", default=[], help="email:password (repeatable)")
+    parser.add_argument("--certfile", help="Serve IMAPS with this certificate")
+    parser.add_argument("--keyfile")
+    args = parser.parse_args()
+
+    users = dict(user.split(":", 1) for user in args.user)
+    store = MaildirMailStore(args.maildir, users) if args.maildir else InMemoryMailStore(users)
+    context = None
+    if args.certfile:
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(args.certfile, args.keyfile)
+
+    server = LocalMailServer(store, port=args.port, ssl_context=context).start()
+    print(f"Local IMAP server running on {server.host}:{server.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
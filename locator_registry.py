@@ -0,0 +1,322 @@
+import re
+import threading
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+# WebDriver commands that replace the document, so every cached element is stale afterwards
+NAVIGATION_COMMANDS = {"get", "refresh", "goBack", "goForward", "switchToWindow", "newWindow", "switchToFrame",
+                       "switchToParentFrame", "closeWindow", "close"}
+
+_TAG = re.compile(r"^(\*|[A-Za-z][\w-]*)")
+_CONDITIONS = [
+    (re.compile(r"^@([\w-]+)\s*=\s*'([^']*)'$"), "[{0}='{1}']"),
+    (re.compile(r"^contains\(\s*@([\w-]+)\s*,\s*'([^']*)'\s*\)$"), "[{0}*='{1}']"),
+    (re.compile(r"^starts-with\(\s*@([\w-]+)\s*,\s*'([^']*)'\s*\)$"), "[{0}^='{1}']"),
+    (re.compile(r"^@([\w-]+)$"), "[{0}]"),
+]
+_POSITION = re.compile(r"^\s*(\d+)\s*$")
+
+
+def _split_steps(xpath):
+    """Split an XPath into (axis, step) pairs on / and // outside predicates and quotes."""
+    steps, depth, quote, current, axis, i = [], 0, None, "", None, 0
+    while i < len(xpath):
+        char = xpath[i]
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "'\"":
+            quote = char
+        elif char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == "/" and depth == 0:
+            if current:
+                steps.append((axis, current))
+                current = ""
+            axis = "//" if xpath[i:i + 2] == "//" else "/"
+            i += len(axis)
+            continue
+        current += char
+        i += 1
+    if current:
+        steps.append((axis, current))
+    return steps
+
+
+def _predicates(text):
+    """Yield the top-level [...] predicate bodies; None marks nested predicates or junk."""
+    i = 0
+    while i < len(text):
+        if text[i] != "[":
+            yield None
+            return
+        quote, j = None, i + 1
+        while j < len(text):
+            char = text[j]
+            if quote:
+                quote = None if char == quote else quote
+            elif char in "'\"":
+                quote = char
+            elif char == "[":
+                yield None
+                return
+            elif char == "]":
+                break
+            j += 1
+        yield text[i + 1:j]
+        i = j + 1
+
+
+def _compile_step(step):
+    match = _TAG.match(step)
+    if not match:
+        return None
+    css = "" if match.group(1) == "*" else match.group(1)
+    predicates = list(_predicates(step[match.end():]))
+    if any(predicate is None for predicate in predicates):
+        return None
+    positions = [_POSITION.match(predicate) for predicate in predicates]
+    if any(positions):
+        # XPath's tag[n] is the n-th tag child, i.e. :nth-of-type(n). After other predicates
+        # it counts only the filtered nodes, and *[n] counts children of any type: no CSS match.
+        if len(predicates) > 1 or not css:
+            return None
+        return f"{css}:nth-of-type({positions[0].group(1)})"
+    for predicate in predicates:
+        for condition in re.split(r"\s+and\s+", predicate.strip()):
+            for pattern, template in _CONDITIONS:
+                condition_match = pattern.match(condition.strip())
+                if condition_match:
+                    css += template.format(*condition_match.groups())
+                    break
+            else:
+                return None
+    return css or "*"
+
+
+def xpath_to_css(xpath):
+    """
+    Translate an XPath to an equivalent CSS selector, or return None if there is none.
+
+    Handles descendant/child steps with tag names and attribute predicates (``@a='v'``,
+    ``contains(@a, 'v')``, ``starts-with``, ``@a``, ``and``). A numeric position becomes
+    ``:nth-of-type`` only as the sole predicate of a named tag; positions after other
+    predicates or on ``*`` have no CSS equivalent. ``contains(@class, ...)`` becomes
+    ``[class*=...]``, which keeps XPath's substring semantics. Text, axis and function
+    predicates stay XPath.
+    """
+    relative = xpath.startswith(".")
+    steps = _split_steps(xpath[1:] if relative else xpath)
+    if not steps:
+        return None
+    parts = []
+    for index, (axis, step) in enumerate(steps):
+        css = _compile_step(step)
+        if css is None:
+            return None
+        if index == 0:
+            if axis == "/" and not relative:
+                return None  # absolute /html/... paths: leave to XPath
+            parts.append(f":scope > {css}" if relative and axis == "/" else css)
+        else:
+            parts.append(f"> {css}" if axis == "/" else css)
+    return " ".join(parts)
+
+
+class Locator:
+    """A named locator compiled to the fastest strategy that keeps its meaning."""
+
+    def __init__(self, name, xpath):
+        self.name = name
+        self.xpath = xpath
+        css = xpath_to_css(xpath) if "{" not in xpath else None
+        self.by, self.value = (By.CSS_SELECTOR, css) if css else (By.XPATH, xpath)
+
+    def resolve(self, **params):
+        """Return the (by, value) pair, formatting templated locators with ``params``."""
+        if not params:
+            return self.by, self.value
+        xpath = self.xpath.format(**params)
+        css = xpath_to_css(xpath)
+        return (By.CSS_SELECTOR, css) if css else (By.XPATH, xpath)
+
+
+class LocatorStats:
+    """Usage counters for one locator."""
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.lookups = 0
+        self.cache_hits = 0
+        self.round_trips = 0
+        self.stale_recoveries = 0
+        self.find_seconds = 0.0
+
+    def to_dict(self):
+        return {"strategy": self.strategy, "lookups": self.lookups, "cache_hits": self.cache_hits,
+                "round_trips": self.round_trips, "stale_recoveries": self.stale_recoveries,
+                "find_ms": round(self.find_seconds * 1000, 1)}
+
+
+class RegistryElement(WebElement):
+    """
+    WebElement that re-resolves itself through the registry when it goes stale.
+
+    Every WebElement call goes through ``_execute``; on StaleElementReferenceException the
+    element is looked up again (same locator, same index) and the call is retried once.
+    """
+
+    def __init__(self, element, registry, key, index):
+        super().__init__(element.parent, element.id)
+        self._registry = registry
+        self._key = key
+        self._index = index
+
+    def _execute(self, command, params=None):
+        try:
+            return super()._execute(command, params)
+        except StaleElementReferenceException:
+            fresh = self._registry._refresh(self._key, self._index)
+            if fresh is None:
+                raise
+            self._id = fresh.id
+            return super()._execute(command, params)
+
+
+class LocatorRegistry:
+    """
+    Central registry of page locators with per-page-generation element caching.
+
+    ``wait_for`` timeouts are learned per locator when ``timeouts`` (AdaptiveTimeouts) is given.
+    ``attach`` hooks the driver so navigation commands start a new page generation and drop
+    the cache. Within a generation, ``find`` returns the cached element without a
+    WebDriver round trip; elements that a client-side re-render made stale are resolved
+    again transparently on their next use.
+    """
+
+    def __init__(self, logger, locators=None, timeouts=None):
+        self.logger = logger
+        self.timeouts = timeouts
+        self.driver = None
+        self.generation = 0
+        self._locators = {}
+        self._stats = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+        for name, xpath in (locators or {}).items():
+            self.register(name, xpath)
+
+    def register(self, name, xpath):
+        locator = Locator(name, xpath)
+        self._locators[name] = locator
+        self._stats[name] = LocatorStats("css" if locator.by == By.CSS_SELECTOR else "xpath")
+        return locator
+
+    def attach(self, driver):
+        """Use ``driver`` for lookups and bump the page generation on every navigation."""
+        self.driver = driver
+        self.new_generation()
+        original_execute = driver.execute
+
+        def generation_tracking_execute(driver_command, params=None):
+            if driver_command in NAVIGATION_COMMANDS:
+                self.new_generation()
+            return original_execute(driver_command, params)
+
+        driver.execute = generation_tracking_execute
+        return driver
+
+    def new_generation(self):
+        with self._lock:
+            self.generation += 1
+            self._cache.clear()
+
+    def locator(self, name, **params):
+        """(by, value) for use with expected_conditions and find_element(s)."""
+        return self._locators[name].resolve(**params)
+
+    def _lookup(self, key, context=None):
+        name, params = key[0], dict(key[1])
+        by, value = self.locator(name, **params)
+        stats = self._stats[name]
+        started = time.perf_counter()
+        elements = (context or self.driver).find_elements(by, value)
+        with self._lock:
+            stats.round_trips += 1
+            stats.find_seconds += time.perf_counter() - started
+        return [RegistryElement(element, self, key, index) for index, element in enumerate(elements)]
+
+    def _refresh(self, key, index):
+        elements = self._lookup(key)
+        with self._lock:
+            self._stats[key[0]].stale_recoveries += 1
+            if elements:
+                self._cache[key] = elements
+        return elements[index] if index < len(elements) else None
+
+    def find_all(self, name, cache=False, **params):
+        """
+        Return all matches. Lists are re-queried by default because their length changes
+        as the page renders; pass ``cache=True`` for static lists.
+        """
+        key = (name, tuple(sorted(params.items())))
+        with self._lock:
+            self._stats[name].lookups += 1
+            cached = self._cache.get(key) if cache else None
+            if cached is not None:
+                self._stats[name].cache_hits += 1
+                return list(cached)
+        elements = self._lookup(key)
+        if elements:
+            with self._lock:
+                self._cache[key] = elements
+        return list(elements)
+
+    def find(self, name, **params):
+        """
+        Return the first match, from the cache when this page generation already resolved it.
+
+        Returns:
+            WebElement or None
+        """
+        elements = self.find_all(name, cache=True, **params)
+        return elements[0] if elements else None
+
+    def wait_for(self, name, timeout=10, condition=EC.presence_of_element_located, **params):
+        """Wait for ``condition`` on the locator and cache the element it yields."""
+        key = (name, tuple(sorted(params.items())))
+        with self._lock:
+            self._stats[name].lookups += 1
+            cached = self._cache.get(key)
+        if cached and condition is EC.presence_of_element_located:
+            with self._lock:
+                self._stats[name].cache_hits += 1
+            return cached[0]
+
+        started = time.perf_counter()
+        wait = (self.timeouts.wait(self.driver, f"locator.{name}", timeout) if self.timeouts
+                else WebDriverWait(self.driver, timeout))
+        element = wait.until(condition(self.locator(name, **params)))
+        with self._lock:
+            self._stats[name].round_trips += 1
+            self._stats[name].find_seconds += time.perf_counter() - started
+            wrapped = RegistryElement(element, self, key, 0)
+            self._cache[key] = [wrapped]
+        return wrapped
+
+    def stats(self):
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self._stats.items() if stats.lookups}
+
+    def log_stats(self):
+        stats = sorted(self.stats().items(), key=lambda item: item[1]["lookups"], reverse=True)
+        lines = [f"{name:<28} {s['strategy']:<5} lookups={s['lookups']:<5} hits={s['cache_hits']:<5} "
+                 f"round_trips={s['round_trips']:<5} stale={s['stale_recoveries']:<3} find={s['find_ms']}ms"
+                 for name, s in stats]
+        self.logger.info("Locator usage:\n" + "\n".join(lines))
@@ -0,0 +1,215 @@
+import imaplib
+import re
+import threading
+import time
+from collections import deque
+from email import message_from_bytes
+from email.utils import getaddresses, parsedate_to_datetime
+
+from retry import RetryPolicy
+
+OTP_PATTERN = re.compile(r"\b(\d{6})\b")
+RECIPIENT_HEADERS = ("To", "Cc", "Delivered-To", "X-Original-To")
+RECONNECT_RETRY = RetryPolicy(attempts=5, base_delay=1.0, max_delay=30.0)
+
+
+def message_body(message):
+    """Text of the first text/plain or text/html part."""
+    for part in message.walk():
+        if part.get_content_type() in ("text/plain", "text/html"):
+            payload = part.get_payload(decode=True)
+            if payload is not None:
+                return payload.decode(part.get_content_charset() or "utf-8", errors="ignore")
+    return ""
+
+
+def message_timestamp(message, default):
+    """POSIX time from the Date header, or ``default`` if it is missing or malformed."""
+    try:
+        return parsedate_to_datetime(message["Date"]).timestamp()
+    except (TypeError, ValueError):
+        return default
+
+
+class RoutedMessage:
+    def __init__(self, uid, message, received_at):
+        self.uid = uid
+        self.message = message
+        self.subject = message.get("Subject", "")
+        self.sender = message.get("From", "")
+        self.sent_at = message_timestamp(message, received_at)
+        self.body = message_body(message)
+
+
+class MailRouter:
+    """
+    Reads one mailbox over a single shared IMAP connection and hands each new message to
+    the worker waiting for its recipient address.
+
+    A background thread polls with NOOP and fetches only messages whose UID is above the
+    last one seen, so concurrent workers never rescan the mailbox. Messages are buffered per
+    recipient until a worker claims them with ``wait_for``. Within one recipient's buffer
+    each message goes to one waiter only; a message addressed to several recipients is
+    buffered for each of them, so each recipient's waiter gets its own copy. Messages are
+    fetched with BODY.PEEK, leaving their \\Seen flags alone.
+    """
+
+    def __init__(self, logger, imap_server, email_address, app_password, port=993, sender_email=None,
+                 poll_interval=1.0, buffer_size=50, connect_timeout=30):
+        self.logger = logger
+        self.imap_server = imap_server
+        self.port = port
+        self.email_address = email_address
+        self.app_password = app_password
+        self.sender_email = sender_email.lower() if sender_email else None
+        self.poll_interval = poll_interval
+        self.buffer_size = buffer_size
+        self.connect_timeout = connect_timeout
+        self._buffers = {}
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._mail = None
+        self._last_uid = 0
+
+    @classmethod
+    def from_config(cls, config, logger, **kwargs):
+        return cls(logger, config.IMAP_SERVER, config.EMAIL_ADDRESS, config.APP_PASSWORD,
+                   port=getattr(config, "IMAP_PORT", 993), sender_email=config.SENDER_EMAIL, **kwargs)
+
+    def start(self, include_existing=False):
+        """
+        Connect and start routing. Messages already in the mailbox are ignored unless
+        ``include_existing`` is set.
+        """
+        self._connect()
+        if not include_existing:
+            self._last_uid = max(self._search_uids("ALL"), default=0)
+        self._thread = threading.Thread(target=self._run, name="mail-router", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Mail router started for {self.email_address} (after UID {self._last_uid})")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.connect_timeout)
+        self._disconnect()
+
+    def _connect(self):
+        self._mail = imaplib.IMAP4_SSL(self.imap_server, self.port, timeout=self.connect_timeout)
+        self._mail.login(self.email_address, self.app_password)
+        self._mail.select("inbox", readonly=True)
+
+    def _disconnect(self):
+        if self._mail is not None:
+            try:
+                self._mail.logout()
+            except Exception:
+                pass
+            self._mail = None
+
+    def _search_uids(self, criteria):
+        status, data = self._mail.uid("SEARCH", None, criteria)
+        if status != "OK":
+            raise imaplib.IMAP4.error(f"UID SEARCH {criteria} failed: {data}")
+        return [int(uid) for uid in data[0].split()]
+
+    def _run(self):
+        failures = 0
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+                failures = 0
+            except (imaplib.IMAP4.abort, OSError) as e:
+                failures += 1
+                if failures >= RECONNECT_RETRY.attempts:
+                    self.logger.error(f"Mail router giving up after {failures} connection failures: {e}")
+                    return
+                delay = RECONNECT_RETRY.delay(failures - 1)
+                self.logger.warning(f"Mail router connection lost ({e}), reconnecting in {delay:.1f}s")
+                self._disconnect()
+                if self._stop.wait(delay):
+                    return
+                try:
+                    self._connect()
+                except Exception as reconnect_error:
+                    self.logger.warning(f"Mail router reconnect failed: {reconnect_error}")
+            except Exception as e:
+                self.logger.error(f"Mail router poll failed: {e}")
+
+    def poll(self):
+        """Fetch and route messages that arrived since the last poll."""
+        self._mail.noop()
+        # "n:*" always matches the highest UID, even when it is below n
+        uids = [uid for uid in self._search_uids(f"UID {self._last_uid + 1}:*") if uid > self._last_uid]
+        for uid in uids:
+            status, data = self._mail.uid("FETCH", str(uid), "(BODY.PEEK[])")
+            raw = next((item[1] for item in data if isinstance(item, tuple)), None)
+            if status == "OK" and raw is not None:
+                self._route(RoutedMessage(uid, message_from_bytes(raw), time.time()))
+            self._last_uid = max(self._last_uid, uid)
+
+    def _route(self, routed):
+        if self.sender_email and self.sender_email not in routed.sender.lower():
+            return
+        headers = [value for name in RECIPIENT_HEADERS for value in routed.message.get_all(name, [])]
+        recipients = {address.lower() for _, address in getaddresses(headers) if address}
+        with self._condition:
+            for recipient in recipients:
+                buffer = self._buffers.setdefault(recipient, deque(maxlen=self.buffer_size))
+                buffer.append(routed)
+            self._condition.notify_all()
+        self.logger.debug("Routed UID %s (%s) to %s", routed.uid, routed.subject, sorted(recipients))
+
+    def _claim(self, address, since, predicate):
+        buffer = self._buffers.get(address, ())
+        for routed in buffer:
+            if (since is None or routed.sent_at >= since) and (predicate is None or predicate(routed)):
+                buffer.remove(routed)
+                return routed
+        return None
+
+    def wait_for(self, address, since=None, predicate=None, timeout=60):
+        """
+        Wait for a message to ``address`` and claim it.
+
+        Args:
+            since: datetime or POSIX time; older messages (by Date header) are skipped
+            predicate: Optional filter on the RoutedMessage, e.g. a subject check
+
+        Returns:
+            RoutedMessage or None on timeout
+        """
+        address = address.lower()
+        since = since.timestamp() if hasattr(since, "timestamp") else since
+        if since is not None:
+            since = int(since)  # Date headers have one-second resolution
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                routed = self._claim(address, since, predicate)
+                if routed is not None:
+                    return routed
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def wait_for_otp(self, address, since=None, timeout=60, pattern=OTP_PATTERN):
+        """Wait for an OTP email to ``address`` and return the code, or None."""
+        routed = self.wait_for(address, since, lambda message: pattern.search(message.body), timeout)
+        return pattern.search(routed.body).group(1) if routed else None
+
+    def attach(self, sign_in_handler, address, timeout=60):
+        """
+        Make ``sign_in_handler`` log in as ``address`` and read its OTPs from this router
+        instead of opening its own IMAP session per fetch.
+        """
+        sign_in_handler.email_address = address
+
+        def fetch_latest_unseen_email(since=None, *args, **kwargs):
+            return self.wait_for_otp(address, since, timeout=timeout)
+
+        sign_in_handler.fetch_latest_unseen_email = fetch_latest_unseen_email
+        return sign_in_handler
@@ -0,0 +1,288 @@
+import json
+import random
+import re
+import secrets
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Queue
+
+SUPPORTED_EXTENSIONS = (".py",)
+MIN_CODE_LINES = 10
+
+# Error texts the real service shows (see FileUploadTests.check_error_messages)
+ERROR_TOO_SMALL = "The code snippet is too small"
+ERROR_UNSUPPORTED_FORMAT = "This file format is not supported"
+
+SEVERITIES = ["High", "Medium", "Low"]
+
+
+class AnalysisJob:
+    """State of one submitted analysis."""
+
+    def __init__(self, owner, factor, filename, code):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.factor = factor
+        self.filename = filename
+        self.code = code
+        self.lines = code.count("\n") + 1
+        self.status = "queued"
+        self.progress = "Queued"
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.completed_at = None
+        self.issues = []
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "factor": self.factor,
+            "filename": self.filename,
+            "status": self.status,
+            "progress": self.progress,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "issues": self.issues if self.status == "done" else [],
+            "error": self.error,
+        }
+
+
+class MockAnalysisBackend:
+    """
+    In-process stand-in for the CodeSherlock analysis service.
+
+    Submitted jobs wait in a FIFO queue for one of ``workers`` simulated analysers, so
+    queueing delay under load behaves like a capacity-limited service. Processing time is
+    ``base_latency + per_line_latency * lines`` and ``error_rate`` fails a share of jobs.
+    """
+
+    def __init__(self, workers=2, base_latency=1.0, per_line_latency=0.002, error_rate=0.0, seed=0):
+        self.base_latency = base_latency
+        self.per_line_latency = per_line_latency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._tokens = {}
+        self._queue = Queue()
+        self._stopped = threading.Event()
+        self._workers = [threading.Thread(target=self._work, name=f"mock-analyser-{i}", daemon=True)
+                         for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def login(self, email):
+        """Issue a session token for ``email``."""
+        token = secrets.token_hex(16)
+        with self._lock:
+            self._tokens[token] = email
+        return token
+
+    def user_for_token(self, token):
+        with self._lock:
+            return self._tokens.get(token)
+
+    def logout(self, token):
+        with self._lock:
+            self._tokens.pop(token, None)
+
+    def submit(self, owner, factor, filename, code):
+        """
+        Queue an analysis.
+
+        Returns:
+            AnalysisJob: The queued job
+
+        Raises:
+            ValueError: With the service's error text for rejected uploads
+        """
+        if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise ValueError(ERROR_UNSUPPORTED_FORMAT)
+        if len([line for line in code.splitlines() if line.strip()]) < MIN_CODE_LINES:
+            raise ValueError(ERROR_TOO_SMALL)
+
+        job = AnalysisJob(owner, factor, filename, code)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._queue.put(job.id)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def history(self, owner):
+        """Return the owner's jobs, newest first."""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.owner == owner]
+        return sorted(jobs, key=lambda job: job.submitted_at, reverse=True)
+
+    def _work(self):
+        while not self._stopped.is_set():
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            job = self.get(job_id)
+            job.status = "processing"
+            job.started_at = time.time()
+
+            duration = self.base_latency + self.per_line_latency * job.lines
+            for stage in ("Parsing code", f"Running {job.factor}", "Preparing report"):
+                job.progress = stage
+                time.sleep(duration / 3)
+
+            with self._lock:
+                failed = self._rng.random() < self.error_rate
+            if failed:
+                job.status = "failed"
+                job.error = "Analysis failed, please try again"
+            else:
+                job.issues = self._find_issues(job)
+                job.status = "done"
+            job.progress = "Completed"
+            job.completed_at = time.time()
+
+    def _find_issues(self, job):
+        """Flag a few well known patterns so results look like a real report."""
+        patterns = [
+            (r"time\.sleep\(", "Busy waiting keeps the CPU awake", "High"),
+            (r"except\s*:", "Bare except hides errors", "Medium"),
+            (r"=\s*\[\]\)", "Mutable default argument", "Medium"),
+            (r"output = output \+", "String concatenation in a loop", "Low"),
+            (r"sorted\(.*\)\[", "Sorting inside a loop", "High"),
+        ]
+        issues = []
+        for number, line in enumerate(job.code.splitlines(), start=1):
+            for pattern, description, severity in patterns:
+                if re.search(pattern, line):
+                    issues.append({
+                        "id": f"Issue-{len(issues) + 1}",
+                        "severity": severity,
+                        "description": f"{description} (line {number})",
+                        "code": line.strip(),
+                        "solution": "Refactor the highlighted code",
+                    })
+        return issues
+
+    def stop(self):
+        self._stopped.set()
+        for _ in self._workers:
+            self._queue.put(None)
+
+
+class AnalysisApiHandler(BaseHTTPRequestHandler):
+    """JSON API: POST /api/login, POST /api/analyze, GET /api/analyze/<id>, GET /api/history."""
+
+    backend = None
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _token(self):
+        header = self.headers.get("Authorization", "")
+        if header.startswith("Bearer "):
+            return header[len("Bearer "):]
+        # Browser clients authenticate with the session cookie instead
+        for cookie in self.headers.get("Cookie", "").split(";"):
+            name, _, value = cookie.strip().partition("=")
+            if name == "session":
+                return value
+        return None
+
+    def _user(self):
+        token = self._token()
+        return self.backend.user_for_token(token) if token else None
+
+    def do_POST(self):
+        time.sleep(self.latency)
+        if self.path == "/api/login":
+            email = self._read_json().get("email")
+            if not email:
+                return self._send_json(400, {"error": "email is required"})
+            return self._send_json(200, {"token": self.backend.login(email)})
+
+        if self.path == "/api/analyze":
+            user = self._user()
+            if user is None:
+                return self._send_json(401, {"error": "Not authenticated"})
+            payload = self._read_json()
+            try:
+                job = self.backend.submit(user, payload.get("factor"), payload.get("filename", ""),
+                                          payload.get("code", ""))
+            except ValueError as e:
+                return self._send_json(422, {"error": str(e)})
+            return self._send_json(202, job.to_dict())
+
+        self._send_json(404, {"error": "Not found"})
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        user = self._user()
+        if user is None:
+            return self._send_json(401, {"error": "Not authenticated"})
+
+        if self.path.startswith("/api/analyze/"):
+            job = self.backend.get(self.path.rsplit("/", 1)[-1])
+            if job is None or job.owner != user:
+                return self._send_json(404, {"error": "Unknown analysis"})
+            return self._send_json(200, job.to_dict())
+
+        if self.path == "/api/history":
+            return self._send_json(200, {"analyses": [job.to_dict() for job in self.backend.history(user)]})
+
+        self._send_json(404, {"error": "Not found"})
+
+
+class MockAnalysisServer:
+    """
+    Serves ``MockAnalysisBackend`` over HTTP on a background thread.
+
+    Use ``port=0`` to pick a free port; ``url`` holds the resulting base URL.
+    """
+
+    def __init__(self, backend=None, host="127.0.0.1", port=0, latency=0.0, handler_class=AnalysisApiHandler):
+        self.backend = backend or MockAnalysisBackend()
+        handler = type("BoundRequestHandler", (handler_class,), {"backend": self.backend, "latency": latency})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-analysis-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self.backend.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
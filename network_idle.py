@@ -0,0 +1,175 @@
+import threading
+import time
+
+from cdp_session import CDPSession, websocket
+
+# Long-lived connections never finish, so they would keep the page "busy" forever
+IGNORED_RESOURCE_TYPES = ("WebSocket", "EventSource")
+IGNORED_URL_PREFIXES = ("data:", "blob:", "chrome-extension:")
+
+# Counts fetch/XHR requests in the page; installing it twice is a no-op
+_INTERCEPTOR = """
+(function () {
+    if (window.__networkTracker) { return; }
+    var tracker = window.__networkTracker = {inFlight: 0, lastChange: performance.now()};
+    var begin = function () { tracker.inFlight += 1; tracker.lastChange = performance.now(); };
+    var end = function () { tracker.inFlight = Math.max(0, tracker.inFlight - 1); tracker.lastChange = performance.now(); };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            begin();
+            return fetch.apply(this, arguments).then(
+                function (response) { end(); return response; },
+                function (error) { end(); throw error; });
+        };
+    }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        begin();
+        this.addEventListener('loadend', end, {once: true});
+        return send.apply(this, arguments);
+    };
+})();
+"""
+
+_READ_INTERCEPTOR = """
+var tracker = window.__networkTracker;
+return tracker ? [tracker.inFlight, performance.now() - tracker.lastChange] : null;
+"""
+
+
+class NetworkTracker:
+    """
+    Tracks the page's in-flight network requests so steps can wait for the app to settle
+    instead of checking ``document.readyState`` (which an SPA reaches long before its
+    XHR/fetch traffic is done) and sleeping.
+
+    On Chromium drivers with a debugger address it follows CDP ``Network.*`` events over a
+    CDPSession and sees every request, including ones the page starts before a wait.
+    Otherwise it injects a fetch/XHR counter into the page (and, where
+    ``execute_cdp_cmd`` exists, into every new document); that mode only sees requests
+    made after the counter was installed in the current document.
+    """
+
+    def __init__(self, driver, logger, idle_ms=500, poll_interval=0.1):
+        self.driver = driver
+        self.logger = logger
+        self.idle_ms = idle_ms
+        self.poll_interval = poll_interval
+        self.mode = None
+        self._session = None
+        self._requests = {}
+        self._last_change = time.monotonic()
+        self._condition = threading.Condition()
+
+    def start(self):
+        """Start tracking; returns the mode in use ("cdp" or "interceptor")."""
+        if websocket is not None and CDPSession.is_supported(self.driver):
+            try:
+                self._start_cdp()
+                self.mode = "cdp"
+            except Exception as e:
+                self.logger.warning(f"CDP network tracking unavailable ({e}), using the fetch/XHR interceptor")
+                self._stop_cdp()
+        if self.mode is None:
+            self._start_interceptor()
+            self.mode = "interceptor"
+        self.logger.info(f"Network tracking started ({self.mode})")
+        return self.mode
+
+    def stop(self):
+        self._stop_cdp()
+        self.mode = None
+
+    def _start_cdp(self):
+        self._session = CDPSession(self.driver, self.logger).connect()
+        self._session.add_listener("Network.requestWillBeSent", self._on_request)
+        for event in ("Network.loadingFinished", "Network.loadingFailed"):
+            self._session.add_listener(event, self._on_done)
+        self._session.send("Network.enable")
+
+    def _stop_cdp(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        with self._condition:
+            self._requests.clear()
+            self._last_change = time.monotonic()
+            self._condition.notify_all()
+
+    def _start_interceptor(self):
+        if hasattr(self.driver, "execute_cdp_cmd"):
+            try:
+                self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _INTERCEPTOR})
+            except Exception as e:
+                self.logger.debug(f"Could not register the network interceptor for new documents: {e}")
+        self.driver.execute_script(_INTERCEPTOR)
+
+    def _on_request(self, params):
+        url = params.get("request", {}).get("url", "")
+        if params.get("type") in IGNORED_RESOURCE_TYPES or url.startswith(IGNORED_URL_PREFIXES):
+            return
+        with self._condition:
+            # Redirects reuse the request id, so the request is still counted once
+            self._requests[params["requestId"]] = url
+            self._last_change = time.monotonic()
+            self._condition.notify_all()
+
+    def _on_done(self, params):
+        with self._condition:
+            if self._requests.pop(params.get("requestId"), None) is not None:
+                self._last_change = time.monotonic()
+                self._condition.notify_all()
+
+    def _read_interceptor(self):
+        """(in-flight count, seconds since the last change), reinstalling the counter after a navigation."""
+        state = self.driver.execute_script(_READ_INTERCEPTOR)
+        if state is None:
+            self.driver.execute_script(_INTERCEPTOR)
+            return 0, 0.0
+        return int(state[0]), state[1] / 1000
+
+    def in_flight(self):
+        """Number of requests the page is waiting on right now."""
+        if self.mode == "interceptor":
+            return self._read_interceptor()[0]
+        with self._condition:
+            return len(self._requests)
+
+    def pending_urls(self):
+        """URLs of the in-flight requests (CDP mode only), for logging what a page is stuck on."""
+        with self._condition:
+            return list(self._requests.values())
+
+    def wait_for_idle(self, idle_ms=None, timeout=30):
+        """
+        Block until no request has been in flight for ``idle_ms`` milliseconds.
+
+        Returns:
+            bool: True once idle, False if ``timeout`` seconds passed first
+        """
+        quiet = (self.idle_ms if idle_ms is None else idle_ms) / 1000
+        deadline = time.monotonic() + timeout
+        if self.mode == "interceptor":
+            while True:
+                in_flight, since_change = self._read_interceptor()
+                if in_flight == 0 and since_change >= quiet:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                time.sleep(min(self.poll_interval, remaining, max(quiet - since_change, 0.01)))
+
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if not self._requests and now - self._last_change >= quiet:
+                    return True
+                remaining = deadline - now
+                if remaining <= 0:
+                    return False
+                # Woken early by any request starting or finishing
+                if self._requests:
+                    self._condition.wait(remaining)
+                else:
+                    self._condition.wait(min(remaining, quiet - (now - self._last_change)))
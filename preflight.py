@@ -0,0 +1,166 @@
+import imaplib
+import os
+import shutil
+import socket
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+
+DEFAULT_TIMEOUT = 5
+DEFAULT_MIN_FREE_MB = 200
+EDGE_DRIVER_NAMES = ("msedgedriver", "msedgedriver.exe")
+
+
+class PreflightError(RuntimeError):
+    """Raised when one or more preflight checks fail; ``results`` holds every outcome."""
+
+    def __init__(self, results):
+        self.results = results
+        failed = ", ".join(result.name for result in results if not result.passed)
+        super().__init__(f"Preflight failed: {failed}")
+
+
+class CheckResult:
+    """Outcome of one preflight check."""
+
+    def __init__(self, name, passed, detail, duration):
+        self.name = name
+        self.passed = passed
+        self.detail = detail
+        self.duration = duration
+
+    def __str__(self):
+        status = "OK  " if self.passed else "FAIL"
+        return f"[{status}] {self.name:<12} {self.duration * 1000:7.0f} ms  {self.detail}"
+
+
+def check_imap(config, timeout):
+    """Log in to the configured mailbox and select the inbox."""
+    mail = imaplib.IMAP4_SSL(config.IMAP_SERVER, getattr(config, "IMAP_PORT", 993), timeout=timeout)
+    try:
+        mail.login(config.EMAIL_ADDRESS, config.APP_PASSWORD)
+        status, data = mail.select("inbox", readonly=True)
+        if status != "OK":
+            raise RuntimeError(f"SELECT inbox returned {status}")
+        return f"logged in to {config.IMAP_SERVER} as {config.EMAIL_ADDRESS}, {data[0].decode()} messages"
+    finally:
+        try:
+            mail.logout()
+        except (imaplib.IMAP4.error, OSError):
+            pass
+
+
+def check_app_url(config, timeout):
+    """Request LOGIN_URL; any response below 500 means the app is reachable."""
+    request = urllib.request.Request(config.LOGIN_URL, method="GET")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return f"{config.LOGIN_URL} returned {response.status}"
+    except urllib.error.HTTPError as e:
+        if e.code >= 500:
+            raise RuntimeError(f"{config.LOGIN_URL} returned {e.code}") from e
+        return f"{config.LOGIN_URL} returned {e.code}"
+
+
+def check_download_dir(config, timeout):
+    """DOWNLOAD_DIR must exist (or be creatable), accept a file write and have free space."""
+    directory = config.DOWNLOAD_DIR
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=".preflight_", delete=True) as probe:
+        probe.write(b"preflight")
+        probe.flush()
+    free_mb = shutil.disk_usage(directory).free / (1024 * 1024)
+    min_free_mb = getattr(config, "PREFLIGHT_MIN_FREE_MB", DEFAULT_MIN_FREE_MB)
+    if free_mb < min_free_mb:
+        raise RuntimeError(f"only {free_mb:.0f} MB free in {directory} (need {min_free_mb} MB)")
+    return f"{directory} writable, {free_mb:.0f} MB free"
+
+
+def check_driver(config, timeout):
+    """
+    Find the Edge driver: DRIVER_PATH from config, msedgedriver on PATH, or Selenium Manager
+    (which downloads a matching driver at startup).
+    """
+    driver_path = getattr(config, "DRIVER_PATH", None)
+    if driver_path:
+        if not os.path.isfile(driver_path) or not os.access(driver_path, os.X_OK):
+            raise RuntimeError(f"DRIVER_PATH {driver_path} is not an executable file")
+        return f"using {driver_path}"
+
+    for name in EDGE_DRIVER_NAMES:
+        found = shutil.which(name)
+        if found:
+            return f"found {found} on PATH"
+
+    try:
+        from selenium.webdriver.common.selenium_manager import SeleniumManager
+    except ImportError as e:
+        raise RuntimeError("no msedgedriver on PATH and Selenium Manager is unavailable") from e
+    manager = SeleniumManager()
+    binary = manager._get_binary() if hasattr(manager, "_get_binary") else SeleniumManager.get_binary()
+    if not os.path.isfile(binary):
+        raise RuntimeError("no msedgedriver on PATH and the Selenium Manager binary is missing")
+    return f"no msedgedriver on PATH, Selenium Manager will resolve one ({binary})"
+
+
+CHECKS = {
+    "imap": check_imap,
+    "app_url": check_app_url,
+    "download_dir": check_download_dir,
+    "driver": check_driver,
+}
+
+
+def _timed(name, check, config, timeout):
+    start = time.perf_counter()
+    try:
+        detail = check(config, timeout)
+        return CheckResult(name, True, detail, time.perf_counter() - start)
+    except (socket.timeout, TimeoutError):
+        return CheckResult(name, False, f"timed out after {timeout}s", time.perf_counter() - start)
+    except Exception as e:
+        return CheckResult(name, False, f"{type(e).__name__}: {e}", time.perf_counter() - start)
+
+
+def run_preflight(config, logger, checks=None, timeout=None):
+    """
+    Run the environment checks concurrently before any browser is launched.
+
+    Every check gets ``timeout`` seconds (PREFLIGHT_TIMEOUT, default 5); a check still running
+    after that is reported as timed out rather than waited for, so a broken environment
+    aborts within a few seconds.
+
+    Args:
+        checks: Names from ``CHECKS`` to run (all by default)
+
+    Returns:
+        list[CheckResult]: One result per check
+
+    Raises:
+        PreflightError: If any check failed
+    """
+    timeout = timeout or getattr(config, "PREFLIGHT_TIMEOUT", DEFAULT_TIMEOUT)
+    names = list(checks or CHECKS)
+    logger.info(f"Running preflight checks: {', '.join(names)}")
+
+    executor = ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="preflight")
+    futures = {name: executor.submit(_timed, name, CHECKS[name], config, timeout) for name in names}
+    wait(futures.values(), timeout=timeout + 1)
+    # Don't block on checks stuck past their timeout (e.g. a hung DNS lookup)
+    executor.shutdown(wait=False)
+
+    results = []
+    for name, future in futures.items():
+        if future.done():
+            results.append(future.result())
+        else:
+            results.append(CheckResult(name, False, f"timed out after {timeout}s", timeout))
+
+    report = "\n".join(str(result) for result in results)
+    if all(result.passed for result in results):
+        logger.info(f"Preflight passed:\n{report}")
+        return results
+    logger.error(f"Preflight failed, aborting before browser startup:\n{report}")
+    raise PreflightError(results)
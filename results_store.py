@@ -0,0 +1,294 @@
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+from latency_stats import percentile
+
+RESULTS_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'results.db')
+
+# Counts that should not move at all for a given fixture; any change against a stable baseline is flagged
+EXACT_METRICS = ("issue_count", "severity.")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    suite TEXT NOT NULL,
+    environment TEXT NOT NULL DEFAULT '',
+    fixture TEXT NOT NULL DEFAULT '',
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    passed INTEGER
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    step TEXT NOT NULL DEFAULT '',
+    factor TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (run_id, step, factor, name)
+);
+CREATE INDEX IF NOT EXISTS runs_group ON runs (suite, environment, fixture, started_at);
+"""
+
+
+class Regression:
+    """A metric of one run that is significantly off its rolling baseline."""
+
+    def __init__(self, step, factor, name, value, baseline, samples, change, score):
+        self.step = step
+        self.factor = factor
+        self.name = name
+        self.value = value
+        self.baseline = baseline
+        self.samples = samples
+        self.change = change
+        self.score = score
+
+    def __repr__(self):
+        where = "/".join(part for part in (self.factor, self.step) if part) or "run"
+        return (f"{where} {self.name}: {self.value:g} vs baseline {self.baseline:g} "
+                f"({self.change:+.0%}, robust z={self.score:.1f}, n={self.samples})")
+
+
+def robust_score(value, baseline):
+    """
+    Return (median, relative change, robust z-score) of ``value`` against ``baseline``.
+
+    The z-score uses the median absolute deviation (scaled to match a standard deviation for
+    normal data), so one earlier outlier run does not widen the band. A constant baseline
+    gives an infinite score for any different value.
+    """
+    median = percentile(baseline, 50)
+    mad = percentile([abs(sample - median) for sample in baseline], 50) * 1.4826
+    change = (value - median) / median if median else (0.0 if value == median else float("inf"))
+    if mad:
+        score = (value - median) / mad
+    else:
+        score = 0.0 if value == median else float("inf") if value > median else float("-inf")
+    return median, change, score
+
+
+class ResultsStore:
+    """
+    SQLite store of per-run, per-step and per-factor metrics.
+
+    A run is identified by the tracer's run_id and grouped with earlier runs of the same
+    suite, environment and fixture. Metrics are (step, factor, name) -> value, with '' for
+    run-wide step or factor, e.g. ("wait_for_processing", "", "duration_s") or
+    ("", "Power Analysis", "severity.High"). Connections are per thread.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or RESULTS_DB
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.executescript(_SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path, timeout=30)
+        return connection
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def start_run(self, run_id, suite, environment="", fixture=""):
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO runs (run_id, suite, environment, fixture, started_at) "
+                               "VALUES (?, ?, ?, ?, ?)", (run_id, suite, environment, fixture or "", time.time()))
+
+    def finish_run(self, run_id, passed):
+        with self._connection() as connection:
+            connection.execute("UPDATE runs SET finished_at = ?, passed = ? WHERE run_id = ?",
+                               (time.time(), int(bool(passed)), run_id))
+
+    def record(self, run_id, name, value, step="", factor=""):
+        """Store one metric value (recording it again overwrites it)."""
+        self.record_many(run_id, [(step, factor, name, value)])
+
+    def record_many(self, run_id, rows):
+        """Store (step, factor, name, value) tuples in one transaction."""
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO metrics (run_id, step, factor, name, value) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, step or "", factor or "", name, float(value)) for step, factor, name, value in rows
+                 if value is not None])
+
+    def record_tracer(self, run_id, tracer):
+        """Store step durations and WebDriver command counts from a StepTracer."""
+        totals = {}
+        for span in tracer.finished_spans("step"):
+            duration, failures = totals.get(span.name, (0.0, 0))
+            failed = span.error is not None or span.attributes.get("result") is False
+            totals[span.name] = (duration + span.duration, failures + failed)
+        rows = []
+        for step, (duration, failures) in totals.items():
+            rows.append((step, "", "duration_s", duration))
+            rows.append((step, "", "failures", failures))
+        for step, count in tracer.step_counts("webdriver").items():
+            rows.append((step, "", "webdriver_commands", count))
+        self.record_many(run_id, rows)
+
+    def record_locator_stats(self, run_id, stats):
+        """Store lookup and stale-recovery counts from ``LocatorRegistry.stats()``."""
+        rows = []
+        for name, counters in stats.items():
+            rows.append(("", "", f"locator.{name}.lookups", counters["lookups"]))
+            rows.append(("", "", f"locator.{name}.stale_recoveries", counters["stale_recoveries"]))
+        self.record_many(run_id, rows)
+
+    def run(self, run_id):
+        cursor = self._connection().execute("SELECT run_id, suite, environment, fixture, started_at, finished_at, "
+                                            "passed FROM runs WHERE run_id = ?", (run_id,))
+        return cursor.fetchone()
+
+    def runs(self, limit=20, suite=None):
+        query = "SELECT run_id, suite, environment, fixture, started_at, finished_at, passed FROM runs"
+        args = ()
+        if suite:
+            query, args = query + " WHERE suite = ?", (suite,)
+        return self._connection().execute(query + " ORDER BY started_at DESC LIMIT ?", args + (limit,)).fetchall()
+
+    def metrics(self, run_id):
+        """{(step, factor, name): value} for one run."""
+        cursor = self._connection().execute("SELECT step, factor, name, value FROM metrics WHERE run_id = ?",
+                                            (run_id,))
+        return {(step, factor, name): value for step, factor, name, value in cursor}
+
+    def baseline(self, run_id, window=20):
+        """
+        Values of every metric in the ``window`` passed runs that precede ``run_id`` in its
+        group (same suite, environment and fixture), oldest first. Failed and unfinished
+        runs are left out: their partial metrics would skew the medians.
+
+        Returns:
+            dict: {(step, factor, name): [values]}
+
+        Raises:
+            KeyError: ``run_id`` is not in the store
+        """
+        row = self._connection().execute(
+            "SELECT suite, environment, fixture, started_at FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown run id: {run_id}")
+        suite, environment, fixture, started_at = row
+        cursor = self._connection().execute(
+            "SELECT m.step, m.factor, m.name, m.value FROM metrics m JOIN ("
+            "  SELECT run_id, started_at FROM runs WHERE suite = ? AND environment = ? AND fixture = ?"
+            "  AND started_at < ? AND passed = 1 ORDER BY started_at DESC LIMIT ?"
+            ") r ON m.run_id = r.run_id ORDER BY r.started_at",
+            (suite, environment, fixture, started_at, window))
+        history = {}
+        for step, factor, name, value in cursor:
+            history.setdefault((step, factor, name), []).append(value)
+        return history
+
+    def detect_regressions(self, run_id=None, window=20, min_samples=5, threshold=0.3, z_limit=3.0):
+        """
+        Compare a run (the latest by default) with its rolling baseline.
+
+        A timing, command count or artifact size is flagged when it grew by at least
+        ``threshold`` (a fraction) and its robust z-score is at least ``z_limit``, so both a
+        meaningful and a statistically unusual change are required. Issue and severity
+        counts (EXACT_METRICS) are flagged on any change against a baseline where the
+        value is stable, or on a z-score beyond ``z_limit`` in either direction.
+
+        Returns:
+            list[Regression]: Worst first
+        """
+        if run_id is None:
+            latest = self.runs(limit=1)
+            if not latest:
+                return []
+            run_id = latest[0][0]
+        history = self.baseline(run_id, window)
+        regressions = []
+        for (step, factor, name), value in self.metrics(run_id).items():
+            baseline = history.get((step, factor, name), [])
+            if len(baseline) < min_samples:
+                continue
+            median, change, score = robust_score(value, baseline)
+            if name.startswith(EXACT_METRICS):
+                flagged = value != median and (all(sample == median for sample in baseline)
+                                               or abs(score) >= z_limit)
+            else:
+                flagged = change >= threshold and score >= z_limit
+            if flagged:
+                regressions.append(Regression(step, factor, name, value, median, len(baseline), change, score))
+        regressions.sort(key=lambda regression: abs(regression.change), reverse=True)
+        return regressions
+
+
+def file_size(path):
+    """Size of ``path`` in bytes, or None if it does not exist."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def _format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S') if timestamp else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the test results store and detect regressions")
+    parser.add_argument("--db", default=RESULTS_DB, help="Path to the SQLite results database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runs_parser = commands.add_parser("runs", help="List recent runs")
+    runs_parser.add_argument("--limit", type=int, default=20)
+    runs_parser.add_argument("--suite")
+
+    history_parser = commands.add_parser("history", help="Show one metric across recent runs")
+    history_parser.add_argument("name", help="Metric name, e.g. duration_s or severity.High")
+    history_parser.add_argument("--step", default="")
+    history_parser.add_argument("--factor", default="")
+    history_parser.add_argument("--limit", type=int, default=20)
+
+    check_parser = commands.add_parser("check", help="Compare a run with its rolling baseline")
+    check_parser.add_argument("--run", help="Run id (default: the latest run)")
+    check_parser.add_argument("--window", type=int, default=20, help="Number of earlier runs in the baseline")
+    check_parser.add_argument("--min-samples", type=int, default=5)
+    check_parser.add_argument("--threshold", type=float, default=0.3, help="Minimum relative slowdown, e.g. 0.3")
+    check_parser.add_argument("--z", type=float, default=3.0, help="Minimum robust z-score")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+    if args.command == "runs":
+        for run_id, suite, environment, fixture, started_at, finished_at, passed in store.runs(args.limit, args.suite):
+            status = {None: "running", 1: "passed", 0: "failed"}[passed]
+            print(f"{run_id:<28} {suite:<16} {environment:<20} {fixture:<24} {_format_time(started_at)} {status}")
+        return 0
+
+    if args.command == "history":
+        cursor = store._connection().execute(
+            "SELECT r.run_id, r.started_at, m.value FROM metrics m JOIN runs r ON m.run_id = r.run_id "
+            "WHERE m.name = ? AND m.step = ? AND m.factor = ? ORDER BY r.started_at DESC LIMIT ?",
+            (args.name, args.step, args.factor, args.limit))
+        for run_id, started_at, value in cursor:
+            print(f"{run_id:<28} {_format_time(started_at)} {value:g}")
+        return 0
+
+    if args.run and store.run(args.run) is None:
+        parser.error(f"unknown run id: {args.run}")
+    regressions = store.detect_regressions(args.run, window=args.window, min_samples=args.min_samples,
+                                           threshold=args.threshold, z_limit=args.z)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions against the rolling baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
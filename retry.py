@@ -0,0 +1,133 @@
+import random
+import threading
+import time
+
+_local = threading.local()
+
+
+class Deadline:
+    """
+    Time budget shared by every retry on a thread.
+
+    ``activate`` makes the deadline current for the calling thread so ``retry_call`` picks it
+    up without threading it through every helper signature. Nested deadlines never extend
+    an outer one: the tighter of the two applies.
+    """
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def activate(self):
+        """
+        Make this deadline current on the calling thread.
+
+        Returns:
+            callable: Restores the previous deadline (suitable for ``TestCase.addCleanup``)
+        """
+        previous = current_deadline()
+        if previous is not None and previous.expires_at < self.expires_at:
+            self.expires_at = previous.expires_at
+        _local.deadline = self
+
+        def restore():
+            _local.deadline = previous
+
+        return restore
+
+
+def current_deadline():
+    """Return the deadline active on the calling thread, or None."""
+    return getattr(_local, "deadline", None)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter and exception classification.
+
+    The delay before retry ``n`` (0-based) is ``base_delay * multiplier ** n`` capped at
+    ``max_delay``, reduced by up to ``jitter`` (a fraction) at random so concurrent runs
+    don't retry in lockstep. Exceptions are retried only when they are instances of
+    ``retry_on`` and not of ``give_up_on``; anything else propagates immediately.
+    """
+
+    def __init__(self, attempts=3, base_delay=0.5, max_delay=10.0, multiplier=2.0, jitter=0.5,
+                 retry_on=(Exception,), give_up_on=()):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.retry_on = tuple(retry_on)
+        self.give_up_on = tuple(give_up_on)
+
+    def is_retryable(self, error):
+        return isinstance(error, self.retry_on) and not isinstance(error, self.give_up_on)
+
+    def delay(self, retry_index, rng=random):
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** retry_index)
+        return delay * (1 - self.jitter * rng.random())
+
+
+def retry_call(func, *args, policy=None, deadline=None, until=None, on_retry=None, logger=None,
+               description=None, **kwargs):
+    """
+    Call ``func(*args, **kwargs)`` until it succeeds, retrying per ``policy``.
+
+    Args:
+        policy: RetryPolicy (defaults to 3 attempts, retrying any Exception)
+        deadline: Deadline bounding total time; defaults to the thread's current deadline.
+                  The first attempt always runs; retries stop once the next backoff would
+                  overrun the budget.
+        until: Optional predicate on the result; a falsy verdict counts as a retryable
+               "not ready yet" outcome (e.g. an email that has not arrived)
+        on_retry: Optional callback ``on_retry(attempt, result, error)`` run before each backoff
+        description: Name used in log messages
+
+    Returns:
+        The first accepted result, or the last result if ``until`` never accepted one
+
+    Raises:
+        The last exception if it is not retryable or no attempts/budget remain
+    """
+    policy = policy or RetryPolicy()
+    deadline = deadline or current_deadline()
+    description = description or getattr(func, "__name__", "call")
+
+    for attempt in range(1, policy.attempts + 1):
+        result, error = None, None
+        try:
+            result = func(*args, **kwargs)
+            if until is None or until(result):
+                return result
+            outcome = "condition not met"
+        except Exception as e:
+            if not policy.is_retryable(e):
+                raise
+            error = e
+            outcome = f"{type(e).__name__}: {e}"
+
+        if attempt == policy.attempts:
+            break
+        delay = policy.delay(attempt - 1)
+        if deadline is not None and deadline.remaining() < delay:
+            if logger:
+                logger.warning(f"{description}: deadline budget exhausted after attempt {attempt} ({outcome})")
+            break
+
+        if logger:
+            logger.warning(f"{description}: attempt {attempt}/{policy.attempts} failed ({outcome}), "
+                           f"retrying in {delay:.2f}s")
+        if on_retry is not None:
+            on_retry(attempt, result, error)
+        time.sleep(delay)
+
+    if error is not None:
+        raise error
+    return result
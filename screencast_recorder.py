@@ -0,0 +1,275 @@
+import base64
+import bisect
+import io
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from PIL import Image
+
+from cdp_session import CDPSession
+
+try:
+    import imageio  # optional, only needed for mp4 output
+    import numpy
+except ImportError:
+    imageio = None
+
+
+class ScreencastMarkerHandler(logging.Handler):
+    """Logging handler that turns log records into screencast step markers."""
+
+    def __init__(self, recorder, level=logging.INFO):
+        super().__init__(level)
+        self.recorder = recorder
+
+    def emit(self, record):
+        try:
+            self.recorder.mark(record.getMessage(), timestamp=record.created)
+        except Exception:
+            self.handleError(record)
+
+
+class ScreencastRecorder:
+    """
+    Records a continuous, low-overhead video of a test through CDP ``Page.startScreencast``.
+
+    The browser pushes JPEG frames only when the page repaints. Frames are throttled to
+    ``fps`` on arrival and encoded on a background thread, so the test thread never blocks
+    on image I/O. Step markers (usually fed from the logger) are written next to the video
+    as ``<name>.markers.json`` with the frame index each step lines up with.
+    """
+
+    SUPPORTED_FORMATS = ("webp", "mp4")
+
+    def __init__(self, driver, logger, output_dir=None, fps=2, max_width=960, max_height=540,
+                 quality=60, video_format="webp"):
+        if video_format not in self.SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported screencast format '{video_format}'")
+        if video_format == "mp4" and imageio is None:
+            raise RuntimeError("mp4 screencasts require the 'imageio[ffmpeg]' package")
+
+        self.driver = driver
+        self.logger = logger
+        self.output_dir = output_dir or os.path.join(os.path.dirname(__file__), 'screencasts')
+        self.fps = fps
+        self.max_width = max_width
+        self.max_height = max_height
+        self.quality = quality
+        self.video_format = video_format
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self._session = None
+        self._frames = queue.Queue()
+        self._encoder = None
+        self._markers = []
+        self._frame_times = []
+        self._frames_written = 0
+        self._last_frame_time = None
+        self._output_path = None
+        self._name = None
+        self._recording = False
+
+    @property
+    def is_recording(self):
+        return self._recording
+
+    def start(self, name):
+        """
+        Start recording the current page.
+
+        Args:
+            name: Base name of the output file, usually the test name
+
+        Returns:
+            bool: True if recording started, False otherwise
+        """
+        if self._recording:
+            self.logger.warning("Screencast already recording, ignoring start request")
+            return True
+        try:
+            self._name = name
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self._output_path = os.path.join(self.output_dir, f"{name}_{timestamp}.{self.video_format}")
+            self._markers = []
+            self._frame_times = []
+            self._frames_written = 0
+            self._last_frame_time = None
+
+            self._session = CDPSession(self.driver, self.logger).connect()
+            self._session.add_listener("Page.screencastFrame", self._on_frame)
+
+            self._encoder = threading.Thread(target=self._encode_loop, name="screencast-encoder", daemon=True)
+            self._encoder.start()
+
+            self._session.send("Page.startScreencast", {
+                "format": "jpeg",
+                "quality": self.quality,
+                "maxWidth": self.max_width,
+                "maxHeight": self.max_height,
+                "everyNthFrame": 1,
+            })
+            self._recording = True
+            self.logger.info(f"Screencast recording started: {self._output_path}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to start screencast: {e}")
+            self._shutdown()
+            return False
+
+    def mark(self, label, timestamp=None):
+        """Record a step marker at ``timestamp`` (defaults to now)."""
+        if self._recording:
+            self._markers.append({"label": label, "timestamp": timestamp or time.time()})
+
+    def marker_handler(self, level=logging.INFO):
+        """Return a logging handler that adds a marker for every record at ``level`` or above."""
+        return ScreencastMarkerHandler(self, level)
+
+    def stop(self):
+        """
+        Stop recording and finish encoding.
+
+        Returns:
+            str: Path to the encoded video, or None if nothing was recorded
+        """
+        if not self._recording:
+            return None
+        self._recording = False
+        try:
+            self._session.send("Page.stopScreencast")
+        except Exception as e:
+            self.logger.warning(f"Error stopping screencast: {e}")
+        self._shutdown()
+
+        if not self._frame_times:
+            self.logger.warning("Screencast stopped without receiving any frames")
+            return None
+
+        self._write_markers()
+        self.logger.info(f"Screencast saved to {self._output_path} ({self._frames_written} frames)")
+        return self._output_path
+
+    def rebind(self, driver):
+        """
+        Follow a replacement driver. A running recording is finished and a new one is
+        started on the new browser as ``<name>_recovered``.
+        """
+        name = self._name if self._recording else None
+        if name:
+            self.stop()
+        self.driver = driver
+        if name:
+            self.start(f"{name}_recovered")
+
+    def _shutdown(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self._encoder is not None:
+            self._frames.put(None)
+            self._encoder.join()
+            self._encoder = None
+
+    def _on_frame(self, params):
+        # Runs on the CDP reader thread: acknowledge without waiting, or Chrome stops sending
+        session = self._session
+        if session is None:
+            return  # Frame arrived while shutting down
+        session.send("Page.screencastFrameAck", {"sessionId": params["sessionId"]}, wait=False)
+
+        frame_time = params.get("metadata", {}).get("timestamp") or time.time()
+        if self._last_frame_time is not None and frame_time - self._last_frame_time < 1.0 / self.fps:
+            return
+        self._last_frame_time = frame_time
+        self._frames.put((frame_time, params["data"]))
+
+    def _encode_loop(self):
+        if self.video_format == "mp4":
+            self._encode_mp4()
+        else:
+            self._encode_webp()
+
+    def _encode_webp(self):
+        # Animated WebP can only be written in one go, so keep the compact JPEG payloads
+        # until the end and decode them lazily while saving
+        payloads = []
+        while True:
+            item = self._frames.get()
+            if item is None:
+                break
+            frame_time, data = item
+            payloads.append(base64.b64decode(data))
+            self._frame_times.append(frame_time)
+        self._frames_written = len(payloads)
+
+        if not payloads:
+            return
+        try:
+            frame_ms = int(1000 / self.fps)
+            durations = [max(frame_ms, int((later - earlier) * 1000))
+                         for earlier, later in zip(self._frame_times, self._frame_times[1:])]
+            durations.append(frame_ms)
+
+            # Image.open only parses headers; pixels are decoded frame by frame during save
+            first, *rest = [Image.open(io.BytesIO(payload)) for payload in payloads]
+            first.save(self._output_path, format="WEBP", save_all=True, append_images=rest,
+                       duration=durations, quality=self.quality, method=0)
+        except Exception as e:
+            self.logger.error(f"Failed to encode screencast: {e}")
+
+    def _encode_mp4(self):
+        # Constant frame rate output: repeat the last frame across repaint-free gaps
+        writer = None
+        previous = None
+        try:
+            writer = imageio.get_writer(self._output_path, fps=self.fps, macro_block_size=1)
+            while True:
+                item = self._frames.get()
+                if item is None:
+                    break
+                frame_time, data = item
+                image = Image.open(io.BytesIO(base64.b64decode(data))).convert("RGB")
+                if previous is not None:
+                    gap = int((frame_time - self._frame_times[-1]) * self.fps) - 1
+                    for _ in range(max(0, gap)):
+                        writer.append_data(previous)
+                        self._frames_written += 1
+                previous = numpy.asarray(image)
+                writer.append_data(previous)
+                self._frames_written += 1
+                self._frame_times.append(frame_time)
+        except Exception as e:
+            self.logger.error(f"Failed to encode screencast: {e}")
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def _write_markers(self):
+        start = self._frame_times[0]
+        markers = []
+        for marker in self._markers:
+            offset = marker["timestamp"] - start
+            if self.video_format == "mp4":
+                # Constant frame rate: gaps were filled with repeated frames
+                frame_index = round(offset * self.fps)
+            else:
+                # One frame per received frame, each shown until the next one arrived
+                frame_index = bisect.bisect_right(self._frame_times, marker["timestamp"]) - 1
+            markers.append({
+                "label": marker["label"],
+                "offset_seconds": round(offset, 3),
+                "frame": min(max(0, frame_index), max(0, self._frames_written - 1)),
+            })
+
+        markers_path = os.path.splitext(self._output_path)[0] + ".markers.json"
+        try:
+            with open(markers_path, 'w', encoding='utf-8') as file:
+                json.dump({"video": os.path.basename(self._output_path), "fps": self.fps,
+                           "frames": self._frames_written, "markers": markers}, file, indent=2)
+        except Exception as e:
+            self.logger.error(f"Failed to write screencast markers: {e}")
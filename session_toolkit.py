@@ -0,0 +1,145 @@
+import json
+import time
+
+# Fields of a CDP Network.Cookie that Network.setCookie(s) accepts back
+COOKIE_PARAM_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "priority",
+                       "sourceScheme", "sourcePort", "partitionKey")
+
+_READ_STORAGE = """
+var dump = function (storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) { items[storage.key(i)] = storage.getItem(storage.key(i)); }
+    return items;
+};
+return JSON.stringify({origin: location.origin, local: dump(localStorage), session: dump(sessionStorage)});
+"""
+
+_WRITE_STORAGE = """
+var state = JSON.parse(arguments[0]);
+localStorage.clear(); sessionStorage.clear();
+Object.keys(state.local).forEach(function (k) { localStorage.setItem(k, state.local[k]); });
+Object.keys(state.session).forEach(function (k) { sessionStorage.setItem(k, state.session[k]); });
+"""
+
+
+def _cookie_params(cookie, **overrides):
+    params = {field: cookie[field] for field in COOKIE_PARAM_FIELDS if field in cookie}
+    if not cookie.get("session", cookie.get("expires", -1) < 0):
+        params["expires"] = cookie["expires"]
+    params.update(overrides)
+    return params
+
+
+def tampered_value(value):
+    """A same-length value that no server should accept: every character shifted by one."""
+    return "".join(chr(ord(char) + 1) if char.isalnum() and char not in "zZ9" else "a" for char in value) or "x"
+
+
+class SessionSnapshot:
+    """Cookies of every domain plus the current origin's localStorage and sessionStorage."""
+
+    def __init__(self, name, cookies, origin, local_storage, session_storage, taken_at):
+        self.name = name
+        self.cookies = cookies
+        self.origin = origin
+        self.local_storage = local_storage
+        self.session_storage = session_storage
+        self.taken_at = taken_at
+
+    def cookie(self, name):
+        return next((cookie for cookie in self.cookies if cookie["name"] == name), None)
+
+
+class SessionToolkit:
+    """
+    Manipulates the browser's auth state over CDP so session scenarios need no re-login.
+
+    ``expire``, ``tamper`` and ``fast_forward`` rewrite single cookies with
+    ``Network.setCookie`` (the change is in effect when the call returns, so no sleeps are
+    needed); ``snapshot``/``restore`` save and reinstate all cookies and web storage, e.g.
+    to undo an expiry. Storage tokens (JWTs and the like) are edited with ``set_token``
+    and ``remove_token``. Restoring cannot revive a session the server has invalidated,
+    so scenarios that log out for real should run last. Chromium drivers only.
+    """
+
+    def __init__(self, driver, logger):
+        self.driver = driver
+        self.logger = logger
+
+    @staticmethod
+    def is_supported(driver):
+        return hasattr(driver, "execute_cdp_cmd")
+
+    def _cdp(self, method, params=None):
+        return self.driver.execute_cdp_cmd(method, params or {})
+
+    def cookies(self, url=None):
+        """Cookies sent to ``url`` (default: the current page)."""
+        return self._cdp("Network.getCookies", {"urls": [url or self.driver.current_url]})["cookies"]
+
+    def cookie(self, name, url=None):
+        return next((cookie for cookie in self.cookies(url) if cookie["name"] == name), None)
+
+    def _require(self, name):
+        cookie = self.cookie(name)
+        if cookie is None:
+            raise KeyError(f"No cookie named {name!r} for {self.driver.current_url}")
+        return cookie
+
+    def _set(self, cookie, **overrides):
+        if not self._cdp("Network.setCookie", _cookie_params(cookie, **overrides)).get("success", True):
+            raise RuntimeError(f"Browser rejected cookie {cookie['name']!r}")
+
+    def expire(self, name):
+        """Expire a cookie as the browser would at its expiry time."""
+        self._set(self._require(name), expires=1)
+        self.logger.info(f"Expired cookie {name}")
+
+    def tamper(self, name, value=None):
+        """Replace a cookie's value (default: a same-length corrupted value); returns the new value."""
+        cookie = self._require(name)
+        value = tampered_value(cookie["value"]) if value is None else value
+        self._set(cookie, value=value)
+        self.logger.info(f"Tampered with cookie {name}")
+        return value
+
+    def fast_forward(self, name, seconds):
+        """
+        Move a persistent cookie's expiry ``seconds`` closer, as if that much time had passed.
+
+        Returns:
+            float: Seconds left before the cookie expires (0 if it is now expired)
+        """
+        cookie = self._require(name)
+        if cookie.get("session") or cookie.get("expires", -1) < 0:
+            raise ValueError(f"Cookie {name!r} is a session cookie without an expiry; use expire()")
+        expires = cookie["expires"] - seconds
+        self._set(cookie, expires=max(expires, 1))
+        remaining = max(0.0, expires - time.time())
+        self.logger.info(f"Fast-forwarded cookie {name} by {seconds}s ({remaining:.0f}s left)")
+        return remaining
+
+    def _read_storage(self):
+        return json.loads(self.driver.execute_script(_READ_STORAGE))
+
+    def set_token(self, key, value, storage="localStorage"):
+        self.driver.execute_script(f"{storage}.setItem(arguments[0], arguments[1]);", key, value)
+
+    def remove_token(self, key, storage="localStorage"):
+        self.driver.execute_script(f"{storage}.removeItem(arguments[0]);", key)
+
+    def snapshot(self, name="snapshot"):
+        cookies = self._cdp("Network.getAllCookies")["cookies"]
+        storage = self._read_storage()
+        self.logger.info(f"Saved session snapshot {name} ({len(cookies)} cookies)")
+        return SessionSnapshot(name, cookies, storage["origin"], storage["local"], storage["session"], time.time())
+
+    def restore(self, snapshot):
+        """Reinstate the snapshot's cookies and storage; storage needs the page on the snapshot's origin."""
+        self._cdp("Network.clearBrowserCookies")
+        self._cdp("Network.setCookies", {"cookies": [_cookie_params(cookie) for cookie in snapshot.cookies]})
+        if self._read_storage()["origin"] != snapshot.origin:
+            self.driver.get(snapshot.origin)
+        self.driver.execute_script(_WRITE_STORAGE, json.dumps({"local": snapshot.local_storage,
+                                                               "session": snapshot.session_storage}))
+        self.logger.info(f"Restored session snapshot {snapshot.name}")
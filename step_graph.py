@@ -0,0 +1,155 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from background_tasks import carry_context
+
+
+class StepOutcome:
+    """What happened to one step: status is "passed", "failed" or "skipped"."""
+
+    def __init__(self, name, status, result=None, error=None, started=None, finished=None):
+        self.name = name
+        self.status = status
+        self.result = result
+        self.error = error
+        self.started = started
+        self.finished = finished
+
+    @property
+    def duration(self):
+        return self.finished - self.started if self.started is not None else 0.0
+
+    def __repr__(self):
+        return f"StepOutcome({self.name}, {self.status}, {self.duration:.2f}s)"
+
+
+class GraphReport:
+    """
+    Outcomes of a graph run plus its timing breakdown.
+
+    ``critical_path`` is the dependency chain with the largest summed step duration, i.e.
+    the run time with unlimited browsers. ``wall_seconds`` above ``critical_seconds`` is
+    time spent queueing for the single driver thread; ``serial_seconds`` is what a strictly
+    sequential run would have taken.
+    """
+
+    def __init__(self, outcomes, wall_seconds, critical_path, critical_seconds):
+        self.outcomes = outcomes
+        self.wall_seconds = wall_seconds
+        self.critical_path = critical_path
+        self.critical_seconds = critical_seconds
+        self.serial_seconds = sum(outcome.duration for outcome in outcomes.values())
+
+    @property
+    def failed(self):
+        return [name for name, outcome in self.outcomes.items() if outcome.status != "passed"]
+
+    def log(self, logger, label="Step graph"):
+        logger.info(f"{label}: {self.wall_seconds:.1f}s wall, {self.serial_seconds:.1f}s serial, "
+                    f"critical path {self.critical_seconds:.1f}s: {' -> '.join(self.critical_path)}")
+        for name, outcome in self.outcomes.items():
+            if outcome.status != "passed":
+                logger.warning(f"{label}: {name} {outcome.status}" + (f" ({outcome.error})" if outcome.error else ""))
+
+
+class _Step:
+    def __init__(self, name, func, args, kwargs, depends_on, driver):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.depends_on = tuple(depends_on)
+        self.driver = driver
+
+
+class StepGraph:
+    """
+    Runs test steps as a dependency graph on an asyncio loop.
+
+    Steps that use the browser (``driver=True``) run one at a time on a single thread
+    pinned to the driver, in the order they become ready (ties in the order they were
+    added), because a WebDriver session is not thread-safe. Other steps (IMAP, report
+    parsing, hashing) run on a worker pool concurrently with them. A step runs once all of
+    its dependencies passed; if one failed or was skipped, it is skipped. A step fails when
+    it raises or returns False.
+    """
+
+    def __init__(self, logger, io_workers=4):
+        self.logger = logger
+        self.io_workers = io_workers
+        self._steps = {}
+
+    def add(self, name, func, *args, depends_on=(), driver=True, **kwargs):
+        """Add a step; its dependencies must have been added already, which keeps the graph acyclic."""
+        missing = [dependency for dependency in depends_on if dependency not in self._steps]
+        if missing:
+            raise ValueError(f"Step {name} depends on unknown step(s): {', '.join(missing)}")
+        if name in self._steps:
+            raise ValueError(f"Duplicate step: {name}")
+        self._steps[name] = _Step(name, func, args, kwargs, depends_on, driver)
+        return self
+
+    def run(self):
+        """Run every step and return the GraphReport. Call from a thread without a running event loop."""
+        driver_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="driver")
+        io_executor = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="steps")
+        try:
+            started = time.perf_counter()
+            outcomes = asyncio.run(self._run_all(driver_executor, io_executor))
+            wall_seconds = time.perf_counter() - started
+        finally:
+            driver_executor.shutdown(wait=True)
+            io_executor.shutdown(wait=True)
+        critical_path, critical_seconds = self._critical_path(outcomes)
+        return GraphReport(outcomes, wall_seconds, critical_path, critical_seconds)
+
+    async def _run_all(self, driver_executor, io_executor):
+        tasks = {}
+        for step in self._steps.values():
+            dependencies = [tasks[name] for name in step.depends_on]
+            executor = driver_executor if step.driver else io_executor
+            tasks[step.name] = asyncio.ensure_future(self._run_step(step, dependencies, executor))
+        await asyncio.gather(*tasks.values())
+        return {name: task.result() for name, task in tasks.items()}
+
+    async def _run_step(self, step, dependencies, executor):
+        for outcome in await asyncio.gather(*dependencies):
+            if outcome.status != "passed":
+                return StepOutcome(step.name, "skipped", error=f"{outcome.name} {outcome.status}")
+
+        timing = {}
+
+        @carry_context
+        def call():
+            # Timed on the executor thread so waiting for the driver thread is not counted
+            timing["started"] = time.perf_counter()
+            try:
+                return step.func(*step.args, **step.kwargs)
+            finally:
+                timing["finished"] = time.perf_counter()
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, call)
+        except Exception as e:
+            self.logger.error(f"Step {step.name} raised: {e}")
+            return StepOutcome(step.name, "failed", error=e, **timing)
+        status = "failed" if result is False else "passed"
+        return StepOutcome(step.name, status, result=result, **timing)
+
+    def _critical_path(self, outcomes):
+        """Longest chain of summed durations; steps are in insertion (topological) order."""
+        length, previous = {}, {}
+        for step in self._steps.values():
+            best = max(step.depends_on, key=lambda name: length[name], default=None)
+            length[step.name] = outcomes[step.name].duration + (length[best] if best else 0.0)
+            previous[step.name] = best
+        if not length:
+            return [], 0.0
+        name = max(length, key=length.get)
+        total = length[name]
+        path = []
+        while name:
+            path.append(name)
+            name = previous[name]
+        return path[::-1], total
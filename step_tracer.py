@@ -0,0 +1,213 @@
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class Span:
+    """A single timed section of a run. Use ``set`` to attach attributes while it is open."""
+
+    def __init__(self, name, category, parent, attributes, step=None):
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.step = step
+        self.attributes = dict(attributes)
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.end = None
+        self.error = None
+
+    @property
+    def duration(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+
+class StepTracer:
+    """
+    Records nested timing spans for test steps, WebDriver commands and IMAP round trips.
+
+    Finished spans are appended to ``<run_id>.jsonl`` as they close, and ``close`` writes
+    ``<run_id>.trace.json`` in Chrome Trace Event format (open it in chrome://tracing or Perfetto).
+    """
+
+    def __init__(self, logger, output_dir=None, run_id=None):
+        self.logger = logger
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.output_dir = output_dir or os.path.join(os.path.dirname(__file__), 'traces')
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.jsonl_path = os.path.join(self.output_dir, f"{self.run_id}.jsonl")
+        self.trace_path = os.path.join(self.output_dir, f"{self.run_id}.trace.json")
+
+        self._origin = time.perf_counter()
+        self._origin_wall = time.time()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._finished = []
+        self._jsonl = open(self.jsonl_path, 'a', encoding='utf-8')
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current_span(self):
+        """Return the innermost open span on the calling thread, or None."""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def current_step(self):
+        """Return the name of the outermost "step" span on the calling thread, or None."""
+        for span in self._stack():
+            if span.category == "step":
+                return span.name
+        return None
+
+    @contextmanager
+    def span(self, name, category="step", **attributes):
+        """
+        Time a block of code as a span nested under the current one.
+
+        Args:
+            name: Span name, e.g. "handle_submit" or "webdriver.findElement"
+            category: "step", "webdriver", "imap", ... (shown as the trace category)
+            **attributes: Extra values recorded with the span
+        """
+        stack = self._stack()
+        step = self.current_step() or (name if category == "step" else None)
+        span = Span(name, category, stack[-1].name if stack else None, attributes, step=step)
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end = time.perf_counter()
+            stack.pop()
+            self._record(span)
+
+    def _record(self, span):
+        record = {
+            "run_id": self.run_id,
+            "name": span.name,
+            "category": span.category,
+            "parent": span.parent,
+            "thread_id": span.thread_id,
+            "start": round(self._origin_wall + (span.start - self._origin), 6),
+            "duration_ms": round(span.duration * 1000, 3),
+            "attributes": span.attributes,
+        }
+        if span.error:
+            record["error"] = span.error
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._finished.append(span)
+            if not self._jsonl.closed:
+                self._jsonl.write(line + "\n")
+
+    def instrument_driver(self, driver):
+        """Wrap ``driver.execute`` so every WebDriver command becomes a nested span."""
+        original_execute = driver.execute
+        if getattr(original_execute, "_step_tracer", None) is self:
+            return driver
+
+        @functools.wraps(original_execute)
+        def traced_execute(driver_command, params=None):
+            with self.span(f"webdriver.{driver_command}", category="webdriver"):
+                return original_execute(driver_command, params)
+
+        traced_execute._step_tracer = self
+        driver.execute = traced_execute
+        return driver
+
+    def export_chrome_trace(self, path=None):
+        """Write all finished spans as Chrome Trace Event "complete" events."""
+        path = path or self.trace_path
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._finished)
+        events = [{
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": round((span.start - self._origin) * 1e6, 1),
+            "dur": round(span.duration * 1e6, 1),
+            "pid": pid,
+            "tid": span.thread_id,
+            "args": dict(span.attributes, **({"error": span.error} if span.error else {})),
+        } for span in spans]
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"run_id": self.run_id}}, file)
+        return path
+
+    def finished_spans(self, category=None):
+        """Return the finished spans, optionally only those of one category."""
+        with self._lock:
+            return [span for span in self._finished if category is None or span.category == category]
+
+    def step_counts(self, category="webdriver"):
+        """Return {step: number of finished spans of ``category`` inside it}, e.g. WebDriver commands per step."""
+        counts = {}
+        with self._lock:
+            for span in self._finished:
+                if span.category == category and span.step:
+                    counts[span.step] = counts.get(span.step, 0) + 1
+        return counts
+
+    def summary(self, category="step"):
+        """Return (name, total_seconds, count) tuples for a category, slowest first."""
+        totals = {}
+        with self._lock:
+            for span in self._finished:
+                if span.category == category:
+                    total, count = totals.get(span.name, (0.0, 0))
+                    totals[span.name] = (total + span.duration, count + 1)
+        return sorted(((name, total, count) for name, (total, count) in totals.items()),
+                      key=lambda item: item[1], reverse=True)
+
+    def close(self):
+        """Flush the JSONL log and write the Chrome trace file."""
+        with self._lock:
+            if self._jsonl.closed:
+                return
+            self._jsonl.close()
+        try:
+            self.export_chrome_trace()
+            self.logger.info(f"Step trace written to {self.jsonl_path} and {self.trace_path}")
+            for name, total, count in self.summary():
+                self.logger.info(f"Step timing - {name}: {total:.2f}s over {count} call(s)")
+        except Exception as e:
+            self.logger.error(f"Failed to export step trace: {e}")
+
+
+def traced(name=None, category="step"):
+    """
+    Decorator for test-class methods: times the call as a span on ``self.tracer``.
+
+    The method runs untraced when the instance has no tracer, so helpers stay usable
+    from classes that do not set one up.
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            tracer = getattr(self, "tracer", None)
+            if tracer is None:
+                return func(self, *args, **kwargs)
+            with tracer.span(span_name, category=category) as span:
+                result = func(self, *args, **kwargs)
+                if isinstance(result, bool):
+                    span.set("result", result)
+                return result
+        return wrapper
+    return decorator
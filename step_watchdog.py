@@ -0,0 +1,201 @@
+import ctypes
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+WATCHDOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'watchdog')
+DIAGNOSTIC_TIMEOUT = 10  # seconds allowed for each diagnostic from a possibly hung browser
+
+
+class StepTimeoutError(BaseException):
+    """
+    Raised in the step's thread when its time limit expires.
+
+    Derives from BaseException so the steps' own ``except Exception`` handlers cannot
+    swallow it before the outermost guard sees it.
+    """
+
+
+def _set_async_exception(thread_id, exception_type):
+    """Schedule ``exception_type`` in another thread (None clears a pending one)."""
+    return ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id),
+                                                      ctypes.py_object(exception_type) if exception_type else None)
+
+
+def _call_with_timeout(func, timeout):
+    """Run ``func`` on a helper thread; return its result, or raise TimeoutError."""
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = func()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, name="watchdog-diagnostic", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"no response within {timeout}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+class _Watch:
+    def __init__(self, name, timeout, driver):
+        self.name = name
+        self.timeout = timeout
+        self.driver = driver
+        self.thread_id = threading.get_ident()
+        self.lock = threading.Lock()
+        self.done = False
+        self.expired = False
+        self.killed = False
+
+
+class StepWatchdog:
+    """
+    Enforces hard per-step time limits from a timer thread.
+
+    When a guarded step overruns, the watchdog saves diagnostics (screenshot, DOM, browser
+    log) to ``diagnostics_dir``, kills the WebDriver so a command blocked on the hung
+    browser returns, and raises StepTimeoutError in the step's thread. Guards nest; only
+    the outermost one should recover (see ``watchdog_step``).
+    """
+
+    def __init__(self, logger, diagnostics_dir=None):
+        self.logger = logger
+        self.diagnostics_dir = diagnostics_dir or WATCHDOG_DIR
+        self._local = threading.local()
+
+    def depth(self):
+        """Number of guards open on the calling thread."""
+        return getattr(self._local, "depth", 0)
+
+    @contextmanager
+    def guard(self, name, timeout, driver):
+        """
+        Limit the enclosed block to ``timeout`` seconds.
+
+        Raises:
+            StepTimeoutError: If the block overran and its driver was killed, even if the step
+                swallowed the interrupt. A step that returns while diagnostics are still being
+                captured keeps its driver and only logs the overrun.
+        """
+        watch = _Watch(name, timeout, driver)
+        timer = threading.Timer(timeout, self._expire, args=(watch,))
+        timer.daemon = True
+        self._local.depth = self.depth() + 1
+        timer.start()
+        try:
+            yield
+        finally:
+            try:
+                # Mark the step done first: cancel() cannot stop an _expire that is already running
+                with watch.lock:
+                    watch.done = True
+                timer.cancel()
+                if watch.killed:
+                    # Drop the interrupt if it has not been delivered yet; we raise it below
+                    _set_async_exception(watch.thread_id, None)
+            finally:
+                # An interrupt delivered above must not leave this guard counted as open
+                self._local.depth -= 1
+        if watch.killed:
+            raise StepTimeoutError(f"{name} exceeded its {timeout}s limit")
+        if watch.expired:
+            self.logger.warning(f"Watchdog: step '{name}' overran its {timeout}s limit but finished")
+
+    def _expire(self, watch):
+        with watch.lock:
+            if watch.done:
+                return
+            watch.expired = True
+        self.logger.error(f"Watchdog: step '{watch.name}' exceeded {watch.timeout}s, recovering")
+        self.capture_diagnostics(watch.driver, watch.name)
+        with watch.lock:
+            # The step may have returned while diagnostics were captured; its browser is not hung
+            if watch.done:
+                self.logger.info(f"Watchdog: step '{watch.name}' finished during diagnostics, "
+                                 f"leaving the driver running")
+                return
+            watch.killed = True
+            self._kill_driver(watch.driver)
+            _set_async_exception(watch.thread_id, StepTimeoutError)
+
+    def capture_diagnostics(self, driver, name):
+        """
+        Save a screenshot, the DOM and the browser console log, each with its own time limit.
+
+        Returns:
+            str: Directory holding whatever could be captured
+        """
+        directory = os.path.join(self.diagnostics_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{name}")
+        os.makedirs(directory, exist_ok=True)
+        captures = [
+            ("screenshot.png", lambda: driver.get_screenshot_as_png(), 'wb'),
+            ("dom.html", lambda: driver.page_source, 'w'),
+            ("browser_log.txt", lambda: "\n".join(
+                f"{entry.get('level')} {entry.get('message')}" for entry in driver.get_log("browser")), 'w'),
+        ]
+        for filename, capture, mode in captures:
+            try:
+                data = _call_with_timeout(capture, DIAGNOSTIC_TIMEOUT)
+                encoding = None if 'b' in mode else 'utf-8'
+                with open(os.path.join(directory, filename), mode, encoding=encoding) as file:
+                    file.write(data)
+            except Exception as e:
+                self.logger.warning(f"Watchdog: could not capture {filename}: {e}")
+        self.logger.info(f"Watchdog diagnostics saved to {directory}")
+        return directory
+
+    def _kill_driver(self, driver):
+        """Kill the driver process outright; quit() could block on the same hung browser."""
+        process = getattr(getattr(driver, "service", None), "process", None)
+        try:
+            if process is not None:
+                process.kill()
+            else:
+                _call_with_timeout(driver.quit, DIAGNOSTIC_TIMEOUT)
+        except Exception as e:
+            self.logger.warning(f"Watchdog: could not kill the driver: {e}")
+
+
+def watchdog_step(timeout_key, default_timeout, failed_result=False):
+    """
+    Decorator for test-class methods: runs the step under ``self.watchdog``.
+
+    The limit comes from ``self.step_timeout(timeout_key, default_timeout, step_name)``.
+    When the outermost guarded step times out, ``self.recover_driver()`` replaces the
+    browser and the step returns ``failed_result`` so the rest of the run continues.
+    Without a watchdog the method runs unguarded.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            watchdog = getattr(self, "watchdog", None)
+            if watchdog is None:
+                return func(self, *args, **kwargs)
+            timeout = self.step_timeout(timeout_key, default_timeout, func.__name__)
+            outermost = watchdog.depth() == 0
+            try:
+                with watchdog.guard(func.__name__, timeout, self.driver):
+                    return func(self, *args, **kwargs)
+            except StepTimeoutError:
+                if not outermost:
+                    raise
+                self.logger.error(f"Step {func.__name__} failed: time limit exceeded (limit {timeout}s)")
+                timeouts = getattr(self, "timeouts", None)
+                if timeouts is not None:
+                    # The failed span is not recorded, so widen a learned limit explicitly
+                    timeouts.record_timeout(f"step.{func.__name__}", timeout, default_timeout)
+                started = time.perf_counter()
+                self.recover_driver()
+                self.logger.info(f"Driver recovered in {time.perf_counter() - started:.1f}s")
+                return failed_result
+        return wrapper
+    return decorator
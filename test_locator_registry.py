@@ -0,0 +1,47 @@
+import unittest
+
+from locator_registry import xpath_to_css
+
+
+class XPathToCssTests(unittest.TestCase):
+    def test_tag_and_attribute_predicates(self):
+        self.assertEqual(xpath_to_css("//div[@id='main']"), "div[id='main']")
+        self.assertEqual(xpath_to_css("//input[@disabled]"), "input[disabled]")
+        self.assertEqual(xpath_to_css("//a[starts-with(@href, '/issues')]"), "a[href^='/issues']")
+
+    def test_contains_keeps_substring_semantics(self):
+        self.assertEqual(xpath_to_css("//div[contains(@class, 'flex bg-white')]//button"),
+                         "div[class*='flex bg-white'] button")
+
+    def test_and_combines_conditions(self):
+        self.assertEqual(xpath_to_css("//span[@class='a' and @role='b']"), "span[class='a'][role='b']")
+
+    def test_child_and_relative_steps(self):
+        self.assertEqual(xpath_to_css("//table[@class='t']/tbody/tr"), "table[class='t'] > tbody > tr")
+        self.assertEqual(xpath_to_css(".//td"), "td")
+        self.assertEqual(xpath_to_css("./td"), ":scope > td")
+
+    def test_sole_position_on_named_tag(self):
+        self.assertEqual(xpath_to_css("//tr/td[2]"), "tr > td:nth-of-type(2)")
+
+    def test_position_after_other_predicates_stays_xpath(self):
+        # XPath counts only the nodes the earlier predicate kept
+        self.assertIsNone(xpath_to_css("//div[@class='a'][2]"))
+        self.assertIsNone(xpath_to_css("//div[2][@class='a']"))
+
+    def test_position_on_any_tag_stays_xpath(self):
+        # *[1] is the first child of any type, not the first of each type
+        self.assertIsNone(xpath_to_css("//*[1]"))
+
+    def test_position_combined_with_and_stays_xpath(self):
+        self.assertIsNone(xpath_to_css("//div[2 and @id='a']"))
+
+    def test_untranslatable_xpaths(self):
+        self.assertIsNone(xpath_to_css("//span[text()='History']"))
+        self.assertIsNone(xpath_to_css("//div[span[text()='Download HTML']]/button"))
+        self.assertIsNone(xpath_to_css("/html/body/div"))
+        self.assertIsNone(xpath_to_css("//div/.."))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import logging
+import os
+import sys
+import unittest
+
+from locator_registry import LocatorRegistry
+from webdriver_profiler import WebDriverProfiler
+
+# A minimal stand-in for RemoteWebDriver. It is compiled under a selenium path so the
+# profiler skips its frames the same way it skips the real driver's.
+_DRIVER_SOURCE = '''
+class CommandExecutor:
+    def execute(self, command, params):
+        return {"value": []}
+
+
+class Driver:
+    def __init__(self):
+        self.command_executor = CommandExecutor()
+
+    def execute(self, driver_command, params=None):
+        return self.command_executor.execute(driver_command, params)["value"]
+
+    def find_elements(self, by, value):
+        return self.execute("findElements", {"using": by, "value": value})
+'''
+_driver_module = {}
+exec(compile(_DRIVER_SOURCE, os.path.join("stub", "selenium", "webdriver", "remote", "webdriver.py"), "exec"),
+     _driver_module)
+
+
+class CallSiteTests(unittest.TestCase):
+    def setUp(self):
+        logger = logging.getLogger(__name__)
+        self.driver = _driver_module["Driver"]()
+        self.registry = LocatorRegistry(logger, {"rows": "//table/tbody/tr"})
+        self.registry.attach(self.driver)
+        self.profiler = WebDriverProfiler(logger)
+        self.profiler.enable(self.driver)
+
+    def call_sites(self):
+        return {row["call_site"] for row in self.profiler.top_call_sites()}
+
+    def test_direct_call_is_attributed_to_the_caller(self):
+        line = sys._getframe().f_lineno + 1
+        self.driver.find_elements("css selector", "tr")
+        self.assertEqual(self.call_sites(),
+                         {f"test_webdriver_profiler.py:{line} test_direct_call_is_attributed_to_the_caller"})
+
+    def test_registry_lookup_is_attributed_to_the_caller(self):
+        line = sys._getframe().f_lineno + 1
+        self.registry.find_all("rows")
+        self.assertEqual(self.call_sites(),
+                         {f"test_webdriver_profiler.py:{line} test_registry_lookup_is_attributed_to_the_caller"})
+
+
+if __name__ == "__main__":
+    unittest.main()
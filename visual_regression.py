@@ -0,0 +1,231 @@
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+# Constants for comparison defaults
+DEFAULT_TILE_SIZE = 32
+DEFAULT_PIXEL_TOLERANCE = 16      # max per-channel difference still treated as equal (anti-aliasing, JPEG noise)
+DEFAULT_TILE_TOLERANCE = 0.01     # fraction of changed pixels before a tile counts as changed
+
+
+def compare_images(baseline_path, candidate_path, heatmap_path=None, masks=None,
+                   tile_size=DEFAULT_TILE_SIZE, pixel_tolerance=DEFAULT_PIXEL_TOLERANCE,
+                   tile_tolerance=DEFAULT_TILE_TOLERANCE):
+    """
+    Compare a candidate screenshot with its baseline tile by tile.
+
+    Runs in worker processes, so it only takes and returns plain picklable values.
+
+    Args:
+        baseline_path: Path to the baseline PNG
+        candidate_path: Path to the new screenshot
+        heatmap_path: Where to write the diff heatmap (optional)
+        masks: List of (x, y, width, height) regions to ignore, e.g. timestamps
+        tile_size: Edge length of the square comparison tiles in pixels
+        pixel_tolerance: Per-channel difference below which pixels are equal
+        tile_tolerance: Fraction of changed pixels above which a tile is changed
+
+    Returns:
+        dict: diff_percentage, changed_tiles, total_tiles, size_mismatch, heatmap_path
+    """
+    baseline = np.asarray(Image.open(baseline_path).convert("RGB"), dtype=np.int16)
+    candidate = np.asarray(Image.open(candidate_path).convert("RGB"), dtype=np.int16)
+
+    # Pad both images to a common size that is a multiple of the tile size;
+    # padding only present in one image counts as changed
+    height = max(baseline.shape[0], candidate.shape[0])
+    width = max(baseline.shape[1], candidate.shape[1])
+    padded_height = -(-height // tile_size) * tile_size
+    padded_width = -(-width // tile_size) * tile_size
+
+    def pad(image):
+        out = np.full((padded_height, padded_width, 3), -1024, dtype=np.int16)
+        out[:image.shape[0], :image.shape[1]] = image
+        return out
+
+    changed = np.abs(pad(baseline) - pad(candidate)).max(axis=2) > pixel_tolerance
+    considered = np.zeros((padded_height, padded_width), dtype=bool)
+    considered[:height, :width] = True
+    for x, y, mask_width, mask_height in masks or []:
+        considered[int(y):int(y + mask_height), int(x):int(x + mask_width)] = False
+    changed &= considered
+
+    tiles_y, tiles_x = padded_height // tile_size, padded_width // tile_size
+    changed_per_tile = changed.reshape(tiles_y, tile_size, tiles_x, tile_size).sum(axis=(1, 3))
+    considered_per_tile = considered.reshape(tiles_y, tile_size, tiles_x, tile_size).sum(axis=(1, 3))
+    tile_ratio = np.divide(changed_per_tile, considered_per_tile,
+                           out=np.zeros(changed_per_tile.shape), where=considered_per_tile > 0)
+    changed_tiles = tile_ratio > tile_tolerance
+
+    considered_pixels = int(considered.sum())
+    diff_percentage = 100.0 * int(changed.sum()) / considered_pixels if considered_pixels else 0.0
+
+    if heatmap_path:
+        _write_heatmap(pad(candidate)[:height, :width], tile_ratio, changed_tiles, tile_size, heatmap_path)
+
+    return {
+        "diff_percentage": round(diff_percentage, 4),
+        "changed_tiles": [(int(tx) * tile_size, int(ty) * tile_size) for ty, tx in zip(*np.nonzero(changed_tiles))],
+        "total_tiles": int(tiles_y * tiles_x),
+        "size_mismatch": baseline.shape != candidate.shape,
+        "heatmap_path": heatmap_path,
+    }
+
+
+def _write_heatmap(candidate, tile_ratio, changed_tiles, tile_size, heatmap_path):
+    """Dim the candidate and tint tiles red in proportion to how much of them changed."""
+    height, width = candidate.shape[:2]
+    gray = np.clip(candidate, 0, 255).mean(axis=2) * 0.4
+    heat = np.kron(np.where(changed_tiles, tile_ratio, 0.0), np.ones((tile_size, tile_size)))[:height, :width]
+    red = np.clip(gray + 155 + 100 * heat, 0, 255) * (heat > 0) + gray * (heat == 0)
+    heatmap = np.stack([red, gray, gray], axis=2).astype(np.uint8)
+    Image.fromarray(heatmap).save(heatmap_path)
+
+
+class VisualDiffResult:
+    """Outcome of one baseline comparison."""
+
+    def __init__(self, name, candidate_path, baseline_path, diff_percentage=0.0, changed_tiles=None,
+                 total_tiles=0, size_mismatch=False, heatmap_path=None, new_baseline=False, error=None,
+                 max_diff_percentage=0.0):
+        self.name = name
+        self.candidate_path = candidate_path
+        self.baseline_path = baseline_path
+        self.diff_percentage = diff_percentage
+        self.changed_tiles = changed_tiles or []
+        self.total_tiles = total_tiles
+        self.size_mismatch = size_mismatch
+        self.heatmap_path = heatmap_path
+        self.new_baseline = new_baseline
+        self.error = error
+        self.max_diff_percentage = max_diff_percentage
+
+    @property
+    def passed(self):
+        """Within ``max_diff_percentage``; changed tiles only say where to look, they do not gate."""
+        if self.error:
+            return False
+        if self.new_baseline:
+            return True
+        return not self.size_mismatch and self.diff_percentage <= self.max_diff_percentage
+
+    def __repr__(self):
+        return (f"VisualDiffResult(name={self.name!r}, passed={self.passed}, "
+                f"diff_percentage={self.diff_percentage}, changed_tiles={len(self.changed_tiles)})")
+
+
+class BaselineStore:
+    """
+    Stores approved baseline screenshots, one PNG per logical page/element name.
+    """
+
+    def __init__(self, logger, baseline_dir=None):
+        self.logger = logger
+        self.baseline_dir = baseline_dir or os.path.join(os.path.dirname(__file__), 'visual_baselines')
+        os.makedirs(self.baseline_dir, exist_ok=True)
+
+    def path_for(self, name):
+        safe_name = "".join(c if c.isalnum() or c in "._-" else "_" for c in name)
+        return os.path.join(self.baseline_dir, f"{safe_name}.png")
+
+    def has_baseline(self, name):
+        return os.path.exists(self.path_for(name))
+
+    def save_baseline(self, name, screenshot_path):
+        """Approve ``screenshot_path`` as the baseline for ``name``."""
+        baseline_path = self.path_for(name)
+        shutil.copyfile(screenshot_path, baseline_path)
+        self.logger.info(f"Saved visual baseline for '{name}' to {baseline_path}")
+        return baseline_path
+
+
+class VisualRegressionEngine:
+    """
+    Compares screenshots against the baseline store in a worker pool.
+
+    ``submit`` returns immediately so the driver thread keeps going; call ``collect``
+    at the end of the test to wait for and report all comparisons.
+    """
+
+    def __init__(self, logger, baseline_store=None, diff_dir=None, max_workers=None,
+                 tile_size=DEFAULT_TILE_SIZE, pixel_tolerance=DEFAULT_PIXEL_TOLERANCE,
+                 tile_tolerance=DEFAULT_TILE_TOLERANCE, max_diff_percentage=0.0):
+        self.logger = logger
+        self.baseline_store = baseline_store or BaselineStore(logger)
+        self.diff_dir = diff_dir or os.path.join(os.path.dirname(__file__), 'screenshots', 'visual_diffs')
+        os.makedirs(self.diff_dir, exist_ok=True)
+        self.tile_size = tile_size
+        self.pixel_tolerance = pixel_tolerance
+        self.tile_tolerance = tile_tolerance
+        self.max_diff_percentage = max_diff_percentage
+        self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._pending = []
+
+    def submit(self, name, screenshot_path, masks=None):
+        """
+        Queue a comparison of ``screenshot_path`` with the baseline called ``name``.
+
+        Args:
+            name: Logical name of the page or element, e.g. "results_table_Power Analysis"
+            screenshot_path: Freshly captured PNG
+            masks: List of (x, y, width, height) dynamic regions to ignore
+        """
+        if not screenshot_path:
+            self.logger.warning(f"No screenshot to compare for '{name}'")
+            return
+
+        if not self.baseline_store.has_baseline(name):
+            baseline_path = self.baseline_store.save_baseline(name, screenshot_path)
+            self._pending.append((name, screenshot_path, baseline_path, None))
+            return
+
+        baseline_path = self.baseline_store.path_for(name)
+        heatmap_name = os.path.splitext(os.path.basename(screenshot_path))[0] + "_heatmap.png"
+        future = self._executor.submit(
+            compare_images, baseline_path, screenshot_path,
+            heatmap_path=os.path.join(self.diff_dir, heatmap_name),
+            masks=masks, tile_size=self.tile_size, pixel_tolerance=self.pixel_tolerance,
+            tile_tolerance=self.tile_tolerance
+        )
+        self._pending.append((name, screenshot_path, baseline_path, future))
+
+    def collect(self):
+        """
+        Wait for all queued comparisons and log a summary.
+
+        Returns:
+            list[VisualDiffResult]: One result per submitted screenshot
+        """
+        results = []
+        for name, candidate_path, baseline_path, future in self._pending:
+            if future is None:
+                result = VisualDiffResult(name, candidate_path, baseline_path, new_baseline=True)
+            else:
+                try:
+                    result = VisualDiffResult(name, candidate_path, baseline_path,
+                                              max_diff_percentage=self.max_diff_percentage, **future.result())
+                except Exception as e:
+                    result = VisualDiffResult(name, candidate_path, baseline_path, error=str(e))
+            results.append(result)
+
+            if result.error:
+                self.logger.error(f"Visual comparison failed for '{name}': {result.error}")
+            elif result.new_baseline:
+                self.logger.info(f"No baseline for '{name}' yet, stored current screenshot as baseline")
+            elif result.passed:
+                self.logger.info(f"Visual check passed for '{name}' ({result.diff_percentage}% changed, "
+                                 f"{len(result.changed_tiles)}/{result.total_tiles} tiles)")
+            else:
+                self.logger.error(f"Visual regression in '{name}': {result.diff_percentage}% changed "
+                                  f"(limit {result.max_diff_percentage}%), "
+                                  f"{len(result.changed_tiles)}/{result.total_tiles} tiles at {result.changed_tiles[:10]}"
+                                  f"{', size mismatch' if result.size_mismatch else ''}, "
+                                  f"heatmap: {result.heatmap_path}")
+        self._pending = []
+        return results
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
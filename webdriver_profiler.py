@@ -0,0 +1,153 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Frames from these files are skipped when looking for the helper that issued a command:
+# the profiler itself and the wrappers that sit between test code and ``driver.execute``
+_INTERNAL_FILES = tuple(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), name))
+    for name in ("webdriver_profiler.py", "step_tracer.py", "locator_registry.py", "retry.py",
+                 "adaptive_timeouts.py")
+)
+
+
+class CommandStats:
+    """Aggregated count and timing for one (step, command, call site) combination."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+
+class WebDriverProfiler:
+    """
+    Opt-in profiler that counts and times every WebDriver round trip.
+
+    It wraps the driver's command executor, so element calls (getText, getAttribute, ...)
+    are included. Each command is attributed to the current test step (from the step
+    tracer, when one is given) and to the first call site outside Selenium. When not
+    enabled, nothing is wrapped and there is no overhead at all.
+    """
+
+    def __init__(self, logger, tracer=None):
+        self.logger = logger
+        self.tracer = tracer
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._original_execute = None
+
+    @property
+    def enabled(self):
+        return self._executor is not None
+
+    def enable(self, driver):
+        """Start profiling all commands sent by ``driver``."""
+        if self.enabled:
+            return
+        executor = driver.command_executor
+        original_execute = executor.execute
+
+        @functools.wraps(original_execute)
+        def profiled_execute(command, params):
+            start = time.perf_counter()
+            try:
+                return original_execute(command, params)
+            finally:
+                self._record(command, time.perf_counter() - start)
+
+        executor.execute = profiled_execute
+        self._executor = executor
+        self._original_execute = original_execute
+        self.logger.info("WebDriver command profiler enabled")
+
+    def disable(self):
+        """Restore the original command executor."""
+        if not self.enabled:
+            return
+        self._executor.execute = self._original_execute
+        self._executor = None
+        self._original_execute = None
+
+    @staticmethod
+    def _call_site():
+        frame = sys._getframe(3)
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if f"{os.sep}selenium{os.sep}" not in filename and os.path.abspath(filename) not in _INTERNAL_FILES:
+                return f"{os.path.basename(filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+            frame = frame.f_back
+        return "<unknown>"
+
+    def _record(self, command, elapsed):
+        step = (self.tracer.current_step() if self.tracer else None) or "<no step>"
+        key = (step, command, self._call_site())
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = CommandStats()
+            stats.add(elapsed)
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def step_totals(self):
+        """Return {step: (command_count, total_seconds)}."""
+        totals = {}
+        with self._lock:
+            for (step, _, _), stats in self._stats.items():
+                count, total = totals.get(step, (0, 0.0))
+                totals[step] = (count + stats.count, total + stats.total)
+        return totals
+
+    def top_call_sites(self, limit=20):
+        """
+        Return the most expensive call sites, by total time spent in WebDriver commands.
+
+        Returns:
+            list[dict]: step, command, call_site, count, total_ms, avg_ms, max_ms
+        """
+        with self._lock:
+            items = list(self._stats.items())
+        items.sort(key=lambda item: item[1].total, reverse=True)
+        return [{
+            "step": step,
+            "command": command,
+            "call_site": call_site,
+            "count": stats.count,
+            "total_ms": round(stats.total * 1000, 2),
+            "avg_ms": round(stats.total * 1000 / stats.count, 2),
+            "max_ms": round(stats.max * 1000, 2),
+        } for (step, command, call_site), stats in items[:limit]]
+
+    def log_report(self, limit=20):
+        """Log per-step round trip totals and the top-N call sites."""
+        for step, (count, total) in sorted(self.step_totals().items(), key=lambda item: item[1][1], reverse=True):
+            self.logger.info(f"WebDriver round trips - {step}: {count} commands, {total:.2f}s")
+        for row in self.top_call_sites(limit):
+            self.logger.info(f"WebDriver hotspot - {row['call_site']} [{row['step']}] {row['command']}: "
+                             f"{row['count']}x, {row['total_ms']}ms total, {row['avg_ms']}ms avg")
+
+    def write_report(self, path, limit=100):
+        """Write the step totals and top call sites as JSON."""
+        report = {
+            "steps": {step: {"commands": count, "total_ms": round(total * 1000, 2)}
+                      for step, (count, total) in self.step_totals().items()},
+            "top_call_sites": self.top_call_sites(limit),
+        }
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        return path